@@ -8,6 +8,27 @@ from playwright_stealth import stealth_async
 from bs4 import BeautifulSoup
 import re
 
+# Batas waktu (ms) menunggu kartu turnamen muncul dan jumlahnya stabil
+CALENDAR_READY_TIMEOUT_MS = int(os.getenv("CALENDAR_READY_TIMEOUT_MS", "75000"))
+CALENDAR_QUIET_MS = int(os.getenv("CALENDAR_QUIET_MS", "1500"))
+CARD_SELECTOR = "div.tmt-card-wrapper, div.card.tmt-card.show-add-to-calendar"
+
+async def wait_for_cards_stable(page, timeout_ms=CALENDAR_READY_TIMEOUT_MS, quiet_ms=CALENDAR_QUIET_MS):
+    """Menunggu kartu turnamen muncul lalu jumlahnya tidak berubah selama quiet_ms."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_ms / 1000
+    last_count = -1
+    stable_since = loop.time()
+    while loop.time() < deadline:
+        count = await page.evaluate(f"document.querySelectorAll('{CARD_SELECTOR}').length")
+        if count != last_count:
+            last_count = count
+            stable_since = loop.time()
+        elif count > 0 and loop.time() - stable_since >= quiet_ms / 1000:
+            return True
+        await asyncio.sleep(0.25)
+    return last_count > 0
+
 async def scrape_bwf_tournaments(url, output_dir="output"):
     """Mengikis daftar turnamen dari situs BWF World Tour.
     
@@ -58,17 +79,11 @@ async def scrape_bwf_tournaments(url, output_dir="output"):
             # Navigasi ke halaman
             await asyncio.sleep(random.uniform(2, 5))  # Penundaan acak
             await page.goto(url, wait_until="networkidle", timeout=60000)
-            await page.wait_for_timeout(45000)  # Tunggu Cloudflare dan pemuatan lambat
-            # Tunggu elemen turnamen
-            try:
-                await page.wait_for_selector("div.tmt-card-wrapper, div.card.tmt-card.show-add-to-calendar", timeout=30000)
+            # Tunggu elemen turnamen (melewati Cloudflare dan pemuatan lambat) sampai jumlahnya stabil
+            if await wait_for_cards_stable(page):
                 print("Elemen turnamen terdeteksi.")
-            except:
-                print("Peringatan: Elemen turnamen tidak ditemukan dalam waktu tunggu.")
-                # Coba lagi setelah penundaan tambahan
-                await page.wait_for_timeout(10000)
-                if not await page.query_selector("div.tmt-card-wrapper, div.card.tmt-card.show-add-to-calendar"):
-                    print("Kesalahan: Elemen turnamen masih tidak ditemukan setelah penundaan tambahan.")
+            else:
+                print("Kesalahan: Elemen turnamen tidak ditemukan dalam waktu tunggu.")
 
             # Tangani persetujuan cookie
             try:
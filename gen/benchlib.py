@@ -0,0 +1,118 @@
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from changelib import use_manifest
+from ingestlib import ingest_directory
+from supalib import use_local_backend, bwf_tour_to_supabase, bulk_insert_bwf_rankings, UPSERT_CHUNK_SIZE
+
+BENCH_SEED = 20250107
+
+
+def synthetic_matches(count, tour=5222, per_file=200, seed=BENCH_SEED):
+    """Generate match card dicts shaped like gen.extract_match_card_text output, split into files."""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 7, 10, 0)
+    files = []
+    for file_index in range(0, count, per_file):
+        matches = []
+        for i in range(file_index, min(file_index + per_file, count)):
+            when = start + timedelta(minutes=40 * (i // 8))
+            matches.append({
+                "id": tour,
+                "Match_Name": f"Match {i + 1}",
+                "Team_1_Players": [f"Player {rng.randint(1, 500)}"],
+                "Team_1_Country": "Indonesia",
+                "Team_2_Players": [f"Player {rng.randint(1, 500)}"],
+                "Team_2_Country": "Japan",
+                "Date": when.strftime("%d %b"),
+                "Status": "Finished",
+                "Time": when.strftime("%I:%M %p"),
+                "Category": "MS",
+                "Round": "R32",
+                "Court": f"Court {i % 8 + 1}",
+                "Stadium": "Axiata Arena",
+                "Scores": [f"21-{rng.randint(5, 19)}", f"21-{rng.randint(5, 19)}"],
+                "Winner": 1
+            })
+        files.append(matches)
+    return files
+
+
+def synthetic_rankings(count, week=20, seed=BENCH_SEED):
+    """Generate ranking entries shaped like ranklib.extract_ranking_data_new output."""
+    rng = random.Random(seed)
+    return [{
+        "week": week,
+        "event": "MEN'S SINGLES",
+        "ranking_option": "BWF World Rankings",
+        "rank": str(i + 1),
+        "points": str(rng.randint(10000, 100000)),
+        "players": [{"player_name": f"Player {i + 1}", "player_url": ""}],
+        "country": "Indonesia"
+    } for i in range(count)]
+
+
+def _report(name, client, rows, started):
+    elapsed = time.perf_counter() - started
+    report = {
+        "name": name,
+        "rows": rows,
+        "requests": client.requests,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed else None
+    }
+    print(f"{name:<28} {rows:>7} rows {client.requests:>6} requests {elapsed:>8.3f} s {report['rows_per_second']:>10} rows/s")
+    return report
+
+
+async def benchmark_loaders(rows=5000, latency_ms=0, chunk_size=UPSERT_CHUNK_SIZE, in_flight=None):
+    """Run the loaders against a fresh SQLite stand-in and report rows/s and request counts.
+
+    The data is generated from a fixed seed, so runs are comparable between
+    machines and commits. latency_ms adds a simulated round trip per request.
+    """
+    reports = []
+    clients = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        match_dir = os.path.join(work_dir, "output")
+        os.makedirs(match_dir)
+        for index, matches in enumerate(synthetic_matches(rows)):
+            with open(os.path.join(match_dir, f"match_bench_{index:04d}.json"), "w", encoding="utf-8") as f:
+                json.dump(matches, f)
+        rankings = synthetic_rankings(rows)
+
+        runs = [
+            ("bwf_tour row by row", lambda: bwf_tour_to_supabase(match_dir, chunk_size=1)),
+            ("bwf_tour chunked", lambda: bwf_tour_to_supabase(match_dir, chunk_size=chunk_size)),
+            ("bwf_tour concurrent ingest", lambda: ingest_directory(match_dir, ["bwf_tour"], in_flight, chunk_size)),
+        ]
+        for name, run in runs:
+            # Fresh database and manifest for every run
+            client = use_local_backend(os.path.join(work_dir, f"{len(reports)}.sqlite"), latency_ms)
+            clients.append(client)
+            use_manifest(os.path.join(work_dir, f"{len(reports)}_manifest.sqlite"))
+            started = time.perf_counter()
+            await run()
+            reports.append(_report(name, client, client.count("bwf_tour"), started))
+
+        # Second load of unchanged data against the last database and manifest
+        client.requests = 0
+        started = time.perf_counter()
+        await ingest_directory(match_dir, ["bwf_tour"], in_flight, chunk_size)
+        reports.append(_report("bwf_tour unchanged reload", client, rows, started))
+
+        client = use_local_backend(os.path.join(work_dir, "rankings.sqlite"), latency_ms)
+        clients.append(client)
+        use_manifest(os.path.join(work_dir, "rankings_manifest.sqlite"))
+        started = time.perf_counter()
+        bulk_insert_bwf_rankings(rankings, chunk_size)
+        reports.append(_report("bwf_rankings bulk", client, client.count("bwf_rankings"), started))
+
+        # Release the scratch files before the temporary directory is removed
+        for client in clients:
+            client.close()
+        use_manifest(os.getenv("CHANGE_MANIFEST_PATH", "sync_manifest.sqlite"))
+    return reports
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import os
+
+# URL fragment of the ranking widget's JSON API (the Vue app calls .../api/vue-*)
+RANKING_API_PATTERN = os.getenv("RANKING_API_PATTERN", "/api/vue-")
+
+# Request headers kept in fixtures, to inspect how the widget calls its API
+REPLAY_HEADERS = ("content-type", "accept", "authorization", "x-requested-with")
+
+# Candidate keys in a ranking payload row, tried in order
+RANKING_FIELD_MAP = {
+    "rank": ["rank", "ranking"],
+    "ranking_change": ["rank_change", "ranking_change", "change"],
+    "country": ["country", "country_name", "nationality"],
+    "tournaments": ["tournaments", "tournament_count", "tmt_count"],
+    "points": ["points", "total_points", "point"],
+}
+
+
+def start_response_capture(page, url_part=RANKING_API_PATTERN):
+    """Record every XHR/fetch response whose URL contains url_part.
+
+    Returns a capture dict; call finish_capture() before reading capture["records"].
+    """
+    capture = {"url_part": url_part, "records": [], "pending": set()}
+
+    async def record(response):
+        request = response.request
+        try:
+            body = await response.json()
+        except Exception:
+            try:
+                body = await response.text()
+            except Exception:
+                body = None
+        capture["records"].append({
+            "url": response.url,
+            "method": request.method,
+            "post_data": request.post_data,
+            "headers": {k: v for k, v in request.headers.items() if k.lower() in REPLAY_HEADERS},
+            "status": response.status,
+            "body": body
+        })
+
+    def on_response(response):
+        if url_part in response.url and response.request.resource_type in ("xhr", "fetch"):
+            task = asyncio.ensure_future(record(response))
+            capture["pending"].add(task)
+            task.add_done_callback(capture["pending"].discard)
+
+    page.on("response", on_response)
+    return capture
+
+
+async def finish_capture(capture):
+    """Wait until all captured response bodies have been read."""
+    if capture["pending"]:
+        await asyncio.gather(*list(capture["pending"]), return_exceptions=True)
+    return capture["records"]
+
+
+def save_capture(capture, path):
+    """Save captured records as a JSON fixture for offline parsing and tests."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(capture["records"], f, indent=2, ensure_ascii=False)
+    print(f"Saved {len(capture['records'])} captured responses to {path}")
+    return path
+
+
+def load_capture(path):
+    """Load a fixture written by save_capture() into a capture dict."""
+    with open(path, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    return {"url_part": None, "records": records, "pending": set()}
+
+
+def _first(item, keys, default=None):
+    for key in keys:
+        if key in item and item[key] is not None:
+            return item[key]
+    return default
+
+
+def _find_ranking_rows(body):
+    """Find the first list of objects carrying a rank field anywhere in a payload."""
+    if isinstance(body, list):
+        if body and all(isinstance(item, dict) for item in body) and _first(body[0], RANKING_FIELD_MAP["rank"]) is not None:
+            return body
+        for item in body:
+            rows = _find_ranking_rows(item)
+            if rows:
+                return rows
+    elif isinstance(body, dict):
+        for value in body.values():
+            rows = _find_ranking_rows(value)
+            if rows:
+                return rows
+    return None
+
+
+def _player(model):
+    """Map a player object from the payload to the {player_name, player_url} structure."""
+    name = _first(model, ["name_display", "name", "player_name"])
+    if not name:
+        name = f"{model.get('last_name') or ''} {model.get('first_name') or ''}".strip()
+    return {"player_name": name, "player_url": _first(model, ["url", "link", "slug"], "")}
+
+
+def _country(item):
+    value = _first(item, RANKING_FIELD_MAP["country"], "")
+    if isinstance(value, dict):
+        return _first(value, ["name", "code_iso3", "code"], "")
+    if not value:
+        for key, model in item.items():
+            if key.startswith("player") and isinstance(model, dict) and model.get("country_model"):
+                return _first(model["country_model"], ["name", "code_iso3", "code"], "")
+    return value
+
+
+def parse_ranking_payload(body, week, event_name, ranking_option):
+    """Convert a captured ranking payload into the dicts produced by ranklib.extract_ranking_data_new."""
+    rows = _find_ranking_rows(body) or []
+    rankings = []
+    for item in rows:
+        players = [
+            _player(model) for key, model in sorted(item.items())
+            if key.startswith("player") and isinstance(model, dict)
+        ]
+        points = _first(item, RANKING_FIELD_MAP["points"], "")
+        tournaments = _first(item, RANKING_FIELD_MAP["tournaments"], "")
+        rankings.append({
+            "week": week,
+            "event": event_name,
+            "ranking_option": ranking_option,
+            "rank": str(_first(item, RANKING_FIELD_MAP["rank"], "")),
+            "ranking_change": str(_first(item, RANKING_FIELD_MAP["ranking_change"], "-")),
+            "players": players,
+            "country": _country(item),
+            "tournaments": str(tournaments).strip(),
+            "points": str(points).replace(",", "")
+        })
+    return rankings
+
+
+def latest_ranking_rows(capture, week, event_name, ranking_option, since=0):
+    """Parse the newest captured record (from index since onward) that contains ranking rows."""
+    for record in reversed(capture["records"][since:]):
+        rankings = parse_ranking_payload(record.get("body"), week, event_name, ranking_option)
+        if rankings:
+            return rankings
+    return []
+
+
+def parse_capture_file(path, week, event_name, ranking_option):
+    """Offline entry point: parse ranking rows from a recorded fixture."""
+    return latest_ranking_rows(load_capture(path), week, event_name, ranking_option)
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+# Local manifest of row key -> content hash of the last successful upsert.
+# CHANGE_DETECTION=0 uploads every row; deleting the file forces a full re-sync.
+CHANGE_DETECTION = os.getenv("CHANGE_DETECTION", "1") != "0"
+CHANGE_MANIFEST_PATH = os.getenv("CHANGE_MANIFEST_PATH", "sync_manifest.sqlite")
+
+# Columns that change on every run without the row itself changing
+HASH_IGNORED_FIELDS = ("created_at",)
+
+_manifest = {"conn": None, "lock": threading.Lock()}
+
+
+def get_manifest():
+    """Open the manifest database once per process."""
+    if _manifest["conn"] is None:
+        conn = sqlite3.connect(CHANGE_MANIFEST_PATH, check_same_thread=False)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS row_hashes (
+                table_name TEXT NOT NULL,
+                row_key TEXT NOT NULL,
+                scope TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                synced_at TEXT NOT NULL,
+                PRIMARY KEY (table_name, row_key)
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS row_hashes_scope ON row_hashes (table_name, scope)")
+        conn.commit()
+        _manifest["conn"] = conn
+    return _manifest["conn"]
+
+
+def use_manifest(path):
+    """Switch to another manifest file (e.g. a scratch file for benchmarks)."""
+    global CHANGE_MANIFEST_PATH
+    with _manifest["lock"]:
+        if _manifest["conn"] is not None:
+            _manifest["conn"].close()
+            _manifest["conn"] = None
+        CHANGE_MANIFEST_PATH = path
+
+
+def row_key(row, key_fields):
+    return json.dumps([str(row.get(field)) for field in key_fields])
+
+
+def row_hash(row):
+    content = {k: v for k, v in row.items() if k not in HASH_IGNORED_FIELDS}
+    return hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def tour_scope(row):
+    """bwf_tour rows are deleted per tour and day (see supalib.delete_bwf_tour)."""
+    return f"{row.get('tour')}|{str(row.get('datetime'))[:10]}"
+
+
+def rankings_scope(row):
+    """bwf_rankings rows are deleted per week and rank category."""
+    return f"{row.get('week')}|{row.get('rank_category')}"
+
+
+def filter_changed(table, rows, key_fields):
+    """Return the rows whose key is new or whose content hash differs from the manifest."""
+    if not CHANGE_DETECTION or not rows:
+        return rows
+
+    with _manifest["lock"]:
+        conn = get_manifest()
+        known = {}
+        keys = [row_key(row, key_fields) for row in rows]
+        # Look up in batches to stay under SQLite's variable limit
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            for key, value in conn.execute(
+                f"SELECT row_key, hash FROM row_hashes WHERE table_name = ? AND row_key IN ({placeholders})",
+                [table, *batch]
+            ):
+                known[key] = value
+
+    return [row for key, row in zip(keys, rows) if known.get(key) != row_hash(row)]
+
+
+def mark_synced(table, rows, key_fields, scope_fn):
+    """Record the hashes of rows that were upserted successfully."""
+    if not CHANGE_DETECTION or not rows:
+        return
+    synced_at = datetime.now().isoformat()
+    with _manifest["lock"]:
+        conn = get_manifest()
+        conn.executemany(
+            "INSERT OR REPLACE INTO row_hashes (table_name, row_key, scope, hash, synced_at) VALUES (?, ?, ?, ?, ?)",
+            [(table, row_key(row, key_fields), scope_fn(row), row_hash(row), synced_at) for row in rows]
+        )
+        conn.commit()
+
+
+def forget_scope(table, scope, prefix=False):
+    """Drop manifest entries after their rows were deleted remotely, so they are uploaded again."""
+    if not CHANGE_DETECTION:
+        return
+    with _manifest["lock"]:
+        conn = get_manifest()
+        if prefix:
+            conn.execute(
+                "DELETE FROM row_hashes WHERE table_name = ? AND substr(scope, 1, ?) = ?",
+                (table, len(scope), scope)
+            )
+        else:
+            conn.execute("DELETE FROM row_hashes WHERE table_name = ? AND scope = ?", (table, scope))
+        conn.commit()
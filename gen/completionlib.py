@@ -0,0 +1,84 @@
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from livelib import card_state, day_state
+
+# Days whose matches are all final, so a refresh can skip them (--force re-scrapes them)
+COMPLETION_INDEX_PATH = os.getenv("COMPLETION_INDEX_PATH", "completion.sqlite")
+
+DAY_URL_PATTERN = re.compile(r"/(\d{4}-\d{2}-\d{2})/?$")
+
+_completion = {"conn": None, "lock": threading.Lock()}
+
+
+def get_completion_index():
+    """Open the completion index database once per process."""
+    if _completion["conn"] is None:
+        conn = sqlite3.connect(COMPLETION_INDEX_PATH, check_same_thread=False)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS days (
+                tour_id TEXT NOT NULL,
+                day TEXT NOT NULL,
+                state TEXT NOT NULL,
+                cards INTEGER NOT NULL,
+                final_cards INTEGER NOT NULL,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (tour_id, day)
+            )
+        """)
+        conn.commit()
+        _completion["conn"] = conn
+    return _completion["conn"]
+
+
+def day_of_url(url):
+    """Return the yyyy-mm-dd of a results day URL, or None (e.g. the podium page)."""
+    match = DAY_URL_PATTERN.search(url or "")
+    return match.group(1) if match else None
+
+
+def final_days(tour_id=None):
+    """Return the set of (tour_id, day) marked final, optionally for one tournament."""
+    query = "SELECT tour_id, day FROM days WHERE state = 'final'"
+    params = ()
+    if tour_id is not None:
+        query += " AND tour_id = ?"
+        params = (str(tour_id),)
+    with _completion["lock"]:
+        return set(get_completion_index().execute(query, params).fetchall())
+
+
+def skip_final_days(units, force=False):
+    """Drop (url, tour_id) units whose day is already final. Returns (todo, skipped)."""
+    if force:
+        return list(units), []
+    done = final_days()
+    todo = []
+    skipped = []
+    for url, tour_id in units:
+        day = day_of_url(url)
+        if day and (str(tour_id), day) in done:
+            skipped.append((url, tour_id))
+        else:
+            todo.append((url, tour_id))
+    return todo, skipped
+
+
+def record_day(tour_id, url, cards):
+    """Store the state of a scraped day. Returns the state, or None for non-day URLs."""
+    day = day_of_url(url)
+    if day is None or cards is None:
+        return None
+    state = day_state(cards)
+    with _completion["lock"]:
+        conn = get_completion_index()
+        conn.execute(
+            "INSERT OR REPLACE INTO days (tour_id, day, state, cards, final_cards, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (str(tour_id), day, state, len(cards), sum(card_state(card) == "final" for card in cards),
+             datetime.now().isoformat())
+        )
+        conn.commit()
+    return state
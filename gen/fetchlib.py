@@ -0,0 +1,234 @@
+import os
+import re
+from bs4 import BeautifulSoup
+
+# Try plain HTTP before launching a browser page. Off by default: enable with
+# HTTP_FAST_PATH=1 once `python gen.py fastcheck <url>` shows no differences
+HTTP_FAST_PATH = os.getenv("HTTP_FAST_PATH", "0") != "0"
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "30"))
+
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# Cloudflare interstitials; a CAPTCHA widget only counts on a page without match cards,
+# since ordinary pages may load a captcha script for their forms
+CHALLENGE_PATTERN = re.compile(r"<title>\s*(just a moment|attention required)|cf-challenge|challenge-form|cf_chl_", re.I)
+CAPTCHA_WIDGET_PATTERN = re.compile(r'class="[^"]*\b(g-recaptcha|h-captcha|cf-turnstile)\b', re.I)
+
+# One pooled keep-alive client per process
+_http_client = {"client": None}
+
+
+async def get_http_client():
+    """Return the shared async HTTP client, or None when httpx is not installed."""
+    if _http_client["client"] is None:
+        try:
+            import httpx
+        except ImportError:
+            print("httpx not installed, HTTP fast path disabled.")
+            return None
+        _http_client["client"] = httpx.AsyncClient(
+            headers=HTTP_HEADERS,
+            follow_redirects=True,
+            timeout=HTTP_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_CONNECTIONS
+            )
+        )
+    return _http_client["client"]
+
+
+async def close_http_client():
+    """Close the shared HTTP client at the end of the run."""
+    if _http_client["client"] is not None:
+        await _http_client["client"].aclose()
+        _http_client["client"] = None
+
+
+def is_challenge_page(status, html):
+    """Detect Cloudflare/CAPTCHA responses that need a real browser."""
+    if status in (403, 429, 503):
+        return True
+    if CHALLENGE_PATTERN.search(html[:5000]):
+        return True
+    return bool(CAPTCHA_WIDGET_PATTERN.search(html)) and "match-card" not in html
+
+
+def collapse_whitespace(value):
+    return " ".join(value.split())
+
+
+def normalise_card_text(card):
+    """Collapse whitespace in every text field of a card.
+
+    innerText keeps line breaks between blocks while the HTML parser sees raw
+    text nodes; normalising both the browser and HTTP results makes the same
+    match produce the same row (and the same change hash) on either path.
+    """
+    def clean(value):
+        if isinstance(value, str):
+            return collapse_whitespace(value)
+        if isinstance(value, list):
+            return [clean(item) for item in value]
+        return value
+    return {key: clean(value) for key, value in card.items()}
+
+
+def compare_card_lists(expected, actual):
+    """List the differences between two card lists, pairing cards by match, court, date and time."""
+    def key(card):
+        return tuple(card.get(field) for field in ("Match_Name", "Court", "Date", "Time"))
+
+    expected = {key(card): card for card in map(normalise_card_text, expected)}
+    actual = {key(card): card for card in map(normalise_card_text, actual)}
+    differences = [f"Missing card {k}" for k in expected if k not in actual]
+    differences += [f"Extra card {k}" for k in actual if k not in expected]
+    for k in expected.keys() & actual.keys():
+        for field in sorted(expected[k].keys() | actual[k].keys()):
+            if expected[k].get(field) != actual[k].get(field):
+                differences.append(f"{k} {field}: {expected[k].get(field)!r} != {actual[k].get(field)!r}")
+    return differences
+
+
+def _text(el):
+    """Text of an element with whitespace collapsed (see normalise_card_text)."""
+    return collapse_whitespace(el.get_text()) if el else None
+
+
+def _attr(el, name):
+    value = el.get(name) if el else None
+    return value.strip() if isinstance(value, str) else None
+
+
+def _team(data, wrapper, prefix, with_seeding):
+    players = [_text(p) for p in wrapper.select("a.participant-name")]
+    if players:
+        data[f"{prefix}_Players"] = players
+    if with_seeding:
+        seeding = _text(wrapper.select_one("span"))
+        if seeding:
+            data[f"{prefix}_Seeding"] = seeding
+    country = _attr(wrapper.select_one("div.flags-wrapper img"), "alt")
+    if country:
+        data[f"{prefix}_Country"] = country
+    data[f"{prefix}_Winner"] = wrapper.select_one("div.winner-dot") is not None
+
+
+def _stadium(card):
+    # Outermost div whose class contains "court-wrapper", like the xpath used by the browser path
+    wrappers = [
+        parent for parent in card.find_parents("div")
+        if "court-wrapper" in " ".join(parent.get("class", []))
+    ]
+    if not wrappers:
+        return None
+    header = wrappers[-1].select_one('div[class*="court-header"]')
+    return _text(header.select_one("span.venue-name")) if header else None
+
+
+def parse_match_cards_html(html):
+    """Parse server-rendered match cards with the same keys as gen.MATCH_CARDS_JS."""
+    soup = BeautifulSoup(html, "html.parser")
+    cards = []
+    for card in soup.select("div.match-card"):
+        data = {}
+
+        match_name = card.select_one("span.match-name")
+        if match_name:
+            data["Match_Name"] = _text(match_name)
+
+        team1 = card.select_one("div.participant-wrapper:nth-child(1)")
+        if team1:
+            _team(data, team1, "Team_1", True)
+
+        separator = card.select_one("div.separator")
+        if separator:
+            data["Separator"] = _text(separator)
+
+        team2 = card.select_one("div.participant-wrapper:nth-child(3)")
+        if team2:
+            _team(data, team2, "Team_2", False)
+
+        data["Winner"] = 1 if data.get("Team_1_Winner") else (2 if data.get("Team_2_Winner") else 0)
+
+        scores = []
+        for set_el in card.select("div.game-score-set"):
+            points = set_el.select("span.set-points")
+            if len(points) == 2:
+                scores.append(f"{_text(points[0])}-{_text(points[1])}")
+        if scores:
+            data["Scores"] = scores
+
+        schedule = card.select_one("div.schedule-module")
+        if schedule:
+            date = schedule.select_one("span:nth-child(1)")
+            status = schedule.select_one("span.schedule-status")
+            time = schedule.select_one("span.schedule-date")
+            if date:
+                data["Date"] = _text(date)
+            if status:
+                data["Status"] = _text(status)
+            if time:
+                data["Time"] = _text(time)
+
+        for label_name, label in zip(["Category", "Round", "Court"], card.select("span.footer-label")):
+            data[label_name] = _text(label)
+
+        stadium = _stadium(card)
+        if stadium:
+            data["Stadium"] = stadium
+
+        duration = card.select_one("span.footer-match-time")
+        if duration:
+            data["Duration"] = _text(duration)
+
+        cards.append(data)
+    return cards
+
+
+def page_title_from_html(html):
+    """Return the processed page title used as the Tour field (second part of "a | b")."""
+    soup = BeautifulSoup(html, "html.parser")
+    full_title = soup.title.get_text().strip() if soup.title else ""
+    return full_title.split(" | ")[1].strip() if " | " in full_title else full_title
+
+
+async def fetch_match_cards(url, html_file=None):
+    """Fetch a results day page over plain HTTP and parse its match cards.
+
+    Returns (page_title, cards), or None when the browser is needed: httpx is
+    missing, the request failed, a challenge page came back, or the
+    server-rendered HTML has no match cards (list view needs JavaScript).
+    html_file keeps a copy of the fetched page for comparison.
+    """
+    client = await get_http_client()
+    if client is None:
+        return None
+
+    try:
+        response = await client.get(url)
+    except Exception as e:
+        print(f"HTTP fetch failed for {url}: {str(e)}")
+        return None
+
+    html = response.text
+    if html_file:
+        with open(html_file, "w", encoding="utf-8") as f:
+            f.write(html)
+    if is_challenge_page(response.status_code, html):
+        print(f"Challenge page detected for {url}, falling back to browser.")
+        return None
+    if response.status_code != 200:
+        print(f"HTTP {response.status_code} for {url}, falling back to browser.")
+        return None
+
+    cards = parse_match_cards_html(html)
+    if not cards:
+        print(f"No server-rendered match cards at {url}, falling back to browser.")
+        return None
+    return page_title_from_html(html), cards
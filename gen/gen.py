@@ -1,11 +1,21 @@
 from playwright.async_api import async_playwright
 import sys
 import asyncio
-from genlib import prepare_page, save_html_content, save_screenshot  
-from supalib import delete_bwf_rankings_data, delete_bwf_rankings_data_by_week, delete_bwf_tour, insert_bwf_rankings_data, save_tour_to_supabase, bwf_calendar_to_supabase, bwf_tour_to_supabase, bwf_schedule_to_supabase
+from genlib import prepare_page, release_page, close_browser_pool, run_bounded, run_stage, effective_workers, PIPELINE_QUEUE_SIZE, save_html_content, save_screenshot
+from supalib import delete_bwf_rankings_data, delete_bwf_rankings_data_by_week, delete_bwf_tour, insert_bwf_rankings_data, bulk_insert_bwf_rankings, replace_bwf_rankings_week, build_bwf_tour_row, sync_bwf_tour_day, upsert_changed_rows, get_supabase_client, UPSERT_CHUNK_SIZE, TOUR_CONFLICT_KEY, RANK_CATEGORY_MAP, save_tour_to_supabase, bwf_calendar_to_supabase, bwf_tour_to_supabase, bwf_schedule_to_supabase
 from jsonlib import extract_date_from_string, get_string_array_from_json, delete_files_by_extension, add_id_to_json, read_json_list, extract_number_from_filename
 from inputlib import get_match_input, get_ranking_input
-from ranklib import scrape_rank, scrape_rank_by_week, scrape_rank_by_week_new
+from ranklib import scrape_rank, scrape_rank_by_week, scrape_rank_by_week_new, rank_event_files
+from capturelib import parse_capture_file
+from changelib import tour_scope, row_key, row_hash
+from livelib import LIVE_INTERVAL_MIN_SECONDS, LIVE_MAX_RELOAD_FAILURES, day_state, next_interval, day_has_passed
+from runlib import plan_units, run_unit, run_summary
+from completionlib import skip_final_days, record_day, day_of_url
+from schedulelib import schedule_day_urls, write_schedule_links, sample_entries, compare_day_urls
+from ingestlib import ingest_directory
+from benchlib import benchmark_loaders
+from outboxlib import OUTBOX, enqueue_rows, drain_outbox, start_outbox_loader, stop_outbox_loader
+from fetchlib import HTTP_FAST_PATH, fetch_match_cards, close_http_client, normalise_card_text, compare_card_lists
 from datetime import datetime
 import json
 import asyncio
@@ -25,6 +35,12 @@ rank_categories = [
     "Parapan American Games Qualification"
 ]
 
+# gen.py match menyinkronkan selisih per (tour, hari); TOUR_SYNC=0 -> hapus hari itu lalu insert ulang
+TOUR_SYNC = os.getenv("TOUR_SYNC", "1") != "0"
+
+# gen.py rank mengganti minggu secara atomik lewat tabel staging (lihat sql/bwf_rankings_swap.sql)
+RANKINGS_SWAP = os.getenv("RANKINGS_SWAP", "1") != "0"
+
 
 async def switch_to_list_view(page):
     """Switch the page to List View by clicking the List View label."""
@@ -114,151 +130,256 @@ async def save_ranking_options_to_json(page, output_dir, timestamp):
         return None
 
 
-async def extract_match_card_text(page, output_dir, timestamp, id = "01", result_file="match"):
-    """Extract structured text from match-card elements and save to JSON with processed page title in each card."""
+# Ekstraksi massal (satu page.evaluate) aktif secara default; BULK_EXTRACTION=0 memakai jalur per elemen
+BULK_EXTRACTION = os.getenv("BULK_EXTRACTION", "1") != "0"
+
+# Serialises every div.match-card in one round trip. Keys, order and rules mirror
+# collect_match_cards_per_element so both paths produce the same match_*.json.
+MATCH_CARDS_JS = """
+() => {
+    const text = (el) => el ? el.innerText.trim() : null;
+    const attr = (el, name) => {
+        const value = el ? el.getAttribute(name) : null;
+        return value === null ? null : value.trim();
+    };
+    const team = (data, wrapper, prefix, withSeeding) => {
+        const players = Array.from(wrapper.querySelectorAll('a.participant-name')).map(text);
+        if (players.length) data[`${prefix}_Players`] = players;
+        if (withSeeding) {
+            const seeding = text(wrapper.querySelector('span'));
+            if (seeding) data[`${prefix}_Seeding`] = seeding;
+        }
+        const country = attr(wrapper.querySelector('div.flags-wrapper img'), 'alt');
+        if (country) data[`${prefix}_Country`] = country;
+        data[`${prefix}_Winner`] = wrapper.querySelector('div.winner-dot') !== null;
+    };
+
+    return Array.from(document.querySelectorAll('div.match-card')).map((card) => {
+        const data = {};
+
+        const matchName = card.querySelector('span.match-name');
+        if (matchName) data.Match_Name = text(matchName);
+
+        const team1 = card.querySelector('div.participant-wrapper:nth-child(1)');
+        if (team1) team(data, team1, 'Team_1', true);
+
+        const separator = card.querySelector('div.separator');
+        if (separator) data.Separator = text(separator);
+
+        const team2 = card.querySelector('div.participant-wrapper:nth-child(3)');
+        if (team2) team(data, team2, 'Team_2', false);
+
+        data.Winner = data.Team_1_Winner ? 1 : (data.Team_2_Winner ? 2 : 0);
+
+        const scores = [];
+        card.querySelectorAll('div.game-score-set').forEach((set) => {
+            const points = set.querySelectorAll('span.set-points');
+            if (points.length === 2) scores.push(`${text(points[0])}-${text(points[1])}`);
+        });
+        if (scores.length) data.Scores = scores;
+
+        const schedule = card.querySelector('div.schedule-module');
+        if (schedule) {
+            const date = schedule.querySelector('span:nth-child(1)');
+            const status = schedule.querySelector('span.schedule-status');
+            const time = schedule.querySelector('span.schedule-date');
+            if (date) data.Date = text(date);
+            if (status) data.Status = text(status);
+            if (time) data.Time = text(time);
+        }
+
+        const labels = ['Category', 'Round', 'Court'];
+        card.querySelectorAll('span.footer-label').forEach((label, i) => {
+            if (i < labels.length) data[labels[i]] = text(label);
+        });
+
+        // Same as xpath ancestor::div[contains(@class, "court-wrapper")]//div[contains(@class, "court-header")]
+        let courtWrapper = null;
+        for (let el = card.parentElement; el; el = el.parentElement) {
+            if (el.tagName === 'DIV' && (el.getAttribute('class') || '').includes('court-wrapper')) courtWrapper = el;
+        }
+        const courtHeader = courtWrapper ? courtWrapper.querySelector('div[class*="court-header"]') : null;
+        if (courtHeader) {
+            const stadium = text(courtHeader.querySelector('span.venue-name'));
+            if (stadium) data.Stadium = stadium;
+        }
+
+        const duration = card.querySelector('span.footer-match-time');
+        if (duration) data.Duration = text(duration);
+
+        return data;
+    });
+}
+"""
+
+
+async def collect_match_cards_bulk(page):
+    """Serialise all match cards, court headers and venue names with a single page.evaluate call."""
+    return await page.evaluate(MATCH_CARDS_JS)
+
+
+async def collect_match_cards_per_element(match_cards):
+    """Extract match card fields with one Playwright call per element (fallback and comparison path)."""
+    cards = []
+    for card in match_cards:
+        card_data = {}
+
+        # Match Name
+        match_name_el = await card.query_selector('span.match-name')
+        if match_name_el:
+            match_name = (await match_name_el.inner_text()).strip()
+            card_data["Match_Name"] = match_name
+
+        # Team 1 Players and Country
+        team1_wrapper = await card.query_selector('div.participant-wrapper:nth-child(1)')
+        if team1_wrapper:
+            players = await team1_wrapper.query_selector_all('a.participant-name')
+            player_names = [(await p.inner_text()).strip() for p in players]
+            if player_names:
+                card_data["Team_1_Players"] = player_names
+            seeding = await team1_wrapper.query_selector('span')
+            if seeding:
+                seeding_text = (await seeding.inner_text()).strip()
+                if seeding_text:
+                    card_data["Team_1_Seeding"] = seeding_text
+            # Extract Team 1 Country
+            team1_flag = await team1_wrapper.query_selector('div.flags-wrapper img')
+            if team1_flag:
+                country_code = (await team1_flag.get_attribute('alt')).strip()
+                if country_code:
+                    card_data["Team_1_Country"] = country_code
+            
+            # Check if Team 1 is winner
+            team1_winner_dot = await team1_wrapper.query_selector('div.winner-dot')
+            card_data["Team_1_Winner"] = team1_winner_dot is not None
+
+        # Separator
+        separator_el = await card.query_selector('div.separator')
+        if separator_el:
+            separator = (await separator_el.inner_text()).strip()
+            card_data["Separator"] = separator
+
+        # Team 2 Players and Country
+        team2_wrapper = await card.query_selector('div.participant-wrapper:nth-child(3)')
+        if team2_wrapper:
+            players = await team2_wrapper.query_selector_all('a.participant-name')
+            player_names = [(await p.inner_text()).strip() for p in players]
+            if player_names:
+                card_data["Team_2_Players"] = player_names
+            # Extract Team 2 Country
+            team2_flag = await team2_wrapper.query_selector('div.flags-wrapper img')
+            if team2_flag:
+                country_code = (await team2_flag.get_attribute('alt')).strip()
+                if country_code:
+                    card_data["Team_2_Country"] = country_code
+            
+            # Check if Team 2 is winner
+            team2_winner_dot = await team2_wrapper.query_selector('div.winner-dot')
+            card_data["Team_2_Winner"] = team2_winner_dot is not None
+
+        # Determine overall winner
+        if card_data.get("Team_1_Winner"):
+            card_data["Winner"] = 1
+        elif card_data.get("Team_2_Winner"):
+            card_data["Winner"] = 2
+        else:
+            card_data["Winner"] = 0
+
+        # Scores
+        score_sets = await card.query_selector_all('div.game-score-set')
+        scores = []
+        for set_el in score_sets:
+            points = await set_el.query_selector_all('span.set-points')
+            if len(points) == 2:
+                score = f"{(await points[0].inner_text()).strip()}-{(await points[1].inner_text()).strip()}"
+                scores.append(score)
+        if scores:
+            card_data["Scores"] = scores
+
+        # Schedule
+        schedule_el = await card.query_selector('div.schedule-module')
+        if schedule_el:
+            date = await schedule_el.query_selector('span:nth-child(1)')
+            status = await schedule_el.query_selector('span.schedule-status')
+            time = await schedule_el.query_selector('span.schedule-date')
+            if date:
+                card_data["Date"] = (await date.inner_text()).strip()
+            if status:
+                card_data["Status"] = (await status.inner_text()).strip()
+            if time:
+                card_data["Time"] = (await time.inner_text()).strip()
+
+        # Footer Details and Stadium
+        footer_labels = await card.query_selector_all('span.footer-label')
+        for i, label in enumerate(footer_labels):
+            label_text = (await label.inner_text()).strip()
+            if i == 0:
+                card_data["Category"] = label_text
+            elif i == 1:
+                card_data["Round"] = label_text
+            elif i == 2:
+                card_data["Court"] = label_text
+
+        # Extract Stadium from court-header
+        court_header = await card.query_selector('xpath=ancestor::div[contains(@class, "court-wrapper")]//div[contains(@class, "court-header")]')
+        if court_header:
+            stadium_el = await court_header.query_selector('span.venue-name')
+            if stadium_el:
+                stadium_name = (await stadium_el.inner_text()).strip()
+                if stadium_name:
+                    card_data["Stadium"] = stadium_name
+
+        duration = await card.query_selector('span.footer-match-time')
+        if duration:
+            card_data["Duration"] = (await duration.inner_text()).strip()
+
+        cards.append(card_data)
+    return cards
+
+
+def save_match_cards(page_title, cards, output_dir, timestamp, id="01", result_file="match"):
+    """Add the processed page title and tournament id to each card and save them as match_*.json."""
+    match_card_data = [{"Tour": page_title, "id": id, **normalise_card_text(card)} for card in cards]
+
+    output_file = f"{output_dir}/{result_file}_{id}_{timestamp}.json"
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(match_card_data, f, indent=2)
+    print(f"Match card text saved to {output_file}")
+    return match_card_data
+
+
+async def extract_match_card_text(page, output_dir, timestamp, id = "01", result_file="match", bulk=None):
+    """Extract structured text from match-card elements and save to JSON with processed page title in each card.
+
+    By default all cards are read with one page.evaluate call; bulk=False (or a failing
+    bulk script) uses the per-element path, which produces the same structure.
+    """
+    bulk = BULK_EXTRACTION if bulk is None else bulk
     try:
         # Extract and process page title
         full_title = (await page.title()).strip()
         # Split on " | " and take the second part; fallback to full title if no delimiter
         page_title = full_title.split(" | ")[1].strip() if " | " in full_title else full_title
 
-        match_cards = await page.query_selector_all('div.match-card')
-        if not match_cards:
+        cards = None
+        if bulk:
+            try:
+                cards = await collect_match_cards_bulk(page)
+            except Exception as e:
+                print(f"Bulk match card extraction failed, falling back to per-element: {str(e)}")
+
+        if cards is None:
+            match_cards = await page.query_selector_all('div.match-card')
+            cards = await collect_match_cards_per_element(match_cards) if match_cards else []
+
+        if not cards:
             print("No match cards found.")
             html_content = await page.content()
             with open(f"{output_dir}/debug_page_{timestamp}.html", "w", encoding="utf-8") as f:
                 f.write(html_content)
             return None
 
-        match_card_data = []
-        for card in match_cards:
-            card_data = {}
-
-            # Add processed page title to card data
-            card_data["Tour"] = page_title
-            card_data["id"] = id
-
-            # Match Name
-            match_name_el = await card.query_selector('span.match-name')
-            if match_name_el:
-                match_name = (await match_name_el.inner_text()).strip()
-                card_data["Match_Name"] = match_name
-
-            # Team 1 Players and Country
-            team1_wrapper = await card.query_selector('div.participant-wrapper:nth-child(1)')
-            if team1_wrapper:
-                players = await team1_wrapper.query_selector_all('a.participant-name')
-                player_names = [(await p.inner_text()).strip() for p in players]
-                if player_names:
-                    card_data["Team_1_Players"] = player_names
-                seeding = await team1_wrapper.query_selector('span')
-                if seeding:
-                    seeding_text = (await seeding.inner_text()).strip()
-                    if seeding_text:
-                        card_data["Team_1_Seeding"] = seeding_text
-                # Extract Team 1 Country
-                team1_flag = await team1_wrapper.query_selector('div.flags-wrapper img')
-                if team1_flag:
-                    country_code = (await team1_flag.get_attribute('alt')).strip()
-                    if country_code:
-                        card_data["Team_1_Country"] = country_code
-                
-                # Check if Team 1 is winner
-                team1_winner_dot = await team1_wrapper.query_selector('div.winner-dot')
-                card_data["Team_1_Winner"] = team1_winner_dot is not None
-
-            # Separator
-            separator_el = await card.query_selector('div.separator')
-            if separator_el:
-                separator = (await separator_el.inner_text()).strip()
-                card_data["Separator"] = separator
-
-            # Team 2 Players and Country
-            team2_wrapper = await card.query_selector('div.participant-wrapper:nth-child(3)')
-            if team2_wrapper:
-                players = await team2_wrapper.query_selector_all('a.participant-name')
-                player_names = [(await p.inner_text()).strip() for p in players]
-                if player_names:
-                    card_data["Team_2_Players"] = player_names
-                # Extract Team 2 Country
-                team2_flag = await team2_wrapper.query_selector('div.flags-wrapper img')
-                if team2_flag:
-                    country_code = (await team2_flag.get_attribute('alt')).strip()
-                    if country_code:
-                        card_data["Team_2_Country"] = country_code
-                
-                # Check if Team 2 is winner
-                team2_winner_dot = await team2_wrapper.query_selector('div.winner-dot')
-                card_data["Team_2_Winner"] = team2_winner_dot is not None
-
-            # Determine overall winner
-            if card_data.get("Team_1_Winner"):
-                card_data["Winner"] = 1
-            elif card_data.get("Team_2_Winner"):
-                card_data["Winner"] = 2
-            else:
-                card_data["Winner"] = 0
-
-            # Scores
-            score_sets = await card.query_selector_all('div.game-score-set')
-            scores = []
-            for set_el in score_sets:
-                points = await set_el.query_selector_all('span.set-points')
-                if len(points) == 2:
-                    score = f"{(await points[0].inner_text()).strip()}-{(await points[1].inner_text()).strip()}"
-                    scores.append(score)
-            if scores:
-                card_data["Scores"] = scores
-
-            # Schedule
-            schedule_el = await card.query_selector('div.schedule-module')
-            if schedule_el:
-                date = await schedule_el.query_selector('span:nth-child(1)')
-                status = await schedule_el.query_selector('span.schedule-status')
-                time = await schedule_el.query_selector('span.schedule-date')
-                if date:
-                    card_data["Date"] = (await date.inner_text()).strip()
-                if status:
-                    card_data["Status"] = (await status.inner_text()).strip()
-                if time:
-                    card_data["Time"] = (await time.inner_text()).strip()
-
-            # Footer Details and Stadium
-            footer_labels = await card.query_selector_all('span.footer-label')
-            for i, label in enumerate(footer_labels):
-                label_text = (await label.inner_text()).strip()
-                if i == 0:
-                    card_data["Category"] = label_text
-                elif i == 1:
-                    card_data["Round"] = label_text
-                elif i == 2:
-                    card_data["Court"] = label_text
-
-            # Extract Stadium from court-header
-            court_header = await card.query_selector('xpath=ancestor::div[contains(@class, "court-wrapper")]//div[contains(@class, "court-header")]')
-            if court_header:
-                stadium_el = await court_header.query_selector('span.venue-name')
-                if stadium_el:
-                    stadium_name = (await stadium_el.inner_text()).strip()
-                    if stadium_name:
-                        card_data["Stadium"] = stadium_name
-
-            duration = await card.query_selector('span.footer-match-time')
-            if duration:
-                card_data["Duration"] = (await duration.inner_text()).strip()
-
-            if card_data:
-                match_card_data.append(card_data)
-
-        if not match_card_data:
-            print("No data extracted from match cards.")
-            return None
-
-        output_file = f"{output_dir}/{result_file}_{id}_{timestamp}.json"
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(match_card_data, f, indent=2)
-        print(f"Match card text saved to {output_file}")
-        return match_card_data
+        return save_match_cards(page_title, cards, output_dir, timestamp, id, result_file)
 
     except Exception as e:
         print(f"Failed to extract match card text: {str(e)}")
@@ -268,105 +389,200 @@ async def extract_match_card_text(page, output_dir, timestamp, id = "01", result
         return None
     
 
-async def extract_calendar(page, output_dir, timestamp):
-    """Extract structured text from tournament-card elements and save to JSON with processed page title."""
+# Reads the whole div.tournamentList in one round trip, resolving month headers in-page.
+# Keys and order mirror collect_calendar_per_element so calendar_*.json is unchanged.
+CALENDAR_JS = """
+(pageTitle) => {
+    const list = document.querySelector('div.tournamentList');
+    if (!list) return null;
+    const text = (el) => el ? el.innerText.trim() : null;
+    const attr = (el, name) => {
+        const value = el ? el.getAttribute(name) : null;
+        return value === null ? null : value.trim();
+    };
+    const setAttr = (data, key, el, name) => {
+        const value = attr(el, name);
+        if (value !== null) data[key] = value;
+    };
+
+    const tournaments = [];
+    let currentMonth = null;
+    list.querySelectorAll('h2.title-nolink, div.tmt-card-wrapper').forEach((element) => {
+        if (element.classList.contains('title-nolink')) {
+            currentMonth = text(element);
+            return;
+        }
+
+        const data = {};
+        if (currentMonth) data.Month = currentMonth;
+        data.Tour = pageTitle;
+
+        setAttr(data, 'Link', element.querySelector('a'), 'href');
+        setAttr(data, 'Logo_URL', element.querySelector('div.logo-wrapper img'), 'src');
+
+        const details = element.querySelector('div.tmt-details');
+        if (details) {
+            const date = details.querySelector('div.date span');
+            if (date) data.Date = text(date);
+            const name = details.querySelector('span.name');
+            if (name) data.Tournament_Name = text(name);
+            const country = details.querySelector('div.country');
+            if (country) {
+                data.Location = text(country);
+                setAttr(data, 'Country', country.querySelector('img'), 'alt');
+            }
+            const labels = details.querySelector('div.labels[style*="margin-top"]');
+            if (labels) {
+                const category = labels.querySelector('div.label-category');
+                if (category) data.Category = text(category);
+                const prize = labels.querySelector('div.prize-money');
+                if (prize) data.Prize_Money = text(prize);
+            }
+            setAttr(data, 'Category_Logo_URL', details.querySelector('div.category-logo img'), 'src');
+        }
+
+        setAttr(data, 'Header_Image_Desktop_URL', element.querySelector('div.header-img img.header-img-desktop'), 'src');
+        setAttr(data, 'Header_Image_Mobile_URL', element.querySelector('div.header-img img.header-img-mobile'), 'src');
+
+        const etihad = element.querySelector('a.etihad-logo');
+        if (etihad) setAttr(data, 'Etihad_Logo_URL', etihad.querySelector('img'), 'src');
+
+        tournaments.push(data);
+    });
+    return tournaments;
+}
+"""
+
+
+async def collect_calendar_bulk(page, page_title):
+    """Serialise the tournament list with a single page.evaluate call. Returns None if the list is missing."""
+    return await page.evaluate(CALENDAR_JS, page_title)
+
+
+async def collect_calendar_per_element(tournament_list, page_title):
+    """Extract tournament cards with one Playwright call per element (fallback and comparison path)."""
+    # Initialize data structure
+    tournament_data = []
+    current_month = None
+
+    # Select all elements within tournamentList
+    elements = await tournament_list.query_selector_all('h2.title-nolink, div.tmt-card-wrapper')
+
+    for element in elements:
+        # Check if the element is a month header
+        if await element.evaluate('el => el.classList.contains("title-nolink")'):
+            current_month = (await element.inner_text()).strip()
+            continue
+
+        # Process tournament card
+        card_data = {"Month": current_month} if current_month else {}
+        card_data["Tour"] = page_title
+
+        # Extract link
+        link_el = await element.query_selector('a')
+        if link_el:
+            card_data["Link"] = (await link_el.get_attribute('href')).strip()
+
+        # Extract tournament logo
+        logo_el = await element.query_selector('div.logo-wrapper img')
+        if logo_el:
+            card_data["Logo_URL"] = (await logo_el.get_attribute('src')).strip()
+
+        # Extract tournament details
+        details_el = await element.query_selector('div.tmt-details')
+        if details_el:
+            # Date
+            date_el = await details_el.query_selector('div.date span')
+            if date_el:
+                card_data["Date"] = (await date_el.inner_text()).strip()
+
+            # Tournament Name
+            name_el = await details_el.query_selector('span.name')
+            if name_el:
+                card_data["Tournament_Name"] = (await name_el.inner_text()).strip()
+
+            # Country and City
+            country_el = await details_el.query_selector('div.country')
+            if country_el:
+                country_text = (await country_el.inner_text()).strip()
+                card_data["Location"] = country_text
+                country_img = await country_el.query_selector('img')
+                if country_img:
+                    card_data["Country"] = (await country_img.get_attribute('alt')).strip()
+
+            # Category and Prize Money
+            labels_el = await details_el.query_selector('div.labels[style*="margin-top"]')
+            if labels_el:
+                category_el = await labels_el.query_selector('div.label-category')
+                if category_el:
+                    card_data["Category"] = (await category_el.inner_text()).strip()
+                prize_el = await labels_el.query_selector('div.prize-money')
+                if prize_el:
+                    card_data["Prize_Money"] = (await prize_el.inner_text()).strip()
+
+            # Category Logo
+            category_logo_el = await details_el.query_selector('div.category-logo img')
+            if category_logo_el:
+                card_data["Category_Logo_URL"] = (await category_logo_el.get_attribute('src')).strip()
+
+        # Extract header images
+        header_img_desktop = await element.query_selector('div.header-img img.header-img-desktop')
+        if header_img_desktop:
+            card_data["Header_Image_Desktop_URL"] = (await header_img_desktop.get_attribute('src')).strip()
+
+        header_img_mobile = await element.query_selector('div.header-img img.header-img-mobile')
+        if header_img_mobile:
+            card_data["Header_Image_Mobile_URL"] = (await header_img_mobile.get_attribute('src')).strip()
+
+        # Extract Etihad logo link if present
+        etihad_el = await element.query_selector('a.etihad-logo')
+        if etihad_el:
+            etihad_img = await etihad_el.query_selector('img')
+            if etihad_img:
+                card_data["Etihad_Logo_URL"] = (await etihad_img.get_attribute('src')).strip()
+
+        if card_data:
+            tournament_data.append(card_data)
+
+    return tournament_data
+
+
+async def extract_calendar(page, output_dir, timestamp, bulk=None):
+    """Extract structured text from tournament-card elements and save to JSON with processed page title.
+
+    By default the whole list is read with one page.evaluate call; bulk=False (or a
+    failing bulk script) uses the per-element path, which produces the same structure.
+    """
+    bulk = BULK_EXTRACTION if bulk is None else bulk
     try:
         # Extract and process page title
         full_title = (await page.title()).strip()
         # Split on " | " and take the second part; fallback to full title if no delimiter
         page_title = full_title.split(" | ")[1].strip() if " | " in full_title else full_title
 
-        # Select the tournamentList container
-        tournament_list = await page.query_selector('div.tournamentList')
-        if not tournament_list:
-            print("No tournament list found.")
-            html_content = await page.content()
-            with open(f"{output_dir}/debug_page_{timestamp}.html", "w", encoding="utf-8") as f:
-                f.write(html_content)
-            return None
-
-        # Initialize data structure
-        tournament_data = []
-        current_month = None
-
-        # Select all elements within tournamentList
-        elements = await tournament_list.query_selector_all('h2.title-nolink, div.tmt-card-wrapper')
-
-        for element in elements:
-            # Check if the element is a month header
-            if await element.evaluate('el => el.classList.contains("title-nolink")'):
-                current_month = (await element.inner_text()).strip()
-                continue
-
-            # Process tournament card
-            card_data = {"Month": current_month} if current_month else {}
-            card_data["Tour"] = page_title
-
-            # Extract link
-            link_el = await element.query_selector('a')
-            if link_el:
-                card_data["Link"] = (await link_el.get_attribute('href')).strip()
-
-            # Extract tournament logo
-            logo_el = await element.query_selector('div.logo-wrapper img')
-            if logo_el:
-                card_data["Logo_URL"] = (await logo_el.get_attribute('src')).strip()
-
-            # Extract tournament details
-            details_el = await element.query_selector('div.tmt-details')
-            if details_el:
-                # Date
-                date_el = await details_el.query_selector('div.date span')
-                if date_el:
-                    card_data["Date"] = (await date_el.inner_text()).strip()
-
-                # Tournament Name
-                name_el = await details_el.query_selector('span.name')
-                if name_el:
-                    card_data["Tournament_Name"] = (await name_el.inner_text()).strip()
-
-                # Country and City
-                country_el = await details_el.query_selector('div.country')
-                if country_el:
-                    country_text = (await country_el.inner_text()).strip()
-                    card_data["Location"] = country_text
-                    country_img = await country_el.query_selector('img')
-                    if country_img:
-                        card_data["Country"] = (await country_img.get_attribute('alt')).strip()
-
-                # Category and Prize Money
-                labels_el = await details_el.query_selector('div.labels[style*="margin-top"]')
-                if labels_el:
-                    category_el = await labels_el.query_selector('div.label-category')
-                    if category_el:
-                        card_data["Category"] = (await category_el.inner_text()).strip()
-                    prize_el = await labels_el.query_selector('div.prize-money')
-                    if prize_el:
-                        card_data["Prize_Money"] = (await prize_el.inner_text()).strip()
-
-                # Category Logo
-                category_logo_el = await details_el.query_selector('div.category-logo img')
-                if category_logo_el:
-                    card_data["Category_Logo_URL"] = (await category_logo_el.get_attribute('src')).strip()
-
-            # Extract header images
-            header_img_desktop = await element.query_selector('div.header-img img.header-img-desktop')
-            if header_img_desktop:
-                card_data["Header_Image_Desktop_URL"] = (await header_img_desktop.get_attribute('src')).strip()
-
-            header_img_mobile = await element.query_selector('div.header-img img.header-img-mobile')
-            if header_img_mobile:
-                card_data["Header_Image_Mobile_URL"] = (await header_img_mobile.get_attribute('src')).strip()
-
-            # Extract Etihad logo link if present
-            etihad_el = await element.query_selector('a.etihad-logo')
-            if etihad_el:
-                etihad_img = await etihad_el.query_selector('img')
-                if etihad_img:
-                    card_data["Etihad_Logo_URL"] = (await etihad_img.get_attribute('src')).strip()
-
-            if card_data:
-                tournament_data.append(card_data)
+        tournament_data = None
+        if bulk:
+            try:
+                tournament_data = await collect_calendar_bulk(page, page_title)
+                if tournament_data is None:
+                    print("No tournament list found.")
+                    html_content = await page.content()
+                    with open(f"{output_dir}/debug_page_{timestamp}.html", "w", encoding="utf-8") as f:
+                        f.write(html_content)
+                    return None
+            except Exception as e:
+                print(f"Bulk calendar extraction failed, falling back to per-element: {str(e)}")
+
+        if tournament_data is None:
+            # Select the tournamentList container
+            tournament_list = await page.query_selector('div.tournamentList')
+            if not tournament_list:
+                print("No tournament list found.")
+                html_content = await page.content()
+                with open(f"{output_dir}/debug_page_{timestamp}.html", "w", encoding="utf-8") as f:
+                    f.write(html_content)
+                return None
+            tournament_data = await collect_calendar_per_element(tournament_list, page_title)
 
         if not tournament_data:
             print("No data extracted from tournament cards.")
@@ -465,65 +681,190 @@ async def scrape_ranking_options(page, output_dir, timestamp):
         await save_screenshot(page, output_dir, timestamp, suffix="_error")
         return None
 
-async def match_card_text(url, id = "01", output = 'output', saving = False):
+async def match_card_text(url, id = "01", output = 'output', saving = False, fast = None):
+    """Scrape one results day page. Tries plain HTTP first (fast path) and falls back to the browser."""
+    fast = HTTP_FAST_PATH if fast is None else fast
+    match_card_data = None
+
+    if fast:
+        fetched = await fetch_match_cards(url)
+        if fetched:
+            page_title, cards = fetched
+            os.makedirs(output, exist_ok=True)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            match_card_data = save_match_cards(page_title, cards, output, timestamp, id)
+
+    if match_card_data is None:
+        p, browser, context, page, timestamp = await prepare_page(url)
+        if not page:
+            print("Preparation failed, cannot proceed with scraping.")
+            return
+
+        try:
+            await switch_to_list_view(page)
+            await save_html_content(page, output, timestamp, "listview")
+            await save_screenshot(page, output, timestamp, "listview")
+            match_card_data = await extract_match_card_text(page, output, timestamp, id)
+        finally:
+            await release_page(page, context)
+
+    # Load scraped data into Supabase
+    if saving and OUTBOX:
+        # Hanya baris dari halaman ini yang masuk outbox; loader di latar belakang yang mengirimnya
+        rows = [row for row, _ in map(build_bwf_tour_row, match_card_data or []) if row]
+        print(f"Queued {enqueue_rows('bwf_tour', rows)} matches for Supabase")
+        start_outbox_loader()
+    elif saving:
+        # result = await save_tour_to_supabase("output")
+        result = await bwf_tour_to_supabase(output)
+        print(f"Supabase insertion result: {result['message']}")
+    return match_card_data
+
+async def check_fast_path(url, output="output"):
+    """
+    Scrape url over plain HTTP and in the browser (List View) and print where the cards differ.
+
+    Both pages are kept in output/fastcheck (server_*.html, listview_*.html) for a closer look;
+    no match_*.json is written, so the loaders never pick up the comparison.
+    """
+    check_dir = os.path.join(output, "fastcheck")
+    os.makedirs(check_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    fetched = await fetch_match_cards(url, os.path.join(check_dir, f"server_{timestamp}.html"))
+    if fetched is None:
+        print("HTTP fetch gave no match cards; the fast path would fall back to the browser for this page.")
+        return None
+
+    p, browser, context, page, _ = await prepare_page(url)
+    if not page:
+        print("Preparation failed, cannot proceed with scraping.")
+        return None
+    try:
+        await switch_to_list_view(page)
+        await save_html_content(page, check_dir, timestamp, "listview")
+        browser_cards = await read_match_cards(page, None)
+    finally:
+        await release_page(page, context)
+    if not browser_cards:
+        print("Browser path gave no match cards, nothing to compare.")
+        return None
+
+    browser_cards = [{k: v for k, v in card.items() if k not in ("Tour", "id")} for card in browser_cards]
+    differences = compare_card_lists(browser_cards, fetched[1])
+    for difference in differences[:50]:
+        print(difference)
+    print(f"Browser {len(browser_cards)} cards, HTTP {len(fetched[1])} cards, {len(differences)} differences")
+    return differences
+
+async def read_match_cards(page, id):
+    """Read the cards on an open results page (same shape as match_*.json) without saving files."""
+    full_title = (await page.title()).strip()
+    page_title = full_title.split(" | ")[1].strip() if " | " in full_title else full_title
+    try:
+        cards = await collect_match_cards_bulk(page)
+    except Exception as e:
+        print(f"Bulk match card extraction failed, falling back to per-element: {str(e)}")
+        cards = await collect_match_cards_per_element(await page.query_selector_all('div.match-card'))
+    return [{"Tour": page_title, "id": id, **normalise_card_text(card)} for card in cards]
+
+async def reload_live_page(page, delay):
+    """Wait delay seconds, then reload the page in List View. Returns False when the reload failed."""
+    print(f"Next refresh in {delay:.0f} s")
+    await asyncio.sleep(delay)
+    try:
+        await page.reload(wait_until="domcontentloaded")
+    except Exception as e:
+        print(f"Reload failed, retrying: {str(e)}")
+        return False
+    await switch_to_list_view(page)
+    try:
+        await page.wait_for_selector('div.match-card', timeout=30000)
+    except Exception:
+        print("No match cards after refresh, retrying on the next poll.")
+    return True
+
+async def live_match_day(url, id = "01", saving = True, max_polls = None):
+    """
+    Keep a results day page open and re-read it on an adaptive interval.
+
+    Polls every LIVE_INTERVAL_MIN_SECONDS while a card is in progress or scores
+    changed, backs off up to LIVE_INTERVAL_MAX_SECONDS otherwise, and stops once
+    every match on the day is final, the day has passed, max_polls is reached or
+    the page failed to reload LIVE_MAX_RELOAD_FAILURES times in a row. Only
+    matches that changed since the previous poll are sent to Supabase.
+    """
     p, browser, context, page, timestamp = await prepare_page(url)
     if not page:
         print("Preparation failed, cannot proceed with scraping.")
-        if p:
-            await p.stop()
         return
 
+    supabase = get_supabase_client() if saving else None
+    key_fields = TOUR_CONFLICT_KEY.split(",")
+    previous = {}
+    interval = LIVE_INTERVAL_MIN_SECONDS
+    polls = 0
+    reload_failures = 0
+    day = day_of_url(url)
+
     try:
         await switch_to_list_view(page)
-        await save_html_content(page, output, timestamp, "listview")
-        await save_screenshot(page, output, timestamp, "listview")
-        await extract_match_card_text(page, output, timestamp, id)
-        # Load scraped data into Supabase
-        if saving:
-            # result = await save_tour_to_supabase("output")
-            result = await bwf_tour_to_supabase(output)
-            print(f"Supabase insertion result: {result['message']}")
+        while True:
+            match_card_data = await read_match_cards(page, id)
+            rows = [row for row, _ in map(build_bwf_tour_row, match_card_data) if row]
+            current = {row_key(row, key_fields): row_hash(row) for row in rows}
+            changed = [row for row in rows if previous.get(row_key(row, key_fields)) != current[row_key(row, key_fields)]]
+            previous = current
+
+            if changed and supabase:
+                result = await asyncio.to_thread(
+                    upsert_changed_rows, supabase, "bwf_tour", changed, TOUR_CONFLICT_KEY, tour_scope
+                )
+                print(f"Live: {result['inserted']} matches upserted, {result['failed']} failed")
+
+            state = day_state(match_card_data)
+            polls += 1
+            print(f"Live poll {polls}: {len(match_card_data)} cards, {len(changed)} changed, day {state}")
+            if state == "final":
+                record_day(id, url, match_card_data)
+                print("All matches on this day are final, leaving live mode.")
+                break
+            if day_has_passed(day):
+                print(f"{day} has passed with unfinished matches, leaving live mode.")
+                break
+            if max_polls and polls >= max_polls:
+                break
+
+            interval = next_interval(interval, state, bool(changed))
+            while not await reload_live_page(page, interval):
+                reload_failures += 1
+                if reload_failures >= LIVE_MAX_RELOAD_FAILURES:
+                    print(f"Page failed to reload {reload_failures} times in a row, leaving live mode.")
+                    return
+                interval = next_interval(interval, state, False)
+            reload_failures = 0
     finally:
-        if page:
-            await page.close()
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if p:
-            await p.stop()
+        await release_page(page, context)
 
 async def do_extract_calendar(url):
     p, browser, context, page, timestamp = await prepare_page(url)
     if not page:
         print("Preparation failed, cannot proceed with scraping.")
-        if p:
-            await p.stop()
         return
 
     try:
         await save_html_content(page, "output", timestamp, "calendar")
         await save_screenshot(page, "output", timestamp, "calendar")
-        await extract_calendar(page, "output", timestamp)
+        return await extract_calendar(page, "output", timestamp)
         # Load scraped data into Supabase
         # result = await save_tour_to_supabase("output")
         # print(f"Supabase insertion result: {result['message']}")
     finally:
-        if page:
-            await page.close()
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if p:
-            await p.stop()
+        await release_page(page, context)
 
 async def schedule_links(url, id):
     p, browser, context, page, timestamp = await prepare_page(url)
     if not page:
         print("Preparation failed, cannot proceed with scraping.")
-        if p:
-            await p.stop()
         return
 
     try:
@@ -532,14 +873,7 @@ async def schedule_links(url, id):
         links = await extract_schedule_links(page, "output", id)
         return links
     finally:
-        if page:
-            await page.close()
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if p:
-            await p.stop()
+        await release_page(page, context)
 
 
 async def loop_schedule_links(prefix="schedule_links", folder="input"):
@@ -567,35 +901,29 @@ async def loop_schedule_links(prefix="schedule_links", folder="input"):
         except json.JSONDecodeError as e:
             raise ValueError(f"Gagal membaca file JSON: {e}")
     
-    # Buat task untuk setiap URL
-    tasks = [schedule_links(url) for url in urls]
-    results = await asyncio.gather(*tasks)
+    # Proses setiap URL dengan jumlah browser page yang dibatasi
+    id = extract_number_from_filename(json_filename)
+    results = await run_bounded(urls, lambda url: schedule_links(url, id))
     return results
 
 
-async def get_schedule_links(urls, ids):
+async def get_schedule_links(urls, ids, workers=None):
     """
-    Menjalankan schedule_links secara sequential (satu per satu) untuk setiap URL.
+    Menjalankan schedule_links secara paralel dengan jumlah worker terbatas untuk setiap URL.
     
     Args:
         urls: List berisi URL yang akan diproses
+        ids: List berisi ID turnamen untuk setiap URL
+        workers: Jumlah worker maksimum (default: SCRAPE_WORKERS)
         
     Returns:
-        List berisi hasil dari setiap URL
+        List berisi hasil dari setiap URL (None jika gagal)
     """
-    results = []
-    
-    i = 0
-    for url in urls:
-        try:
-            result = await schedule_links(url, ids[i])
-            results.append(result)
-            i = i+1
-        except Exception as e:
-            print(f"Error processing URL {url}: {e}")
-            results.append(None)  # atau bisa append error message
-    
-    return results
+    return await run_bounded(
+        list(zip(urls, ids)),
+        lambda item: schedule_links(item[0], item[1]),
+        workers=workers
+    )
 
 
 
@@ -629,7 +957,14 @@ async def loop_files_schedule(prefix="schedule_links", folder="input"):
     return "dummy"
 
 
-async def process_schedule_json():
+async def scrape_and_record_day(url, id):
+    """Scrape one day and note in the completion index whether all its matches are final."""
+    match_card_data = await match_card_text(url, id)
+    record_day(id, url, match_card_data)
+    return match_card_data
+
+
+async def process_schedule_json(workers=None, memory_budget_mb=None, resume=False, force=False):
     # Mendapatkan daftar semua file JSON di folder input/schedule
     json_files = glob.glob(os.path.join("input", "schedule", "*.json"))
     
@@ -638,6 +973,7 @@ async def process_schedule_json():
         return
     
     print("\nMemproses file JSON:")
+    units = []
     for json_file in json_files:
         # Mendapatkan nama file dari path
         filename = os.path.basename(json_file)
@@ -648,16 +984,143 @@ async def process_schedule_json():
         
         # Baca isi file JSON
         urls = read_json_list(os.path.join("input", "schedule"), filename)
-        
-        # Proses setiap URL dalam file JSON
-        print("Hasil pemrosesan:")
-        for url in urls:
-            print(url)
-            await match_card_text(url, id)
+        units.extend((url, id) for url in urls)
+    
+    # Hari yang semua pertandingannya sudah selesai tidak di-scrape ulang, kecuali force=True
+    units, skipped = skip_final_days(units, force)
+    if skipped:
+        print(f"Melewati {len(skipped)} hari yang sudah final (gunakan --force untuk scrape ulang)")
+
+    # Status tiap URL dicatat di run manifest; resume=True melewati URL yang sudah selesai
+    ids = dict(units)
+    todo = plan_units("process_schedule_json", [url for url, _ in units], resume)
+
+    # Proses semua URL dari semua file dengan jumlah worker terbatas
+    print("Hasil pemrosesan:")
+    await run_bounded(
+        todo,
+        lambda url: run_unit(
+            "process_schedule_json", url,
+            lambda: scrape_and_record_day(url, ids[url]),
+            describe=lambda data: f"{len(data)} matches in output/"
+        ),
+        workers=workers,
+        memory_budget_mb=memory_budget_mb
+    )
+    print(f"Run manifest: {run_summary('process_schedule_json')}")
+
+async def synthesise_schedule_links(verify_fraction=0.0, folder="input/schedule"):
+    """
+    Tulis schedule_links_<id>.json dari input/calendar.json tanpa browser.
 
-async def save_rank_supabase(folder = "output_rank", week = "20"):
-    # Mendapatkan daftar semua file JSON di folder input/schedule
-    json_files = glob.glob(os.path.join(folder, "rank*.json"))
+    Entri dengan format Link lain diambil lewat browser; verify_fraction dari entri
+    yang disintesis dicek ulang dengan browser dan ditimpa jika berbeda.
+    """
+    calendar = read_json_list("input", "calendar.json")
+    written, unresolved = write_schedule_links(calendar, folder)
+
+    for entry in unresolved:
+        links = await schedule_links(entry["Link"], entry["id"])
+        if links:
+            with open(os.path.join(folder, f"schedule_links_{entry['id']}.json"), "w", encoding="utf-8") as f:
+                json.dump(links, f, indent=2)
+
+    for entry in sample_entries(calendar, verify_fraction):
+        scraped = await schedule_links(entry["Link"], entry["id"])
+        if not scraped:
+            continue
+        missing, extra = compare_day_urls(schedule_day_urls(entry), scraped)
+        if missing or extra:
+            print(f"Schedule links for {entry['id']} differ from the page (missing {missing}, extra {extra}), using the page.")
+            with open(os.path.join(folder, f"schedule_links_{entry['id']}.json"), "w", encoding="utf-8") as f:
+                json.dump(scraped, f, indent=2)
+        else:
+            print(f"Schedule links for {entry['id']} verified.")
+    return written
+
+async def run_pipeline(calendar_url=None, workers=None, memory_budget_mb=None, saving=True):
+    """
+    Season refresh as overlapping stages connected by bounded queues:
+    calendar -> schedule links -> match days -> Supabase loader.
+
+    Without calendar_url the tournaments come from input/calendar.json. Browser
+    pages are split between the schedule-link and match stages within the memory
+    budget, and the loader upserts changed rows in chunks while scraping continues.
+    """
+    tournaments = asyncio.Queue(PIPELINE_QUEUE_SIZE)
+    days = asyncio.Queue(PIPELINE_QUEUE_SIZE)
+    records = asyncio.Queue(PIPELINE_QUEUE_SIZE)
+
+    page_workers = effective_workers(workers, memory_budget_mb)
+    link_workers = max(1, page_workers // 4)
+    match_workers = max(1, page_workers - link_workers)
+    print(f"Pipeline: {link_workers} schedule workers, {match_workers} match workers.")
+
+    async def feed_calendar():
+        if calendar_url:
+            calendar = await do_extract_calendar(calendar_url) or []
+            # Sama seperti add_id_to_json: id mulai dari 10, naik 10
+            for index, item in enumerate(calendar):
+                item.setdefault("id", 10 + index * 10)
+        else:
+            calendar = read_json_list("input", "calendar.json")
+        for item in calendar:
+            if item.get("Link"):
+                await tournaments.put(item)
+        for _ in range(link_workers):
+            await tournaments.put(None)
+
+    async def find_days(item):
+        entry = item
+        # URL hari dihitung dari Link + Date; browser hanya jika formatnya tidak dikenali
+        links = schedule_day_urls(entry)
+        if links is None:
+            links = await schedule_links(entry["Link"], entry["id"]) or []
+        return [(url, entry["id"]) for url in links if "podium" not in url]
+
+    async def scrape_day(item):
+        url, id = item
+        match_card_data = await match_card_text(url, id)
+        rows = [row for row, _ in map(build_bwf_tour_row, match_card_data or []) if row]
+        return [rows] if rows else []
+
+    async def load_records():
+        supabase = get_supabase_client() if saving else None
+        buffer = []
+        loaded = 0
+
+        async def flush():
+            nonlocal buffer, loaded
+            if buffer and supabase:
+                result = await asyncio.to_thread(
+                    upsert_changed_rows, supabase, "bwf_tour", buffer, TOUR_CONFLICT_KEY, tour_scope
+                )
+                loaded += result["inserted"]
+                print(f"Pipeline loader: {result['inserted']} upserted, {result['unchanged']} unchanged, {result['failed']} failed")
+            buffer = []
+
+        while True:
+            rows = await records.get()
+            if rows is None:
+                break
+            buffer.extend(rows)
+            if len(buffer) >= UPSERT_CHUNK_SIZE:
+                await flush()
+        await flush()
+        return loaded
+
+    results = await asyncio.gather(
+        feed_calendar(),
+        run_stage("Schedule links", tournaments, find_days, link_workers, days, match_workers),
+        run_stage("Match days", days, scrape_day, match_workers, records, 1),
+        load_records()
+    )
+    print(f"Pipeline finished: {results[3]} matches loaded.")
+    return results[3]
+
+async def save_rank_supabase(folder = "output_rank", week = "20", json_files = None):
+    # Mendapatkan daftar semua file JSON di folder input/schedule (atau hanya json_files)
+    json_files = json_files or glob.glob(os.path.join(folder, "rank_*.json"))
     
     if not json_files:
         print("Tidak ada file JSON ditemukan di folder input/schedule")
@@ -665,20 +1128,33 @@ async def save_rank_supabase(folder = "output_rank", week = "20"):
     
     print("\nMemproses file JSON:")
 
+    # Semua file dikumpulkan dulu, lalu di-upsert dalam chunk
+    ranks = []
     for json_file in json_files:
         # Mendapatkan nama file dari path
         print(f"\nMemproses file: {json_file}")
-        ranks = read_json_list('',json_file)
-        c = 0
-        # for rank in ranks:
-        #     c = c + 1
-        #     if c < 2:
-        #         print(rank)
-        result = insert_bwf_rankings_data(ranks, week)
-        print(f"\nResult: {result}")
+        ranks.extend(read_json_list('',json_file))
+
+    result = bulk_insert_bwf_rankings(ranks)
+    print(f"\nResult: {result['message']}")
+    for error in result.get("errors", []):
+        print(error)
         
 
 
+async def swap_rank_supabase(folder = "output_rank", json_files = None, only = None):
+    # File rank_*.json (atau hanya json_files) diganti per minggu/kategori secara atomik
+    ranks = []
+    for json_file in json_files or glob.glob(os.path.join(folder, "rank_*.json")):
+        ranks.extend(read_json_list('',json_file))
+
+    result = replace_bwf_rankings_week(ranks, only=only)
+    print(f"\nResult: {result['message']}")
+    for error in result.get("errors", []):
+        print(error)
+    return result
+
+
 async def main():
     if len(sys.argv) < 2:
         print("Gunakan: python gen.py [1|2|3|4|10|11]")
@@ -707,7 +1183,13 @@ async def main():
         print("\nHasil pemrosesan:")
         for h in urls:
             print(h)
-        await get_schedule_links(urls, ids)
+        workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+        await get_schedule_links(urls, ids, workers)
+
+    elif option == "3C":
+        # python gen.py 3C [verify_fraction] -> link jadwal dari calendar.json tanpa browser
+        verify_fraction = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+        await synthesise_schedule_links(verify_fraction)
 
     elif option == "4":
         url = "https://bwfworldtour.bwfbadminton.com/calendar/?cyear=2025&rstate=all"
@@ -734,8 +1216,21 @@ async def main():
             await match_card_text(h, id)
 
     elif option == "6":
-        await process_schedule_json()
-
+        # python gen.py 6 [workers] [memory_budget_mb] [--resume] [--force]
+        args = [arg for arg in sys.argv[2:] if arg not in ("--resume", "--force")]
+        workers = int(args[0]) if len(args) > 0 else None
+        memory_budget_mb = int(args[1]) if len(args) > 1 else None
+        await process_schedule_json(workers, memory_budget_mb, "--resume" in sys.argv[2:], "--force" in sys.argv[2:])
+
+
+    elif option == "pipeline":
+        # python gen.py pipeline [workers] [memory_budget_mb] [calendar]
+        # kalender -> link jadwal -> halaman hari -> Supabase, semua tahap berjalan bersamaan
+        args = [arg for arg in sys.argv[2:] if arg != "calendar"]
+        workers = int(args[0]) if len(args) > 0 else None
+        memory_budget_mb = int(args[1]) if len(args) > 1 else None
+        calendar_url = "https://bwfworldtour.bwfbadminton.com/calendar/?cyear=2025&rstate=all" if "calendar" in sys.argv[2:] else None
+        await run_pipeline(calendar_url, workers, memory_budget_mb)
 
     elif option == "10":  # SAVE TABLE TOUR KE SUPABASE
         result = await save_tour_to_supabase("output")
@@ -752,6 +1247,21 @@ async def main():
     elif option == "savetourall":  # SAVE TOUR KE SUPABASE
         result = await bwf_tour_to_supabase("output1")
         print(f"Supabase insertion result: {result['message']}")
+    elif option == "ingest":
+        # python gen.py ingest [folder] [in_flight] -> match_*, calendar_*, rank_* sekaligus
+        folder = sys.argv[2] if len(sys.argv) > 2 else "output"
+        in_flight = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        result = await ingest_directory(folder, in_flight=in_flight)
+        print(f"Supabase insertion result: {result['message']}")
+    elif option == "bench":
+        # python gen.py bench [rows] [latency_ms] -> loader benchmark tanpa jaringan (SQLite lokal)
+        rows = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+        latency_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 0
+        await benchmark_loaders(rows, latency_ms)
+    elif option == "drain":
+        # python gen.py drain -> kirim sisa outbox (misalnya setelah run yang crash)
+        result = await drain_outbox()
+        print(result["message"])
     elif option == "saveschedule":
         await bwf_schedule_to_supabase()
 
@@ -771,21 +1281,77 @@ async def main():
         print("Data input terbaru:", inp)
         dates = extract_date_from_string(inp["url"])
         print(dates)
-        response = await delete_bwf_tour(inp["id"], dates)
-        print(f"delete result: {response}")
-         # Panggil fungsi lain, jika perlu
-        await match_card_text(inp["url"], inp["id"], inp["output"], inp["saving"])
+        if TOUR_SYNC and inp["saving"]:
+            # Hanya selisih (insert/update/delete) terhadap data hari itu yang dikirim
+            match_card_data = await match_card_text(inp["url"], inp["id"], inp["output"], False)
+            rows = [row for row, _ in map(build_bwf_tour_row, match_card_data or []) if row]
+            result = sync_bwf_tour_day(inp["id"], dates, rows)
+            print(f"Supabase sync result: {result['message']}")
+        else:
+            response = await delete_bwf_tour(inp["id"], dates)
+            print(f"delete result: {response}")
+             # Panggil fungsi lain, jika perlu
+            await match_card_text(inp["url"], inp["id"], inp["output"], inp["saving"])
+
+    elif option == "fastcheck":
+        # python gen.py fastcheck [url] -> bandingkan hasil HTTP (tanpa browser) dengan List View di browser
+        url = sys.argv[2] if len(sys.argv) > 2 else (await get_match_input())["url"]
+        await check_fast_path(url)
+
+    elif option == "live":
+        # python gen.py live [url] [id] [max_polls] -> halaman hari tetap terbuka, skor diperbarui otomatis
+        if len(sys.argv) > 3:
+            max_polls = int(sys.argv[4]) if len(sys.argv) > 4 else None
+            await live_match_day(sys.argv[2], sys.argv[3], max_polls=max_polls)
+        else:
+            inp = await get_match_input()
+            await live_match_day(inp["url"], inp["id"], inp["saving"])
 
     elif option == "rank":
         inp = get_ranking_input()
         rank_option = rank_categories[int(inp["ranking_option"])]
-        await scrape_rank_by_week_new(inp["url"], rank_option, inp["output_dir"], inp["target_week"])
-        result = await delete_bwf_rankings_data(int(inp["target_week"]), int(inp["ranking_option"]))
-        # print(result)
-        await save_rank_supabase(inp["output_dir"], inp["target_week"])
+        # python gen.py rank capture -> baca data dari respons API widget peringkat
+        capture = len(sys.argv) > 2 and sys.argv[2] == "capture"
+        started = datetime.now().timestamp()
+        rankings = await scrape_rank_by_week_new(inp["url"], rank_option, inp["output_dir"], inp["target_week"], capture)
+
+        # Supabase hanya diubah jika kelima event minggu ini ter-scrape pada run ini
+        rank_files = rank_event_files(inp["output_dir"], rank_option, inp["target_week"])
+        missing = [f for f in rank_files if not os.path.exists(f) or os.path.getmtime(f) < started]
+        if not rankings or missing:
+            print(f"Scrape minggu {inp['target_week']} tidak lengkap ({len(missing)} dari {len(rank_files)} event hilang), Supabase tidak diubah.")
+            return
+
+        # Minggu baru di-stage dulu lalu di-swap sekaligus; RANKINGS_SWAP=0 -> hapus lalu insert seperti dulu
+        group = {(int(inp["target_week"]), RANK_CATEGORY_MAP.get(rank_option, -1))}
+        result = await swap_rank_supabase(inp["output_dir"], rank_files, group) if RANKINGS_SWAP else {"success": False}
+        if not result["success"]:
+            result = await delete_bwf_rankings_data(int(inp["target_week"]), int(inp["ranking_option"]))
+            # print(result)
+            await save_rank_supabase(inp["output_dir"], inp["target_week"], rank_files)
+
+    elif option == "rankfixture":
+        # python gen.py rankfixture <ranking_capture.json> <week> <event> <ranking_option>
+        if len(sys.argv) < 6:
+            print("Usage: python gen.py rankfixture <ranking_capture.json> <week> <event> <ranking_option>")
+            return
+        path, week, event_name, ranking_option = sys.argv[2:6]
+        rankings = parse_capture_file(path, week, event_name, ranking_option)
+        print(json.dumps(rankings[:3], indent=2, ensure_ascii=False))
+        print(f"Parsed {len(rankings)} ranking rows from {path}")
 
     else:
         print("Opsi tidak valid. Gunakan: 1, 2, atau 3")
 
+async def run():
+    try:
+        await main()
+    finally:
+        # Sisa outbox dikirim sebelum proses selesai
+        await stop_outbox_loader()
+        # Browser bersama dan HTTP client hanya ditutup sekali di akhir proses
+        await close_browser_pool()
+        await close_http_client()
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(run())
@@ -1,33 +1,317 @@
 from datetime import datetime
+from urllib.parse import urlparse
+import asyncio
 import os
+import time
 
-async def initialize_browser():
-    """Initialize Playwright browser with realistic context."""
+def _env_list(name, default):
+    """Read a comma-separated list from the environment."""
+    return [item.strip().lower() for item in os.getenv(name, default).split(",") if item.strip()]
+
+# Number of navigations before the shared browser is recycled (0 = never)
+BROWSER_MAX_NAVIGATIONS = int(os.getenv("BROWSER_MAX_NAVIGATIONS", "50"))
+
+# Concurrent scraping: number of workers and the per-run memory budget
+SCRAPE_WORKERS = int(os.getenv("SCRAPE_WORKERS", "4"))
+SCRAPE_MEMORY_BUDGET_MB = int(os.getenv("SCRAPE_MEMORY_BUDGET_MB", "2048"))
+BROWSER_BASE_MEMORY_MB = int(os.getenv("BROWSER_BASE_MEMORY_MB", "300"))
+PAGE_MEMORY_MB = int(os.getenv("PAGE_MEMORY_MB", "250"))
+# Items held between two pipeline stages
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "20"))
+
+# Request blocking on browser contexts: resource types and domains to skip.
+# Allowed domains win over both deny lists (Cookiebot must load for consent handling).
+RESOURCE_BLOCKING = os.getenv("RESOURCE_BLOCKING", "1") != "0"
+BLOCKED_RESOURCE_TYPES = _env_list("BLOCKED_RESOURCE_TYPES", "image,media,font")
+BLOCKED_DOMAINS = _env_list(
+    "BLOCKED_DOMAINS",
+    "google-analytics.com,googletagmanager.com,doubleclick.net,googlesyndication.com,"
+    "adservice.google.com,facebook.net,facebook.com,hotjar.com,scorecardresearch.com,"
+    "quantserve.com,twitter.com,tiktok.com"
+)
+ALLOWED_DOMAINS = _env_list("ALLOWED_DOMAINS", "cookiebot.com")
+
+_blocking_stats = {"blocked": 0, "allowed": 0}
+
+# Saved cookies/localStorage so the consent dialog is handled once, not on every page
+STORAGE_STATE_PATH = os.getenv("STORAGE_STATE_PATH", "storage_state.json")
+STORAGE_STATE_TTL_HOURS = float(os.getenv("STORAGE_STATE_TTL_HOURS", "24"))
+CONSENT_DIALOG_SELECTOR = '#CybotCookiebotDialog, [id*="cookie-consent"], [class*="cookie-consent"]'
+
+# Shared browser state for the whole process
+_browser_pool = {
+    "playwright": None,
+    "browser": None,
+    "navigations": 0,
+    "leases": {},
+    "lock": None,
+}
+
+def fresh_storage_state():
+    """Return the saved storage-state file if it exists and is younger than the TTL, otherwise None."""
+    if not os.path.exists(STORAGE_STATE_PATH):
+        return None
+    age_hours = (time.time() - os.path.getmtime(STORAGE_STATE_PATH)) / 3600
+    if age_hours > STORAGE_STATE_TTL_HOURS:
+        print(f"Storage state is {age_hours:.1f}h old, expiring it.")
+        expire_storage_state()
+        return None
+    return STORAGE_STATE_PATH
+
+def expire_storage_state():
+    """Delete the saved storage state so the next page runs cookie consent again."""
+    try:
+        os.remove(STORAGE_STATE_PATH)
+    except FileNotFoundError:
+        pass
+
+async def save_storage_state(context):
+    """Persist the context cookies and localStorage for later contexts and runs."""
+    # Write to a unique temp file first so concurrent pages never leave a half-written state
+    tmp_path = f"{STORAGE_STATE_PATH}.{os.getpid()}.{id(context)}.tmp"
+    try:
+        await context.storage_state(path=tmp_path)
+        os.replace(tmp_path, STORAGE_STATE_PATH)
+        print(f"Storage state saved to {STORAGE_STATE_PATH}")
+    except Exception as e:
+        print(f"Failed to save storage state (non-critical): {str(e)}")
+
+async def consent_dialog_visible(page):
+    """Check, without waiting, whether a cookie consent dialog is showing."""
+    try:
+        dialog = await page.query_selector(CONSENT_DIALOG_SELECTOR)
+        return dialog is not None and await dialog.is_visible()
+    except Exception:
+        return False
+
+async def ensure_cookie_consent(page, context, consent_handler=None):
+    """Handle cookie consent only when the saved storage state does not cover it.
+
+    With a fresh storage state and no dialog on screen the consent step is skipped.
+    If the dialog shows up anyway the state is stale: it is expired, consent runs
+    again and the new state is saved when consent succeeded.
+    """
+    consent_handler = consent_handler or handle_cookie_consent
+    if fresh_storage_state():
+        if not await consent_dialog_visible(page):
+            print("Cookie consent restored from storage state.")
+            return True
+        print("Cookie consent dialog shown despite saved state, refreshing storage state.")
+        expire_storage_state()
+
+    result = await consent_handler(page)
+    # Only a successful consent is worth reusing; a failed one would pass as fresh until the TTL runs out
+    if result:
+        await save_storage_state(context)
+    return result
+
+async def new_context(browser):
+    """Create a browser context with realistic user agent, viewport, locale and timezone settings."""
+    return await browser.new_context(
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",
+        viewport={"width": 1920, "height": 1080},
+        locale="en-US",
+        timezone_id="Asia/Jakarta",
+        storage_state=fresh_storage_state()
+    )
+
+def _domain_matches(host, domains):
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+def should_block_request(resource_type, url):
+    """Decide whether a request is skipped by the resource-blocking layer."""
+    host = (urlparse(url).hostname or "").lower()
+    if _domain_matches(host, ALLOWED_DOMAINS):
+        return False
+    if _domain_matches(host, BLOCKED_DOMAINS):
+        return True
+    return resource_type in BLOCKED_RESOURCE_TYPES
+
+async def install_resource_blocking(context):
+    """Abort image, font, media and tracker requests on a context.
+
+    Only the downloads are skipped: <img> elements and their alt attributes
+    (used for country codes) stay in the DOM.
+    """
+    if not RESOURCE_BLOCKING:
+        return
+
+    async def handle_route(route):
+        request = route.request
+        if should_block_request(request.resource_type, request.url):
+            _blocking_stats["blocked"] += 1
+            await route.abort()
+        else:
+            _blocking_stats["allowed"] += 1
+            await route.continue_()
+
+    await context.route("**/*", handle_route)
+
+async def get_browser():
+    """Return the shared Chromium browser, launching it once or recycling it after BROWSER_MAX_NAVIGATIONS.
+
+    The caller's lease and navigation are registered under the pool lock, so a
+    recycle by another worker never closes a browser that is still handing out
+    a page. Give the lease back with _drop_lease() (release_page does this).
+    """
     from playwright.async_api import async_playwright
+    pool = _browser_pool
+    if pool["lock"] is None:
+        pool["lock"] = asyncio.Lock()
+
+    async with pool["lock"]:
+        if pool["playwright"] is None:
+            pool["playwright"] = await async_playwright().start()
+
+        browser = pool["browser"]
+        if browser and BROWSER_MAX_NAVIGATIONS and pool["navigations"] >= BROWSER_MAX_NAVIGATIONS:
+            print(f"Recycling shared browser after {pool['navigations']} navigations.")
+            pool["browser"] = None
+            # Close the old browser now if idle, otherwise when its last lease is released
+            if not pool["leases"].get(browser):
+                pool["leases"].pop(browser, None)
+                await browser.close()
+
+        if pool["browser"] is None or not pool["browser"].is_connected():
+            pool["browser"] = await pool["playwright"].chromium.launch(headless=True)
+            pool["navigations"] = 0
+            print("Shared browser launched.")
+
+        browser = pool["browser"]
+        pool["navigations"] += 1
+        pool["leases"][browser] = pool["leases"].get(browser, 0) + 1
+        return browser
+
+async def _drop_lease(browser):
+    """Give back one lease on browser, closing it if it was retired and this was its last lease."""
+    pool = _browser_pool
+    if browser is None or browser not in pool["leases"]:
+        return
+    pool["leases"][browser] -= 1
+    if pool["leases"][browser] <= 0 and browser is not pool["browser"]:
+        pool["leases"].pop(browser, None)
+        await browser.close()
+
+async def lease_page():
+    """Lease a fresh context and page from the shared browser. Return them with release_page()."""
+    browser = None
+    context = None
     try:
-        p = await async_playwright().start()
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",
-            viewport={"width": 1920, "height": 1080},
-            locale="en-US",
-            timezone_id="Asia/Jakarta"
-        )
+        browser = await get_browser()
+        context = await new_context(browser)
+        await install_resource_blocking(context)
         page = await context.new_page()
-        return p, browser, context, page
     except Exception as e:
-        print(f"Failed to initialize browser: {str(e)}")
-        return None, None, None, None
+        print(f"Failed to lease page from shared browser: {str(e)}")
+        if context:
+            try:
+                await context.close()
+            except Exception:
+                pass
+        await _drop_lease(browser)
+        return None, None
+    return context, page
+
+async def release_page(page, context):
+    """Close a leased page and context, and close a retired browser once it has no leases left."""
+    browser = context.browser if context else None
+    try:
+        if page:
+            await page.close()
+        if context:
+            await context.close()
+    except Exception as e:
+        print(f"Failed to close leased page (non-critical): {str(e)}")
+
+    await _drop_lease(browser)
+
+async def close_browser_pool():
+    """Close the shared browser and stop the Playwright driver at the end of the run."""
+    pool = _browser_pool
+    for browser in list(pool["leases"]) + [pool["browser"]]:
+        if browser and browser.is_connected():
+            await browser.close()
+    if pool["playwright"]:
+        await pool["playwright"].stop()
+    if _blocking_stats["blocked"]:
+        print(f"Blocked {_blocking_stats['blocked']} of {_blocking_stats['blocked'] + _blocking_stats['allowed']} requests.")
+    pool.update({"playwright": None, "browser": None, "navigations": 0, "leases": {}})
+
+def effective_workers(workers=None, memory_budget_mb=None):
+    """Cap the requested worker count so the shared browser and its open pages fit the memory budget."""
+    workers = workers or SCRAPE_WORKERS
+    budget = memory_budget_mb or SCRAPE_MEMORY_BUDGET_MB
+    by_memory = (budget - BROWSER_BASE_MEMORY_MB) // PAGE_MEMORY_MB
+    return max(1, min(workers, by_memory))
+
+async def run_bounded(items, handler, workers=None, memory_budget_mb=None):
+    """Run handler(item) for every item with bounded concurrency.
+
+    At most effective_workers() handlers (and therefore leased pages) run at once.
+    Results keep the order of items; a failing item yields None instead of aborting the run.
+    """
+    limit = effective_workers(workers, memory_budget_mb)
+    semaphore = asyncio.Semaphore(limit)
+    print(f"Scraping {len(items)} items with {limit} concurrent workers.")
+
+    async def worker(item):
+        async with semaphore:
+            try:
+                return await handler(item)
+            except Exception as e:
+                print(f"Error processing {item}: {str(e)}")
+                return None
+
+    return await asyncio.gather(*(worker(item) for item in items))
+
+async def run_stage(name, inbox, handler, workers, outbox=None, next_workers=1):
+    """Run one pipeline stage with `workers` tasks reading from a bounded inbox queue.
+
+    handler(item) returns a list of items for the next stage, which are put into
+    outbox; a full outbox makes this stage wait, so no stage runs far ahead of the
+    next one. None in the inbox stops one worker. When all workers have stopped,
+    next_workers None markers are put into outbox. Returns the number of items handled.
+    """
+    handled = 0
+
+    async def worker():
+        nonlocal handled
+        while True:
+            item = await inbox.get()
+            if item is None:
+                return
+            try:
+                results = await handler(item) or []
+            except Exception as e:
+                print(f"{name}: error processing {item}: {str(e)}")
+                results = []
+            handled += 1
+            if outbox is not None:
+                for result in results:
+                    await outbox.put(result)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+    if outbox is not None:
+        for _ in range(next_workers):
+            await outbox.put(None)
+    print(f"{name}: finished {handled} items.")
+    return handled
 
 async def prepare_page(url, output_dir="output"):
-    """Prepare the browser and page for scraping, handling navigation, cookies, and CAPTCHAs."""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    """Prepare a leased page from the shared browser, handling navigation, cookies, and CAPTCHAs.
+
+    Returns (playwright, browser, context, page, timestamp). The page and context must be
+    handed back with release_page(); the browser itself stays alive for the whole run.
+    """
+    # Microseconds keep file names unique when several pages of one tournament run concurrently
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
     os.makedirs(output_dir, exist_ok=True)
 
-    p, browser, context, page = await initialize_browser()
+    context, page = await lease_page()
     if not page:
         print("Failed to initialize browser for scraping.")
         return None, None, None, None, timestamp
+    p, browser = _browser_pool["playwright"], context.browser
 
     try:
         if not await navigate_to_page(page, url):
@@ -40,13 +324,15 @@ async def prepare_page(url, output_dir="output"):
 
         if "Cloudflare" in title:
             print("Cloudflare protection detected.")
+            await release_page(page, context)
             return None, None, None, None, timestamp
 
-        await handle_cookie_consent(page)
+        await ensure_cookie_consent(page, context)
 
         if await check_captcha(page):
             print("Scraping stopped due to CAPTCHA detection.")
             await page.screenshot(path=f"{output_dir}/captcha_screenshot_{timestamp}.png")
+            await release_page(page, context)
             return None, None, None, None, timestamp
 
         return p, browser, context, page, timestamp
@@ -56,6 +342,7 @@ async def prepare_page(url, output_dir="output"):
         if page:
             await save_html_content(page, output_dir, timestamp, filename_prefix="bwf_tournaments_error")
             await save_screenshot(page, output_dir, timestamp, suffix="_error")
+        await release_page(page, context)
         return None, None, None, None, timestamp
 
 async def navigate_to_page(page, url):
@@ -81,10 +368,12 @@ async def handle_cookie_consent(page):
             await cookie_button.click()
             print("Cookie consent accepted.")
             await page.wait_for_timeout(1000)
+            return True
         else:
             print("Cookie consent button not found, proceeding anyway.")
     except Exception as e:
         print(f"Failed to handle cookie consent (non-critical): {str(e)}")
+    return False
 
 async def check_captcha(page):
     """Check for CAPTCHA or Cloudflare protection."""
@@ -0,0 +1,181 @@
+import asyncio
+import glob
+import json
+import os
+from changelib import filter_changed, mark_synced, tour_scope, rankings_scope
+from supalib import (
+    UPSERT_CHUNK_SIZE, TOUR_CONFLICT_KEY, RANKINGS_CONFLICT_KEY, initialize_supabase, dedupe_rows, upsert_in_chunks,
+    build_bwf_tour_row, build_bwf_calendar_row, build_bwf_rankings_rows
+)
+
+# Upsert requests in flight at the same time (supabase-py is synchronous, so each runs in a thread)
+SUPABASE_IN_FLIGHT = int(os.getenv("SUPABASE_IN_FLIGHT", "4"))
+
+
+def _read_json(json_file):
+    with open(json_file, "r", encoding="utf-8") as f:
+        return json.load(f) or []
+
+
+def _rows_from_builder(items, builder, name_field, json_file):
+    rows = []
+    errors = []
+    for item in items:
+        row, reason = builder(item)
+        if row is None:
+            errors.append(f"Skipped {item.get(name_field, 'unknown')} in {json_file}: {reason}")
+            continue
+        rows.append(row)
+    return rows, errors
+
+
+def tour_rows_from_file(json_file):
+    return _rows_from_builder(_read_json(json_file), build_bwf_tour_row, "Match_Name", json_file)
+
+
+def calendar_rows_from_file(json_file):
+    return _rows_from_builder(_read_json(json_file), build_bwf_calendar_row, "Tournament_Name", json_file)
+
+
+def rankings_rows_from_file(json_file):
+    return build_bwf_rankings_rows(_read_json(json_file))
+
+
+# table -> file pattern, conflict key and row builder for one file
+INGEST_SOURCES = {
+    "bwf_tour": {
+        "pattern": "match_*.json",
+        "on_conflict": TOUR_CONFLICT_KEY,
+        "rows": tour_rows_from_file,
+        "scope": tour_scope
+    },
+    "bwf_calendar": {
+        "pattern": "calendar_*.json",
+        "on_conflict": "id",
+        "rows": calendar_rows_from_file,
+        "scope": lambda row: str(row.get("id"))
+    },
+    "bwf_rankings": {
+        "pattern": "rank_*.json",
+        "on_conflict": RANKINGS_CONFLICT_KEY,
+        "rows": rankings_rows_from_file,
+        "scope": rankings_scope
+    },
+}
+
+
+def find_ingest_jobs(folder, tables=None):
+    """List (table, json_file) pairs for every known file type in folder, oldest file first."""
+    jobs = []
+    for table in tables or INGEST_SOURCES:
+        pattern = INGEST_SOURCES[table]["pattern"]
+        for json_file in sorted(glob.glob(os.path.join(folder, pattern)), key=lambda path: (os.path.getmtime(path), path)):
+            jobs.append((table, json_file))
+    return jobs
+
+
+async def ingest_files(jobs, in_flight=None, chunk_size=UPSERT_CHUNK_SIZE):
+    """Upsert rows from (table, json_file) jobs with up to in_flight concurrent requests.
+
+    One producer reads and validates the files of a table, deduplicates their
+    rows across files on the table's conflict key (a later job wins, so list
+    older files first) and drops rows unchanged since the last successful load.
+    It then feeds chunks into a bounded queue for in_flight workers. Each key
+    is in only one chunk, so the order in which chunks finish does not matter.
+
+    Returns:
+        dict: Result with success status, message and per-table counts
+    """
+    supabase = initialize_supabase()
+    if isinstance(supabase, dict):
+        return supabase
+
+    in_flight = max(1, in_flight or SUPABASE_IN_FLIGHT)
+    queue = asyncio.Queue(maxsize=in_flight * 2)
+    tables = {}
+    errors = []
+
+    def table_stats(table):
+        return tables.setdefault(
+            table, {"files": 0, "inserted": 0, "unchanged": 0, "failed": 0, "skipped": 0, "requests": 0}
+        )
+
+    by_table = {}
+    for table, json_file in jobs:
+        by_table.setdefault(table, []).append(json_file)
+
+    async def produce():
+        for table, json_files in by_table.items():
+            source = INGEST_SOURCES[table]
+            key_fields = source["on_conflict"].split(",")
+            stats = table_stats(table)
+            rows = []
+            for json_file in json_files:
+                try:
+                    file_rows, row_errors = await asyncio.to_thread(source["rows"], json_file)
+                except Exception as e:
+                    errors.append(f"Error processing {json_file}: {str(e)}")
+                    continue
+                rows.extend(file_rows)
+                stats["files"] += 1
+                stats["skipped"] += len(row_errors)
+                errors.extend(row_errors)
+            rows = dedupe_rows(rows, key_fields)
+            changed = filter_changed(table, rows, key_fields)
+            stats["unchanged"] += len(rows) - len(changed)
+            rows = changed
+            for start in range(0, len(rows), chunk_size):
+                await queue.put((table, rows[start:start + chunk_size]))
+        for _ in range(in_flight):
+            await queue.put(None)
+
+    async def consume():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            table, chunk = item
+            stats = table_stats(table)
+            try:
+                result = await asyncio.to_thread(
+                    upsert_in_chunks, supabase, table, chunk, INGEST_SOURCES[table]["on_conflict"], len(chunk)
+                )
+            except Exception as e:
+                stats["failed"] += len(chunk)
+                errors.append(f"Chunk of {table} failed: {str(e)}")
+                continue
+            source = INGEST_SOURCES[table]
+            mark_synced(table, result["rows"], source["on_conflict"].split(","), source["scope"])
+            stats["inserted"] += result["inserted"]
+            stats["failed"] += result["failed"]
+            stats["requests"] += result["requests"]
+            errors.extend(result["errors"])
+
+    await asyncio.gather(produce(), *(consume() for _ in range(in_flight)))
+
+    summary = ", ".join(
+        f"{table}: {stats['inserted']} upserted, {stats['unchanged']} unchanged, {stats['skipped']} skipped, "
+        f"{stats['failed']} failed "
+        f"from {stats['files']} files in {stats['requests']} requests"
+        for table, stats in tables.items()
+    )
+    result = {
+        # Same rule as bwf_tour_to_supabase: a reload where every row is unchanged succeeded too
+        "success": any(
+            stats["inserted"] > 0 or (stats["unchanged"] > 0 and stats["failed"] == 0)
+            for stats in tables.values()
+        ),
+        "message": f"Processed {len(jobs)} JSON files ({in_flight} in flight): {summary or 'nothing to load'}",
+        "tables": tables
+    }
+    if errors:
+        result["message"] += f"\nErrors encountered:\n" + "\n".join(errors)
+    return result
+
+
+async def ingest_directory(folder="output", tables=None, in_flight=None, chunk_size=UPSERT_CHUNK_SIZE):
+    """Load every match_*.json, calendar_*.json and rank_*.json in folder concurrently."""
+    jobs = find_ingest_jobs(folder, tables)
+    if not jobs:
+        return {"success": False, "message": f"No JSON files to load in {folder}"}
+    return await ingest_files(jobs, in_flight, chunk_size)
@@ -0,0 +1,53 @@
+import os
+import re
+from datetime import datetime, timedelta
+
+# Poll interval bounds (seconds) for live mode
+LIVE_INTERVAL_MIN_SECONDS = float(os.getenv("LIVE_INTERVAL_MIN_SECONDS", "15"))
+LIVE_INTERVAL_MAX_SECONDS = float(os.getenv("LIVE_INTERVAL_MAX_SECONDS", "300"))
+LIVE_BACKOFF_FACTOR = float(os.getenv("LIVE_BACKOFF_FACTOR", "2"))
+# Hours past the end of a day before live mode gives up on its unfinished cards (late sessions, time zones)
+LIVE_DAY_GRACE_HOURS = float(os.getenv("LIVE_DAY_GRACE_HOURS", "6"))
+# Consecutive failed page reloads before live mode stops
+LIVE_MAX_RELOAD_FAILURES = int(os.getenv("LIVE_MAX_RELOAD_FAILURES", "5"))
+
+# Card Status texts for a match being played, and for one that can no longer change
+IN_PROGRESS_PATTERN = re.compile(r"progress|live|playing|ongoing|warm.?up|interval|suspended", re.I)
+TERMINAL_PATTERN = re.compile(r"finish|complete|retire|walkover|w/o|no match|disqualif|cancel|postpone", re.I)
+
+
+def card_state(card):
+    """Classify a match card as "live", "final" or "pending" (not started yet)."""
+    status = card.get("Status") or ""
+    if IN_PROGRESS_PATTERN.search(status):
+        return "live"
+    if TERMINAL_PATTERN.search(status) or card.get("Winner") in (1, 2, "1", "2"):
+        return "final"
+    return "pending"
+
+
+def day_state(cards):
+    """Summarise a day: "live" if any card is live, "final" if every card is final, else "pending"."""
+    states = [card_state(card) for card in cards]
+    if not states:
+        return "pending"
+    if "live" in states:
+        return "live"
+    if all(state == "final" for state in states):
+        return "final"
+    return "pending"
+
+
+def next_interval(current, state, changed):
+    """Poll again soon while matches are live or scores moved; back off otherwise."""
+    if state == "live" or changed:
+        return LIVE_INTERVAL_MIN_SECONDS
+    return min(LIVE_INTERVAL_MAX_SECONDS, max(LIVE_INTERVAL_MIN_SECONDS, current * LIVE_BACKOFF_FACTOR))
+
+
+def day_has_passed(day, now=None):
+    """True once the yyyy-mm-dd day ended more than LIVE_DAY_GRACE_HOURS ago (a None day never passes)."""
+    if not day:
+        return False
+    end = datetime.strptime(day, "%Y-%m-%d") + timedelta(days=1, hours=LIVE_DAY_GRACE_HOURS)
+    return (now or datetime.now()) >= end
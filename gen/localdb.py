@@ -0,0 +1,284 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+
+# Simulated round trip per request (ms), to make local benchmarks resemble a remote database
+LOCAL_DB_LATENCY_MS = float(os.getenv("LOCAL_DB_LATENCY_MS", "0"))
+
+
+# Stored procedures callable through LocalClient.rpc(), mirroring the SQL in gen/sql/
+LOCAL_PROCEDURES = {}
+
+
+class LocalAPIError(Exception):
+    """Raised where PostgREST would answer with an error."""
+
+
+def local_procedure(name):
+    def register(function):
+        LOCAL_PROCEDURES[name] = function
+        return function
+    return register
+
+
+class LocalClient:
+    """SQLite stand-in for the parts of the supabase-py client used by supalib.
+
+    Supports table(name) with select/insert/upsert/update/delete, the filters
+    eq/neq/gt/gte/lt/lte/in_ and execute(). Each table stores rows as JSON; upsert
+    conflicts are resolved on the on_conflict columns, and an upsert that hits the
+    same key twice in one request is rejected like PostgREST does. Every execute()
+    counts as one request.
+    """
+
+    def __init__(self, path=":memory:", latency_ms=None):
+        self.path = path
+        self.latency_ms = LOCAL_DB_LATENCY_MS if latency_ms is None else latency_ms
+        self.requests = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.tables = set()
+
+    def table(self, name):
+        return LocalQuery(self, name)
+
+    def rpc(self, name, params=None):
+        return LocalRpc(self, name, params or {})
+
+    def _ensure_table(self, name):
+        if name not in self.tables:
+            self.conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{name}" ('
+                "_rowid INTEGER PRIMARY KEY AUTOINCREMENT, _key TEXT UNIQUE, data TEXT NOT NULL)"
+            )
+            self.tables.add(name)
+
+    def close(self):
+        self.conn.close()
+
+    def count(self, name):
+        with self.lock:
+            self._ensure_table(name)
+            return self.conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+
+
+class LocalRpc:
+    def __init__(self, client, name, params):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    def execute(self):
+        client = self.client
+        if client.latency_ms:
+            time.sleep(client.latency_ms / 1000)
+        if self.name not in LOCAL_PROCEDURES:
+            raise LocalAPIError(f"Could not find the function public.{self.name}")
+
+        with client.lock:
+            client.requests += 1
+            try:
+                data = LOCAL_PROCEDURES[self.name](client, self.params)
+                client.conn.commit()
+            except Exception:
+                client.conn.rollback()
+                raise
+        return SimpleNamespace(data=data)
+
+
+class LocalQuery:
+    _OPERATORS = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+        self.action = "select"
+        self.payload = None
+        self.on_conflict = None
+        self.filters = []
+        self.ordering = None
+        self.window = None
+
+    def select(self, columns="*"):
+        self.action = "select"
+        self.payload = columns
+        return self
+
+    def insert(self, rows):
+        self.action = "insert"
+        self.payload = rows
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self.action = "upsert"
+        self.payload = rows
+        self.on_conflict = on_conflict
+        return self
+
+    def update(self, values):
+        self.action = "update"
+        self.payload = values
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def in_(self, column, values):
+        self.filters.append((column, "in", list(values)))
+        return self
+
+    def order(self, column, desc=False):
+        self.ordering = (column, desc)
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end)
+        return self
+
+    def __getattr__(self, name):
+        if name in self._OPERATORS:
+            def add_filter(column, value):
+                self.filters.append((column, self._OPERATORS[name], value))
+                return self
+            return add_filter
+        raise AttributeError(name)
+
+    @staticmethod
+    def _is_number(value):
+        if isinstance(value, bool):
+            return False
+        try:
+            float(value)
+            return True
+        except (TypeError, ValueError):
+            return False
+
+    def _where(self):
+        # PostgREST sends filter values as text and casts them to the column type,
+        # so eq("tour", "5222") matches 5222; equality is compared as text here and
+        # ordering numerically when the value is a number
+        clauses = []
+        params = []
+        for column, operator, value in self.filters:
+            field = f"json_extract(data, '$.{column}')"
+            if operator == "in":
+                clauses.append(f"CAST({field} AS TEXT) IN ({','.join(['CAST(? AS TEXT)'] * len(value))})")
+                params.extend(value)
+            elif operator in ("=", "!=") or not self._is_number(value):
+                clauses.append(f"CAST({field} AS TEXT) {operator} CAST(? AS TEXT)")
+                params.append(value)
+            else:
+                clauses.append(f"CAST({field} AS NUMERIC) {operator} CAST(? AS NUMERIC)")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _matching(self, conn):
+        where, params = self._where()
+        return [
+            (rowid, json.loads(data))
+            for rowid, data in conn.execute(f'SELECT _rowid, data FROM "{self.name}"{where}', params)
+        ]
+
+    def _key(self, row):
+        return json.dumps([row.get(column) for column in self.on_conflict.split(",")], default=str)
+
+    def execute(self):
+        client = self.client
+        if client.latency_ms:
+            time.sleep(client.latency_ms / 1000)
+
+        with client.lock:
+            client.requests += 1
+            client._ensure_table(self.name)
+            conn = client.conn
+            try:
+                data = self._run(conn)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return SimpleNamespace(data=data, count=len(data))
+
+    def _run(self, conn):
+        if self.action == "select":
+            columns = None if self.payload in (None, "*") else [c.strip() for c in self.payload.split(",")]
+            rows = [row for _, row in self._matching(conn)]
+            if self.ordering:
+                column, desc = self.ordering
+                rows.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+            if self.window:
+                rows = rows[self.window[0]:self.window[1] + 1]
+            return rows if columns is None else [{c: row.get(c) for c in columns} for row in rows]
+
+        if self.action == "delete":
+            matching = self._matching(conn)
+            conn.executemany(f'DELETE FROM "{self.name}" WHERE _rowid = ?', [(rowid,) for rowid, _ in matching])
+            return [row for _, row in matching]
+
+        if self.action == "update":
+            matching = self._matching(conn)
+            updated = []
+            for rowid, row in matching:
+                row.update(self.payload)
+                conn.execute(f'UPDATE "{self.name}" SET data = ? WHERE _rowid = ?', (json.dumps(row, default=str), rowid))
+                updated.append(row)
+            return updated
+
+        rows = self.payload if isinstance(self.payload, list) else [self.payload]
+        if self.action == "insert":
+            inserted = []
+            for row in rows:
+                row = dict(row)
+                cursor = conn.execute(f'INSERT INTO "{self.name}" (data) VALUES (?)', ("{}",))
+                row.setdefault("id", cursor.lastrowid)
+                conn.execute(f'UPDATE "{self.name}" SET data = ? WHERE _rowid = ?', (json.dumps(row, default=str), cursor.lastrowid))
+                inserted.append(row)
+            return inserted
+
+        # upsert
+        if not self.on_conflict:
+            raise LocalAPIError("upsert without on_conflict is not supported by the local backend")
+        keys = [self._key(row) for row in rows]
+        if len(set(keys)) != len(keys):
+            raise LocalAPIError("ON CONFLICT DO UPDATE command cannot affect row a second time")
+        upserted = []
+        for key, row in zip(keys, rows):
+            existing = conn.execute(f'SELECT _rowid, data FROM "{self.name}" WHERE _key = ?', (key,)).fetchone()
+            if existing:
+                merged = json.loads(existing[1])
+                merged.update(row)
+                conn.execute(f'UPDATE "{self.name}" SET data = ? WHERE _rowid = ?', (json.dumps(merged, default=str), existing[0]))
+                upserted.append(merged)
+            else:
+                conn.execute(f'INSERT INTO "{self.name}" (_key, data) VALUES (?, ?)', (key, json.dumps(row, default=str)))
+                upserted.append(dict(row))
+        return upserted
+
+
+@local_procedure("swap_bwf_rankings_week")
+def swap_bwf_rankings_week(client, params):
+    """Same effect as gen/sql/bwf_rankings_swap.sql, in one SQLite transaction."""
+    conn = client.conn
+    for table in ("bwf_rankings", "bwf_rankings_staging"):
+        client._ensure_table(table)
+
+    conn.execute(
+        "DELETE FROM bwf_rankings WHERE json_extract(data, '$.week') = ? AND json_extract(data, '$.rank_category') = ?",
+        (params["p_week"], params["p_rank_category"])
+    )
+    staged = [
+        json.loads(data) for (data,) in conn.execute(
+            "SELECT data FROM bwf_rankings_staging WHERE json_extract(data, '$.batch_id') = ?", (params["p_batch_id"],)
+        )
+    ]
+    for row in staged:
+        row.pop("batch_id", None)
+        row.pop("id", None)
+        key = json.dumps([row.get(c) for c in ("rank", "category", "rank_category", "week", "player1_name")], default=str)
+        conn.execute("INSERT INTO bwf_rankings (_key, data) VALUES (?, ?)", (key, json.dumps(row, default=str)))
+    conn.execute("DELETE FROM bwf_rankings_staging WHERE json_extract(data, '$.batch_id') = ?", (params["p_batch_id"],))
+    return len(staged)
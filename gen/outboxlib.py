@@ -0,0 +1,200 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from changelib import filter_changed, mark_synced, row_key, tour_scope, rankings_scope
+from supalib import UPSERT_CHUNK_SIZE, TOUR_CONFLICT_KEY, RANKINGS_CONFLICT_KEY, initialize_supabase, dedupe_rows, upsert_in_chunks
+
+# Scrapers append rows here; a loader task drains them into Supabase (OUTBOX=0 loads inline as before)
+OUTBOX = os.getenv("OUTBOX", "1") != "0"
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", "outbox.sqlite")
+OUTBOX_DRAIN_INTERVAL_SECONDS = float(os.getenv("OUTBOX_DRAIN_INTERVAL_SECONDS", "5"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+
+OUTBOX_TABLES = {
+    "bwf_tour": {"on_conflict": TOUR_CONFLICT_KEY, "scope": tour_scope},
+    "bwf_calendar": {"on_conflict": "id", "scope": lambda row: str(row.get("id"))},
+    "bwf_rankings": {"on_conflict": RANKINGS_CONFLICT_KEY, "scope": rankings_scope},
+}
+
+_outbox = {"conn": None, "lock": threading.Lock(), "task": None, "stop": None}
+
+
+def get_outbox():
+    """Open the outbox database once per process."""
+    if _outbox["conn"] is None:
+        conn = sqlite3.connect(OUTBOX_PATH, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT NOT NULL,
+                row_key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                delivered_at TEXT
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (delivered_at, id)")
+        conn.commit()
+        _outbox["conn"] = conn
+    return _outbox["conn"]
+
+
+def enqueue_rows(table, rows):
+    """Append rows for table to the outbox. Returns the number of rows written."""
+    if not rows:
+        return 0
+    key_fields = OUTBOX_TABLES[table]["on_conflict"].split(",")
+    created_at = datetime.now().isoformat()
+    with _outbox["lock"]:
+        conn = get_outbox()
+        conn.executemany(
+            "INSERT INTO outbox (table_name, row_key, payload, created_at) VALUES (?, ?, ?, ?)",
+            [(table, row_key(row, key_fields), json.dumps(row, default=str), created_at) for row in rows]
+        )
+        conn.commit()
+    return len(rows)
+
+
+def pending_count():
+    with _outbox["lock"]:
+        return get_outbox().execute(
+            "SELECT COUNT(*) FROM outbox WHERE delivered_at IS NULL AND attempts < ?", (OUTBOX_MAX_ATTEMPTS,)
+        ).fetchone()[0]
+
+
+def _claim_batch(limit, after_id=0):
+    with _outbox["lock"]:
+        return get_outbox().execute(
+            "SELECT id, table_name, row_key, payload FROM outbox "
+            "WHERE delivered_at IS NULL AND attempts < ? AND id > ? ORDER BY id LIMIT ?",
+            (OUTBOX_MAX_ATTEMPTS, after_id, limit)
+        ).fetchall()
+
+
+def _mark(ids, error=None):
+    with _outbox["lock"]:
+        conn = get_outbox()
+        if error is None:
+            delivered_at = datetime.now().isoformat()
+            conn.executemany(
+                "UPDATE outbox SET delivered_at = ?, last_error = NULL WHERE id = ?",
+                [(delivered_at, entry_id) for entry_id in ids]
+            )
+        else:
+            conn.executemany(
+                "UPDATE outbox SET attempts = attempts + 1, last_error = ? WHERE id = ?",
+                [(error, entry_id) for entry_id in ids]
+            )
+        conn.commit()
+
+
+def drain_batch(supabase, batch_size=UPSERT_CHUNK_SIZE, after_id=0):
+    """Deliver one batch of pending entries with id > after_id.
+
+    Entries for the same row key collapse to the newest payload. An entry is
+    marked delivered only after its upsert succeeded; upserts are idempotent on
+    the conflict key, so a crash between upsert and marking only repeats a write.
+
+    Returns (delivered, failed, last_id); last_id is 0 when nothing was pending.
+    """
+    entries = _claim_batch(batch_size, after_id)
+    if not entries:
+        return 0, 0, 0
+
+    by_table = {}
+    for entry_id, table, key, payload in entries:
+        by_table.setdefault(table, {}).setdefault(key, []).append((entry_id, json.loads(payload)))
+
+    delivered = 0
+    failed = 0
+    for table, keyed in by_table.items():
+        config = OUTBOX_TABLES[table]
+        key_fields = config["on_conflict"].split(",")
+        rows = [versions[-1][1] for versions in keyed.values()]
+        changed = filter_changed(table, dedupe_rows(rows, key_fields), key_fields)
+
+        result = upsert_in_chunks(supabase, table, changed, config["on_conflict"], len(changed) or 1)
+        mark_synced(table, result["rows"], key_fields, config["scope"])
+
+        # Upserted rows and rows unchanged since their last delivery are done
+        changed_keys = {row_key(row, key_fields) for row in changed}
+        ok_keys = {row_key(row, key_fields) for row in result["rows"]}
+        ok_keys.update(key for key in keyed if key not in changed_keys)
+        ok_ids = [entry_id for key, versions in keyed.items() if key in ok_keys for entry_id, _ in versions]
+        failed_ids = [entry_id for key, versions in keyed.items() if key not in ok_keys for entry_id, _ in versions]
+
+        _mark(ok_ids)
+        if failed_ids:
+            _mark(failed_ids, "; ".join(result["errors"])[:1000] or "upsert failed")
+        delivered += len(ok_ids)
+        failed += len(failed_ids)
+    return delivered, failed, entries[-1][0]
+
+
+async def drain_outbox(batch_size=UPSERT_CHUNK_SIZE):
+    """Deliver everything currently pending. Returns a result dict like the supalib loaders."""
+    supabase = initialize_supabase()
+    if isinstance(supabase, dict):
+        return supabase
+
+    delivered = 0
+    failed = 0
+    last_id = 0
+    while True:
+        # Failed entries stay behind last_id and are retried on the next drain
+        batch_delivered, batch_failed, last_id = await asyncio.to_thread(drain_batch, supabase, batch_size, last_id)
+        delivered += batch_delivered
+        failed += batch_failed
+        if last_id == 0:
+            break
+
+    return {
+        "success": failed == 0,
+        "message": f"Outbox: delivered {delivered} entries, {failed} failed attempts, {pending_count()} pending"
+    }
+
+
+async def _loader(interval):
+    attempt = 0
+    while not _outbox["stop"].is_set():
+        result = await drain_outbox()
+        if result.get("success"):
+            attempt = 0
+        else:
+            print(result["message"])
+            attempt += 1
+        # Back off after failures, up to 8 intervals
+        delay = interval * min(2 ** attempt, 8)
+        try:
+            await asyncio.wait_for(_outbox["stop"].wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_outbox_loader(interval=None):
+    """Start the background task that drains the outbox while scraping continues.
+
+    Entries left over from a crashed run are delivered on its first pass.
+    """
+    if _outbox["task"] is None:
+        _outbox["stop"] = asyncio.Event()
+        _outbox["task"] = asyncio.create_task(_loader(interval or OUTBOX_DRAIN_INTERVAL_SECONDS))
+    return _outbox["task"]
+
+
+async def stop_outbox_loader():
+    """Stop the background loader and deliver what is still pending."""
+    if _outbox["task"] is None:
+        return None
+    _outbox["stop"].set()
+    await _outbox["task"]
+    _outbox["task"] = None
+    result = await drain_outbox()
+    print(result["message"])
+    return result
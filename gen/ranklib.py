@@ -6,8 +6,17 @@ from datetime import datetime
 from playwright.async_api import async_playwright
 from playwright_stealth import stealth_async
 from bs4 import BeautifulSoup
+from genlib import install_resource_blocking, fresh_storage_state, ensure_cookie_consent
+from readylib import table_signature, wait_for_rows_stable, wait_for_listbox
+from capturelib import start_response_capture, finish_capture, latest_ranking_rows, save_capture
 import re
 
+# Event yang diambil untuk setiap minggu/kategori peringkat
+EVENT_NAMES = ["MEN'S SINGLES", "WOMEN'S SINGLES", "MEN'S DOUBLES", "WOMEN'S DOUBLES", "MIXED DOUBLES"]
+
+# Jeda acak maksimum (detik) sebelum navigasi
+NAV_JITTER_SECONDS = float(os.getenv("NAV_JITTER_SECONDS", "1"))
+
 async def initialize_browser():
     """Inisialisasi browser Playwright dengan konteks dan halaman."""
     try:
@@ -22,8 +31,10 @@ async def initialize_browser():
             user_agent=random.choice(user_agents),
             viewport={"width": random.randint(1200, 1400), "height": random.randint(700, 900)},
             java_script_enabled=True,
-            locale="en-US"
+            locale="en-US",
+            storage_state=fresh_storage_state()
         )
+        await install_resource_blocking(context)
         page = await context.new_page()
         await stealth_async(page)
         
@@ -47,9 +58,10 @@ async def initialize_browser():
 async def navigate_to_page(page, url):
     """Navigasi ke URL dengan penundaan acak."""
     try:
-        await asyncio.sleep(random.uniform(2, 5))
+        await asyncio.sleep(random.uniform(0, NAV_JITTER_SECONDS))
         await page.goto(url, wait_until="networkidle", timeout=60000)
-        await page.wait_for_timeout(10000)
+        # Tunggu tabel peringkat terisi dan stabil, bukan jeda tetap
+        await wait_for_rows_stable(page)
         print(f"Berhasil navigasi ke {url}")
         return True
     except Exception as e:
@@ -69,7 +81,11 @@ async def handle_cookie_consent(page):
         )
         await cookie_button.click(force=True)
         print("Klik tombol persetujuan cookie.")
-        await page.wait_for_timeout(2000)
+        try:
+            # Tunggu dialog Cookiebot hilang (maksimum 2 detik)
+            await page.wait_for_selector('#CybotCookiebotDialog', state="hidden", timeout=2000)
+        except Exception:
+            pass
         return True
     except:
         print("Tombol persetujuan cookie tidak ditemukan.")
@@ -97,7 +113,7 @@ async def save_ranking_options_to_json(page, output_dir="output"):
         print("Elemen dropdown berlabel 'Ranking' ditemukan.")
         
         await page.click(ranking_selector, force=True)
-        await page.wait_for_timeout(2000)
+        await wait_for_listbox(page)
 
         options = await page.query_selector_all('div.v-menu__content div[role="listbox"] div.v-list-item__title')
         ranking_options = []
@@ -125,7 +141,7 @@ async def get_ranking_options(page):
         print("Elemen dropdown berlabel 'Ranking' ditemukan.")
         
         await page.click(ranking_selector, force=True)
-        await page.wait_for_timeout(2000)
+        await wait_for_listbox(page)
 
         options = await page.query_selector_all('div.v-menu__content div[role="listbox"] div.v-list-item__title')
         ranking_options = []
@@ -143,9 +159,6 @@ async def get_ranking_options(page):
 
 async def select_ranking_option(page, target_ranking: str) -> bool:
     try:
-        # Tunggu sebentar untuk memastikan halaman dimuat
-        await page.wait_for_timeout(5000)
-
         # Coba selector utama
         dropdown_selector = 'div.select:has(label:has-text("Ranking"))'
 
@@ -161,14 +174,10 @@ async def select_ranking_option(page, target_ranking: str) -> bool:
         # Coba klik hingga menu terbuka
         for attempt in range(3):
             await page.click(dropdown_selector, force=True)
-            menu_selector = 'div.v-menu__content div[role="listbox"]'
-            try:
-                await page.wait_for_selector(menu_selector, timeout=10000)
+            if await wait_for_listbox(page):
                 print("Menu dropdown Ranking terbuka.")
                 break
-            except:
-                print(f"Percobaan {attempt + 1}: Menu dropdown belum terbuka, mencoba lagi...")
-                await page.wait_for_timeout(3000)
+            print(f"Percobaan {attempt + 1}: Menu dropdown belum terbuka, mencoba lagi...")
         else:
             print("Gagal membuka menu dropdown setelah 3 percobaan.")
             return False
@@ -177,9 +186,10 @@ async def select_ranking_option(page, target_ranking: str) -> bool:
         ranking_selector = f'div.v-menu__content div[role="listbox"] div.v-list-item__title:text-matches("{re.escape(target_ranking)}", "i")'
         try:
             await page.wait_for_selector(ranking_selector, timeout=20000)
+            signature = await table_signature(page)
             await page.click(ranking_selector, force=True)
             print(f"Berhasil memilih item dropdown '{target_ranking}'.")
-            await page.wait_for_timeout(5000)  # Tunggu pembaruan halaman
+            await wait_for_rows_stable(page, previous_signature=signature)  # Tunggu pembaruan tabel
             return True
         except Exception as e:
             print(f"Gagal memilih item dropdown '{target_ranking}': {str(e)}")
@@ -202,7 +212,7 @@ async def save_week_options_to_json(page, output_dir="output"):
         print("Elemen dropdown berlabel 'Week' ditemukan.")
         
         await page.click(week_selector, force=True)
-        await page.wait_for_timeout(2000)
+        await wait_for_listbox(page)
 
         options = await page.query_selector_all('div.v-menu__content div[role="listbox"] div.v-list-item__title')
         raw_texts = []
@@ -269,9 +279,10 @@ async def select_week_option(page, week_options, target_week="Week 8"):
     week_selector = f'div.v-menu__content div[role="listbox"] div.v-list-item__title:text("{selected_option}")'
     try:
         await page.wait_for_selector(week_selector, timeout=20000)
+        signature = await table_signature(page)
         await page.click(week_selector, force=True)
         print(f"Berhasil memilih item dropdown '{selected_option}' pada percobaan pertama.")
-        await page.wait_for_timeout(3000)
+        await wait_for_rows_stable(page, previous_signature=signature)
         return True
     except Exception as e:
         print(f"Peringatan: Gagal memilih item dropdown '{selected_option}' pada percobaan pertama: {str(e)}")
@@ -285,22 +296,19 @@ async def select_week_option(page, week_options, target_week="Week 8"):
         # Coba klik hingga menu terbuka
         for attempt in range(3):
             await page.click(dropdown_selector, force=True)
-            menu_selector = 'div.v-menu__content div[role="listbox"]'
-            try:
-                await page.wait_for_selector(menu_selector, timeout=5000)
+            if await wait_for_listbox(page, timeout_ms=5000):
                 print("Menu dropdown Week terbuka.")
                 break
-            except:
-                print(f"Percobaan {attempt + 1}: Menu dropdown belum terbuka, mencoba lagi...")
-                await page.wait_for_timeout(1000)
+            print(f"Percobaan {attempt + 1}: Menu dropdown belum terbuka, mencoba lagi...")
         else:
             raise Exception("Gagal membuka menu dropdown setelah 3 percobaan.")
 
         week_selector = f'div.v-menu__content div[role="listbox"] div.v-list-item__title:text-matches("{re.escape(selected_option)}", "i")'
         await page.wait_for_selector(week_selector, timeout=20000)
+        signature = await table_signature(page)
         await page.click(week_selector, force=True)
         print(f"Berhasil memilih item dropdown yang memuat '{selected_option}'.")
-        await page.wait_for_timeout(3000)
+        await wait_for_rows_stable(page, previous_signature=signature)
         return True
     except Exception as e:
         print(f"Peringatan: Gagal memilih item dropdown yang memuat '{selected_option}': {str(e)}")
@@ -321,12 +329,13 @@ async def select_perpage_option(page, output_dir="output", target_perpage="100")
         print("Elemen dropdown berlabel 'Per page' ditemukan.")
         icon_selector = 'div.select.perpage i.mdi-menu-down'
         await page.click(icon_selector, force=True)
-        await page.wait_for_timeout(5000)
+        await wait_for_listbox(page)
         page_selector = f'div.v-menu__content div[role="listbox"] div.v-list-item__title:text-matches("^{target_perpage}$", "i")'
         await page.wait_for_selector(page_selector, timeout=20000)
+        signature = await table_signature(page)
         await page.click(page_selector, force=True)
         print(f"Berhasil memilih item dropdown yang memuat '{target_perpage}'.")
-        await page.wait_for_timeout(3000)
+        await wait_for_rows_stable(page, previous_signature=signature)
         return True
     except Exception as e:
         print(f"Peringatan: Gagal memilih item dropdown yang memuat '{target_perpage}': {str(e)}")
@@ -339,9 +348,10 @@ async def select_event(page, event_name):
     try:
         event_selector = f'li:has(a > span.ranking-tab-desktop:text("{event_name.upper()}"))'
         await page.wait_for_selector(event_selector, timeout=30000)
+        signature = await table_signature(page)
         await page.click(event_selector, force=True)
         print(f"Berhasil memilih {event_name}.")
-        await page.wait_for_timeout(5000)  # Tunggu pembaruan halaman
+        await wait_for_rows_stable(page, previous_signature=signature)  # Tunggu pembaruan tabel
         return True
     except Exception as e:
         print(f"Gagal memilih {event_name}: {str(e)}")
@@ -397,7 +407,7 @@ async def rank_to_json(url, output_dir="output"):
         if not await navigate_to_page(page, url):
             raise Exception("Navigasi ke halaman gagal.")
 
-        await handle_cookie_consent(page)
+        await ensure_cookie_consent(page, context, handle_cookie_consent)
 
         if await check_captcha(page):
             print("Scraping dihentikan karena CAPTCHA terdeteksi.")
@@ -424,6 +434,105 @@ async def rank_to_json(url, output_dir="output"):
         if p:
             await p.stop()
 
+# Membaca semua baris tabel peringkat dalam satu page.evaluate; nilai mentah dinormalisasi di Python
+RANKING_ROWS_JS = """
+(selector) => Array.from(document.querySelectorAll(selector)).map((row) => {
+    const text = (el, fallback) => el ? el.innerText : fallback;
+    const country = row.querySelector('td.col-country img');
+    return {
+        rank: text(row.querySelector('td.col-rank span.rank-value'), ''),
+        ranking_change: text(row.querySelector('td.col-rank span.ranking-change'), '-'),
+        players: Array.from(row.querySelectorAll('td.col-player a')).map((a) => ({
+            name_1: text(a.querySelector('span.name-1'), ''),
+            name_2: text(a.querySelector('span.name-2'), ''),
+            href: a.getAttribute('href') || ''
+        })),
+        country: country ? country.getAttribute('title') : '',
+        tournaments: text(row.querySelector('td.col-tmt'), ''),
+        points: text(row.querySelector('td.col-points strong'), '')
+    };
+})
+"""
+
+
+async def collect_ranking_rows_per_element(rows):
+    """Membaca nilai mentah setiap baris dengan satu panggilan Playwright per elemen (jalur cadangan)."""
+    raw_rows = []
+    for row in rows:
+        rank_elem = await row.query_selector('td.col-rank span.rank-value')
+        change_elem = await row.query_selector('td.col-rank span.ranking-change')
+
+        players = []
+        for player_elem in await row.query_selector_all('td.col-player a'):
+            name_1_elem = await player_elem.query_selector('span.name-1')
+            name_2_elem = await player_elem.query_selector('span.name-2')
+            players.append({
+                'name_1': await name_1_elem.inner_text() if name_1_elem else '',
+                'name_2': await name_2_elem.inner_text() if name_2_elem else '',
+                'href': await player_elem.get_attribute('href') or ''
+            })
+
+        country_elem = await row.query_selector('td.col-country img')
+        tournaments_elem = await row.query_selector('td.col-tmt')
+        points_elem = await row.query_selector('td.col-points strong')
+        raw_rows.append({
+            'rank': await rank_elem.inner_text() if rank_elem else '',
+            'ranking_change': await change_elem.inner_text() if change_elem else '-',
+            'players': players,
+            'country': await country_elem.get_attribute('title') if country_elem else '',
+            'tournaments': await tournaments_elem.inner_text() if tournaments_elem else '',
+            'points': await points_elem.inner_text() if points_elem else ''
+        })
+    return raw_rows
+
+
+def build_ranking_entry(raw, week, event_name, ranking_option, with_tournaments=True):
+    """Mengubah nilai mentah satu baris menjadi dictionary peringkat."""
+    ranking_data = {
+        'week': week,
+        'event': event_name,
+        'ranking_option': ranking_option,
+        'rank': raw['rank'],
+        'ranking_change': raw['ranking_change'],
+        'players': [
+            {'player_name': f"{p['name_2']} {p['name_1']}".strip(), 'player_url': p['href']}
+            for p in raw['players']
+        ],
+        'country': raw['country']
+    }
+    if with_tournaments:
+        ranking_data['tournaments'] = raw['tournaments'].strip() if raw['tournaments'] else raw['tournaments']
+    ranking_data['points'] = raw['points'].replace(',', '') if raw['points'] else raw['points']  # Menghapus koma
+    return ranking_data
+
+
+async def extract_ranking_rows(page, row_selector, week, event_name, ranking_option, with_tournaments=True, bulk=True):
+    """
+    Mengekstrak semua baris tabel peringkat, secara default dengan satu panggilan page.evaluate.
+
+    Jika bulk=False atau skrip massal gagal, dipakai jalur per elemen yang menghasilkan struktur sama.
+    """
+    raw_rows = None
+    if bulk:
+        try:
+            raw_rows = await page.evaluate(RANKING_ROWS_JS, row_selector)
+        except Exception as e:
+            print(f"Peringatan: Ekstraksi massal gagal, memakai jalur per elemen: {str(e)}")
+
+    if raw_rows is None:
+        rows = await page.query_selector_all(row_selector)
+        raw_rows = await collect_ranking_rows_per_element(rows)
+
+    if not raw_rows:
+        print("Tidak ada baris peringkat ditemukan dalam tabel.")
+        return []
+
+    print(f"Mengekstrak data dari {len(raw_rows)} baris peringkat...")
+    rankings = [build_ranking_entry(raw, week, event_name, ranking_option, with_tournaments) for raw in raw_rows]
+    print(f"Berhasil mengekstrak {len(rankings)} entri peringkat.")
+    return rankings
+
+
 async def extract_ranking_data(page, week, event_name, ranking_option):
     """
     Mengekstrak data peringkat dari elemen <tr> pada tabel peringkat BWF.
@@ -440,61 +549,8 @@ async def extract_ranking_data(page, week, event_name, ranking_option):
               Mengembalikan list kosong jika gagal.
     """
     try:
-        # Selector untuk semua baris tabel peringkat
-        rows = await page.query_selector_all('tr:has(td.col-rank)')
-        if not rows:
-            print("Tidak ada baris peringkat ditemukan dalam tabel.")
-            return []
-
-        rankings = []
-        print(f"Mengekstrak data dari {len(rows)} baris peringkat...")
-
-        for row in rows:
-            ranking_data = {
-                'week': week,
-                'event': event_name,
-                'ranking_option': ranking_option
-            }
-
-            # Ekstrak Rank
-            rank_elem = await row.query_selector('td.col-rank span.rank-value')
-            ranking_data['rank'] = await rank_elem.inner_text() if rank_elem else ''
-
-            # Ekstrak Ranking Change
-            change_elem = await row.query_selector('td.col-rank span.ranking-change')
-            ranking_data['ranking_change'] = await change_elem.inner_text() if change_elem else '-'
-
-            # Ekstrak Player Name dan Player URL
-            player_elems = await row.query_selector_all('td.col-player a')
-            players = []
-            for player_elem in player_elems:
-                name_1_elem = await player_elem.query_selector('span.name-1')
-                name_2_elem = await player_elem.query_selector('span.name-2')
-                name_1 = await name_1_elem.inner_text() if name_1_elem else ''
-                name_2 = await name_2_elem.inner_text() if name_2_elem else ''
-                player_name = f"{name_2} {name_1}".strip()
-                player_url = await player_elem.get_attribute('href') or ''
-                players.append({'player_name': player_name, 'player_url': player_url})
-            ranking_data['players'] = players
-
-            # Ekstrak Country
-            country_elem = await row.query_selector('td.col-country img')
-            ranking_data['country'] = await country_elem.get_attribute('title') if country_elem else ''
-
-            # Ekstrak Points
-            points_elem = await row.query_selector('td.col-points strong')
-            ranking_data['points'] = await points_elem.inner_text() if points_elem else ''
-            if ranking_data['points']:
-                ranking_data['points'] = ranking_data['points'].replace(',', '')  # Menghapus koma
-
-            # Tambahkan ke daftar jika data tidak kosong
-            if any(ranking_data.values()):
-                rankings.append(ranking_data)
-                # print(f"Ekstraksi berhasil untuk pemain: {[player['player_name'] for player in ranking_data['players']]}")
-
-        print(f"Berhasil mengekstrak {len(rankings)} entri peringkat.")
-        return rankings
-
+        return await extract_ranking_rows(page, 'tr:has(td.col-rank)', week, event_name, ranking_option,
+                                          with_tournaments=False)
     except Exception as e:
         print(f"Peringatan: Gagal mengekstrak data peringkat: {str(e)}")
         return []
@@ -516,67 +572,8 @@ async def extract_ranking_data_new(page, week, event_name, ranking_option):
               Mengembalikan list kosong jika gagal.
     """
     try:
-        # Selector untuk semua baris tabel peringkat
-        rows = await page.query_selector_all('table#table_id.tblRankingLanding tbody tr')
-        if not rows:
-            print("Tidak ada baris peringkat ditemukan dalam tabel.")
-            return []
-
-        rankings = []
-        print(f"Mengekstrak data dari {len(rows)} baris peringkat...")
-
-        for row in rows:
-            ranking_data = {
-                'week': week,
-                'event': event_name,
-                'ranking_option': ranking_option
-            }
-
-            # Ekstrak Rank
-            rank_elem = await row.query_selector('td.col-rank span.rank-value')
-            ranking_data['rank'] = await rank_elem.inner_text() if rank_elem else ''
-
-            # Ekstrak Ranking Change
-            change_elem = await row.query_selector('td.col-rank span.ranking-change')
-            ranking_data['ranking_change'] = await change_elem.inner_text() if change_elem else '-'
-
-            # Ekstrak Player Name dan Player URL
-            player_elems = await row.query_selector_all('td.col-player a')
-            players = []
-            for player_elem in player_elems:
-                name_1_elem = await player_elem.query_selector('span.name-1')
-                name_2_elem = await player_elem.query_selector('span.name-2')
-                name_1 = await name_1_elem.inner_text() if name_1_elem else ''
-                name_2 = await name_2_elem.inner_text() if name_2_elem else ''
-                player_name = f"{name_2} {name_1}".strip()
-                player_url = await player_elem.get_attribute('href') or ''
-                players.append({'player_name': player_name, 'player_url': player_url})
-            ranking_data['players'] = players
-
-            # Ekstrak Country
-            country_elem = await row.query_selector('td.col-country img')
-            ranking_data['country'] = await country_elem.get_attribute('title') if country_elem else ''
-
-            # Ekstrak Tournaments
-            tournaments_elem = await row.query_selector('td.col-tmt')
-            ranking_data['tournaments'] = await tournaments_elem.inner_text() if tournaments_elem else ''
-            if ranking_data['tournaments']:
-                ranking_data['tournaments'] = ranking_data['tournaments'].strip()
-
-            # Ekstrak Points
-            points_elem = await row.query_selector('td.col-points strong')
-            ranking_data['points'] = await points_elem.inner_text() if points_elem else ''
-            if ranking_data['points']:
-                ranking_data['points'] = ranking_data['points'].replace(',', '')  # Menghapus koma
-
-            # Tambahkan ke daftar jika data tidak kosong
-            if any(ranking_data.values()):
-                rankings.append(ranking_data)
-                # print(f"Ekstraksi berhasil untuk pemain: {[player['player_name'] for player in ranking_data['players']]}")
-
-        print(f"Berhasil mengekstrak {len(rankings)} entri peringkat.")
-        return rankings
-
+        return await extract_ranking_rows(page, 'table#table_id.tblRankingLanding tbody tr', week, event_name,
+                                          ranking_option, with_tournaments=True)
     except Exception as e:
         print(f"Peringatan: Gagal mengekstrak data peringkat: {str(e)}")
         return []    
@@ -587,6 +584,14 @@ def convert_to_valid_filename(filename):
     filename = re.sub(r'\s+', '_', filename)  # ganti spasi dengan underscore
     return filename
 
+
+def rank_event_files(output_dir, ranking_option, target_week):
+    """Path file rank_*.json untuk setiap event dari satu minggu/kategori peringkat."""
+    return [
+        os.path.join(output_dir, convert_to_valid_filename(f"rank_{ranking_option}_{event_name}_{target_week}") + ".json")
+        for event_name in EVENT_NAMES
+    ]
+
 async def scrape_rank(url, ranking_option="BWF World Tour Rankings", output_dir="output"):
     """Mengikis halaman dari situs BWF World Tour untuk menyimpan HTML dan opsi dropdown."""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -601,7 +606,7 @@ async def scrape_rank(url, ranking_option="BWF World Tour Rankings", output_dir=
         if not await navigate_to_page(page, url):
             raise Exception("Navigasi ke halaman gagal.")
 
-        await handle_cookie_consent(page)
+        await ensure_cookie_consent(page, context, handle_cookie_consent)
         if await check_captcha(page):
             print("Scraping dihentikan karena CAPTCHA terdeteksi.")
             return None
@@ -619,7 +624,7 @@ async def scrape_rank(url, ranking_option="BWF World Tour Rankings", output_dir=
                 return None
             
             # await select_event(page, "MEN'S DOUBLES")
-            event_names = ["MEN'S SINGLES", "WOMEN'S SINGLES", "MEN'S DOUBLES", "WOMEN'S DOUBLES", "MIXED DOUBLES"]
+            event_names = EVENT_NAMES
             # event_name = "MEN'S SINGLES"
             for event_name in event_names:
                 await select_event(page, event_name)
@@ -679,7 +684,7 @@ async def scrape_rank_by_week(url, ranking_option="BWF World Tour Rankings", out
         if not await navigate_to_page(page, url):
             raise Exception("Navigasi ke halaman gagal.")
 
-        await handle_cookie_consent(page)
+        await ensure_cookie_consent(page, context, handle_cookie_consent)
         if await check_captcha(page):
             print("Scraping dihentikan karena CAPTCHA terdeteksi.")
             return None
@@ -695,7 +700,7 @@ async def scrape_rank_by_week(url, ranking_option="BWF World Tour Rankings", out
             return None
             
         # await select_event(page, "MEN'S DOUBLES")
-        event_names = ["MEN'S SINGLES", "WOMEN'S SINGLES", "MEN'S DOUBLES", "WOMEN'S DOUBLES", "MIXED DOUBLES"]
+        event_names = EVENT_NAMES
         # event_name = "MEN'S SINGLES"
         for event_name in event_names:
             await select_event(page, event_name)
@@ -741,8 +746,13 @@ async def scrape_rank_by_week(url, ranking_option="BWF World Tour Rankings", out
             await p.stop()
 
 
-async def scrape_rank_by_week_new(url, ranking_option="BWF World Tour Rankings", output_dir="output", target_week = "Week 23"):
-    """Mengikis halaman dari situs BWF World Tour untuk menyimpan HTML dan opsi dropdown."""
+async def scrape_rank_by_week_new(url, ranking_option="BWF World Tour Rankings", output_dir="output", target_week = "Week 23", capture=False):
+    """Mengikis halaman dari situs BWF World Tour untuk menyimpan HTML dan opsi dropdown.
+
+    Dengan capture=True, respons JSON API widget peringkat direkam dan diparse langsung;
+    tabel yang dirender hanya dipakai jika tidak ada payload yang bisa diparse. Rekaman
+    disimpan sebagai fixture ranking_capture_<timestamp>.json di output_dir.
+    """
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     os.makedirs(output_dir, exist_ok=True)
 
@@ -751,11 +761,13 @@ async def scrape_rank_by_week_new(url, ranking_option="BWF World Tour Rankings",
         print("Gagal memulai scraping karena inisialisasi browser gagal.")
         return None
 
+    response_capture = start_response_capture(page) if capture else None
+
     try:
         if not await navigate_to_page(page, url):
             raise Exception("Navigasi ke halaman gagal.")
 
-        await handle_cookie_consent(page)
+        await ensure_cookie_consent(page, context, handle_cookie_consent)
         if await check_captcha(page):
             print("Scraping dihentikan karena CAPTCHA terdeteksi.")
             return None
@@ -771,9 +783,10 @@ async def scrape_rank_by_week_new(url, ranking_option="BWF World Tour Rankings",
             return None
             
         # await select_event(page, "MEN'S DOUBLES")
-        event_names = ["MEN'S SINGLES", "WOMEN'S SINGLES", "MEN'S DOUBLES", "WOMEN'S DOUBLES", "MIXED DOUBLES"]
+        event_names = EVENT_NAMES
         # event_name = "MEN'S SINGLES"
         for event_name in event_names:
+            since = len(response_capture["records"]) if response_capture else 0
             await select_event(page, event_name)
             # dont delete below, important for debugging
             await save_screenshot(page, output_dir, timestamp)
@@ -783,8 +796,15 @@ async def scrape_rank_by_week_new(url, ranking_option="BWF World Tour Rankings",
             # if await check_cloudflare_block(html_content):
             #     return None
         
-            # Ekstrak data peringkat
-            rankings = await extract_ranking_data_new(page, target_week, event_name, ranking_option )
+            # Ekstrak data peringkat: dari payload API jika direkam, selain itu dari tabel
+            rankings = []
+            if response_capture:
+                await finish_capture(response_capture)
+                rankings = latest_ranking_rows(response_capture, target_week, event_name, ranking_option, since)
+                if rankings:
+                    print(f"Menggunakan {len(rankings)} entri dari respons API.")
+            if not rankings:
+                rankings = await extract_ranking_data_new(page, target_week, event_name, ranking_option )
             if not rankings:
                 print("Gagal mengekstrak data peringkat.")
                 return []
@@ -807,6 +827,9 @@ async def scrape_rank_by_week_new(url, ranking_option="BWF World Tour Rankings",
         return None
 
     finally:
+        if response_capture:
+            await finish_capture(response_capture)
+            save_capture(response_capture, os.path.join(output_dir, f"ranking_capture_{timestamp}.json"))
         if page:
             await page.close()
         if context:
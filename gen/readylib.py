@@ -0,0 +1,79 @@
+import asyncio
+import os
+import time
+
+# Upper bounds (ms) for each readiness condition; override through the environment
+READY_TABLE_TIMEOUT_MS = int(os.getenv("READY_TABLE_TIMEOUT_MS", "15000"))
+READY_TABLE_QUIET_MS = int(os.getenv("READY_TABLE_QUIET_MS", "750"))
+READY_TABLE_CHANGE_MS = int(os.getenv("READY_TABLE_CHANGE_MS", "5000"))
+READY_LISTBOX_TIMEOUT_MS = int(os.getenv("READY_LISTBOX_TIMEOUT_MS", "10000"))
+READY_POLL_MS = 250
+
+RANKING_ROW_SELECTOR = 'table#table_id.tblRankingLanding tbody tr'
+LISTBOX_SELECTOR = 'div.v-menu__content div[role="listbox"]'
+
+_SIGNATURE_JS = """
+(selector) => {
+    const rows = document.querySelectorAll(selector);
+    const first = rows.length ? rows[0].innerText : "";
+    const last = rows.length ? rows[rows.length - 1].innerText : "";
+    return `${rows.length}|${first}|${last}`;
+}
+"""
+
+
+async def table_signature(page, row_selector=RANKING_ROW_SELECTOR):
+    """Return a cheap fingerprint (row count plus first/last row text) of a table."""
+    try:
+        return await page.evaluate(_SIGNATURE_JS, row_selector)
+    except Exception:
+        return None
+
+
+async def wait_for_rows_stable(page, row_selector=RANKING_ROW_SELECTOR, previous_signature=None,
+                               timeout_ms=None, quiet_ms=None):
+    """Wait until a table has rows and stops changing.
+
+    If previous_signature is given (taken before a click), the table must first
+    differ from it, so stale rows from before the click are not accepted. After
+    READY_TABLE_CHANGE_MS an unchanged table is accepted too (the selection may
+    not change the data). Returns True when the table settled, False when
+    timeout_ms ran out.
+    """
+    timeout_ms = timeout_ms or READY_TABLE_TIMEOUT_MS
+    quiet_ms = quiet_ms or READY_TABLE_QUIET_MS
+    started = time.monotonic()
+    deadline = started + timeout_ms / 1000
+    changed = previous_signature is None
+    last_signature = None
+    stable_since = started
+
+    while time.monotonic() < deadline:
+        signature = await table_signature(page, row_selector)
+        has_rows = signature is not None and not signature.startswith("0|")
+        if signature != previous_signature or time.monotonic() - started >= READY_TABLE_CHANGE_MS / 1000:
+            changed = True
+
+        if signature != last_signature:
+            last_signature = signature
+            stable_since = time.monotonic()
+        elif has_rows and changed and time.monotonic() - stable_since >= quiet_ms / 1000:
+            return True
+        await asyncio.sleep(READY_POLL_MS / 1000)
+
+    print(f"Readiness: table '{row_selector}' not stable after {timeout_ms} ms, continuing.")
+    return False
+
+
+async def wait_for_listbox(page, timeout_ms=None):
+    """Wait for the Vue v-menu__content listbox of an opened dropdown to become visible.
+
+    Closed menus stay in the DOM, so merely attached is not enough before a click.
+    """
+    timeout_ms = timeout_ms or READY_LISTBOX_TIMEOUT_MS
+    try:
+        await page.wait_for_selector(LISTBOX_SELECTOR, state="visible", timeout=timeout_ms)
+        return True
+    except Exception:
+        print(f"Readiness: dropdown listbox not visible after {timeout_ms} ms.")
+        return False
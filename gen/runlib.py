@@ -0,0 +1,111 @@
+# A copy lives in rank/runlib.py (rank/ does not import gen/); keep the two in sync.
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+# Status of every work unit of a long run, so an interrupted run can resume (--resume)
+RUN_MANIFEST_PATH = os.getenv("RUN_MANIFEST_PATH", "run_manifest.sqlite")
+
+_run_manifest = {"conn": None, "lock": threading.Lock()}
+
+
+def get_run_manifest():
+    """Open the run manifest database once per process."""
+    if _run_manifest["conn"] is None:
+        conn = sqlite3.connect(RUN_MANIFEST_PATH, check_same_thread=False)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS units (
+                run TEXT NOT NULL,
+                unit TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                output TEXT,
+                error TEXT,
+                started_at TEXT,
+                finished_at TEXT,
+                seconds REAL,
+                PRIMARY KEY (run, unit)
+            )
+        """)
+        conn.commit()
+        _run_manifest["conn"] = conn
+    return _run_manifest["conn"]
+
+
+def plan_units(run, units, resume=False):
+    """Register units for run and return the ones to process.
+
+    Without resume every unit is reset to pending. With resume, units already
+    done are skipped and failed, pending or interrupted (running) ones returned.
+    """
+    with _run_manifest["lock"]:
+        conn = get_run_manifest()
+        if not resume:
+            conn.execute("DELETE FROM units WHERE run = ?", (run,))
+        conn.executemany(
+            "INSERT OR IGNORE INTO units (run, unit, status) VALUES (?, ?, 'pending')",
+            [(run, unit) for unit in units]
+        )
+        conn.commit()
+        done = {
+            unit for (unit,) in conn.execute("SELECT unit FROM units WHERE run = ? AND status = 'done'", (run,))
+        }
+    todo = [unit for unit in units if unit not in done]
+    if resume:
+        print(f"Resuming {run}: {len(units) - len(todo)} units done, {len(todo)} to process.")
+    return todo
+
+
+def _update(run, unit, **fields):
+    columns = ", ".join(f"{name} = ?" for name in fields)
+    with _run_manifest["lock"]:
+        conn = get_run_manifest()
+        conn.execute(f"UPDATE units SET {columns} WHERE run = ? AND unit = ?", [*fields.values(), run, unit])
+        conn.commit()
+
+
+async def run_unit(run, unit, handler, describe=None, succeeded=None):
+    """Run handler() for one unit and record its status, attempts, output and timing.
+
+    An exception, or a result for which succeeded(result) is false, marks the
+    unit failed so --resume retries it; by default only a None result fails.
+    describe(result) gives the text stored as output (e.g. the file written).
+    """
+    started = time.monotonic()
+    with _run_manifest["lock"]:
+        conn = get_run_manifest()
+        conn.execute(
+            "UPDATE units SET status = 'running', attempts = attempts + 1, started_at = ?, error = NULL "
+            "WHERE run = ? AND unit = ?",
+            (datetime.now().isoformat(), run, unit)
+        )
+        conn.commit()
+
+    try:
+        result = await handler()
+    except Exception as e:
+        _update(run, unit, status="failed", error=str(e), finished_at=datetime.now().isoformat(),
+                seconds=round(time.monotonic() - started, 3))
+        raise
+
+    ok = succeeded(result) if succeeded else result is not None
+    _update(
+        run, unit,
+        status="done" if ok else "failed",
+        output=describe(result) if describe and ok else None,
+        error=None if ok else "no result",
+        finished_at=datetime.now().isoformat(),
+        seconds=round(time.monotonic() - started, 3)
+    )
+    return result
+
+
+def run_summary(run):
+    """Count units of run per status."""
+    with _run_manifest["lock"]:
+        rows = get_run_manifest().execute(
+            "SELECT status, COUNT(*) FROM units WHERE run = ? GROUP BY status", (run,)
+        ).fetchall()
+    return dict(rows)
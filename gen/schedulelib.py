@@ -0,0 +1,100 @@
+import json
+import os
+import random
+import re
+from datetime import date, timedelta
+
+MONTHS = {
+    "JAN": 1, "FEB": 2, "MAR": 3, "APR": 4, "MAY": 5, "JUN": 6,
+    "JUL": 7, "AUG": 8, "SEP": 9, "OCT": 10, "NOV": 11, "DEC": 12
+}
+
+# "07 - 12 JAN", "28 JAN - 02 FEB", "29 DEC - 03 JAN"
+DATE_RANGE_PATTERN = re.compile(r"(\d{1,2})\s*([A-Z]{3})?\s*-\s*(\d{1,2})\s*([A-Z]{3})", re.I)
+
+
+def infer_year(entry, default_year=None):
+    """Take the season year from the tournament slug (e.g. ...-open-2025/), else default_year."""
+    match = re.search(r"(20\d{2})(?!.*20\d{2})", entry.get("Link", ""))
+    if match:
+        return int(match.group(1))
+    return default_year or date.today().year
+
+
+def parse_date_range(date_str, year):
+    """Turn a calendar Date like "28 JAN - 02 FEB" into (first_day, last_day).
+
+    A range that runs past December (e.g. "29 DEC - 03 JAN") ends in year + 1.
+    Returns None when the text is not a recognised range.
+    """
+    match = DATE_RANGE_PATTERN.search(date_str or "")
+    if not match:
+        return None
+    start_day, start_month, end_day, end_month = match.groups()
+    end_month = MONTHS.get(end_month.upper()[:3])
+    start_month = MONTHS.get(start_month.upper()[:3]) if start_month else end_month
+    if not start_month or not end_month:
+        return None
+
+    try:
+        first = date(year, start_month, int(start_day))
+        last = date(year + (1 if end_month < start_month else 0), end_month, int(end_day))
+    except ValueError:
+        return None
+    return (first, last) if first <= last else None
+
+
+def schedule_day_urls(entry, default_year=None, podium=True):
+    """Build the results day URLs for one calendar entry without opening its page.
+
+    Only links of the form .../tournament/<id>/<slug>/results/ are synthesised;
+    other layouts return None so the caller can fall back to the browser.
+    """
+    link = entry.get("Link") or ""
+    if not link.endswith("/results/"):
+        return None
+    days = parse_date_range(entry.get("Date"), infer_year(entry, default_year))
+    if not days:
+        return None
+
+    first, last = days
+    urls = [f"{link}{(first + timedelta(days=offset)).isoformat()}" for offset in range((last - first).days + 1)]
+    if podium:
+        urls.append(f"{link}podium/")
+    return urls
+
+
+def write_schedule_links(calendar, output_dir="input/schedule", default_year=None):
+    """Write schedule_links_<id>.json for every calendar entry that can be synthesised.
+
+    Returns (written ids, entries that need the browser).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    unresolved = []
+    for entry in calendar:
+        urls = schedule_day_urls(entry, default_year)
+        if urls is None:
+            unresolved.append(entry)
+            continue
+        with open(os.path.join(output_dir, f"schedule_links_{entry['id']}.json"), "w", encoding="utf-8") as f:
+            json.dump(urls, f, indent=2)
+        written.append(entry["id"])
+    print(f"Synthesised schedule links for {len(written)} tournaments, {len(unresolved)} need the browser.")
+    return written, unresolved
+
+
+def sample_entries(calendar, fraction, seed=None):
+    """Pick about fraction of the synthesisable entries (at least one) for browser verification."""
+    candidates = [entry for entry in calendar if schedule_day_urls(entry) is not None]
+    if not candidates or fraction <= 0:
+        return []
+    count = max(1, round(len(candidates) * min(fraction, 1)))
+    return random.Random(seed).sample(candidates, count)
+
+
+def compare_day_urls(synthesised, scraped):
+    """Return (missing, extra) day URLs of the synthesised list compared with the scraped one."""
+    synthesised = {url.rstrip("/") for url in synthesised or []}
+    scraped = {url.rstrip("/") for url in scraped or []}
+    return sorted(scraped - synthesised), sorted(synthesised - scraped)
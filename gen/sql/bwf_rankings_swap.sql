@@ -0,0 +1,47 @@
+-- Staged week replacement for bwf_rankings (used by supalib.replace_bwf_rankings_week).
+-- New rows are loaded into bwf_rankings_staging under a batch_id, then
+-- swap_bwf_rankings_week replaces the live week in a single transaction.
+
+create table if not exists bwf_rankings_staging (
+    batch_id text not null,
+    rank integer,
+    category text,
+    rank_category integer,
+    points integer,
+    tournaments integer,
+    week integer,
+    week_date date,
+    player1_name text,
+    nationality1 text,
+    player2_name text,
+    nationality2 text,
+    created_at timestamptz
+);
+
+create index if not exists bwf_rankings_staging_batch on bwf_rankings_staging (batch_id);
+
+create or replace function swap_bwf_rankings_week(p_week integer, p_rank_category integer, p_batch_id text)
+returns integer
+language plpgsql
+as $$
+declare
+    moved integer;
+begin
+    delete from bwf_rankings
+    where week = p_week and rank_category = p_rank_category;
+
+    insert into bwf_rankings (
+        rank, category, rank_category, points, tournaments, week, week_date,
+        player1_name, nationality1, player2_name, nationality2, created_at
+    )
+    select
+        rank, category, rank_category, points, tournaments, week, week_date,
+        player1_name, nationality1, player2_name, nationality2, created_at
+    from bwf_rankings_staging
+    where batch_id = p_batch_id;
+    get diagnostics moved = row_count;
+
+    delete from bwf_rankings_staging where batch_id = p_batch_id;
+    return moved;
+end;
+$$;
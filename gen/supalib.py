@@ -3,21 +3,59 @@ import os
 import glob
 from supabase import create_client, Client
 from dotenv import load_dotenv
+from localdb import LocalClient
+from changelib import filter_changed, mark_synced, forget_scope, tour_scope, rankings_scope, use_manifest
 from jsonlib import parse_datetime_from_data, extract_number_from_filename, extract_number_from_string
 import re
+import uuid
 from typing import Dict, Union, Any
 from datetime import datetime, timedelta
 
+# Rows per upsert request for the batched loaders
+UPSERT_CHUNK_SIZE = int(os.getenv("UPSERT_CHUNK_SIZE", "500"))
+
+TOUR_CONFLICT_KEY = "tour,match,court,datetime"
+
+# Rows per select request; PostgREST cuts larger responses at its max-rows limit (1000 by default)
+SELECT_PAGE_SIZE = int(os.getenv("SELECT_PAGE_SIZE", "1000"))
+
+
+# One client per process; its HTTP session is reused by every loader
+_supabase = {"client": None}
+
+
+def use_local_backend(path: str = None, latency_ms: float = None) -> LocalClient:
+    """Route every loader to the SQLite stand-in (localdb.LocalClient) instead of Supabase.
+
+    The change manifest switches to a file next to the local database, so rows
+    loaded into the stand-in are never taken as already synced to Supabase.
+    """
+    path = path or os.getenv("LOCAL_DB_PATH", "local_supabase.sqlite")
+    _supabase["client"] = LocalClient(path, latency_ms)
+    use_manifest(":memory:" if path == ":memory:" else f"{os.path.splitext(path)[0]}_manifest.sqlite")
+    return _supabase["client"]
+
+
 def initialize_supabase() -> Union[Client, Dict[str, Any]]:
     """
     Inisialisasi client Supabase dengan environment variables.
+
+    Configuration is loaded and the client created only on the first call;
+    later calls return the same client. SUPABASE_BACKEND=sqlite uses the local
+    stand-in at LOCAL_DB_PATH instead.
     
     Returns:
         Client: Supabase client jika berhasil
         Dict: Dictionary dengan error message jika gagal
     """
+    if _supabase["client"] is not None:
+        return _supabase["client"]
+
     # Load environment variables
     load_dotenv()
+
+    if os.getenv("SUPABASE_BACKEND", "supabase") == "sqlite":
+        return use_local_backend()
     
     supabase_url = os.getenv("SUPABASE_URL")
     supabase_key = os.getenv("SUPABASE_KEY")
@@ -28,6 +66,7 @@ def initialize_supabase() -> Union[Client, Dict[str, Any]]:
     try:
         # Initialize Supabase client
         supabase: Client = create_client(supabase_url, supabase_key)
+        _supabase["client"] = supabase
         return supabase
     except Exception as e:
         return {"success": False, "message": f"Failed to initialize Supabase client: {str(e)}"}
@@ -57,16 +96,10 @@ async def save_tour_to_supabase(output_dir: str = "output") -> dict:
     Returns:
         dict: Result with success status and message
     """
-    # Load environment variables
-    load_dotenv()
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_KEY")
-
-    if not supabase_url or not supabase_key:
-        return {"success": False, "message": "Missing Supabase URL or Key"}
-
-    # Initialize Supabase client
-    supabase: Client = create_client(supabase_url, supabase_key)
+    # Shared Supabase client
+    supabase = initialize_supabase()
+    if isinstance(supabase, dict):
+        return supabase
 
     try:
         # Find all JSON files in output folder matching match_*.json
@@ -168,6 +201,59 @@ async def save_tour_to_supabase(output_dir: str = "output") -> dict:
         }
     
 
+# Month mapping for conversion
+MONTH_MAP = {
+    "JANUARY": 1, "FEBRUARY": 2, "MARCH": 3, "APRIL": 4, "MAY": 5, "JUNE": 6,
+    "JULY": 7, "AUGUST": 8, "SEPTEMBER": 9, "OCTOBER": 10, "NOVEMBER": 11, "DECEMBER": 12
+}
+
+
+def build_bwf_calendar_row(tournament: dict):
+    """Validate one calendar entry and map it to a bwf_calendar row.
+
+    Returns:
+        tuple: (row, None) when valid, (None, reason) when the entry must be skipped
+    """
+    # Validate required fields
+    required_fields = [
+        "Month", "Date", "Tournament_Name", "Location",
+        "Country", "Category", "Prize_Money", "id"
+    ]
+    missing_fields = [field for field in required_fields if not tournament.get(field)]
+    if missing_fields:
+        return None, f"Missing required fields: {', '.join(missing_fields)}"
+
+    # Convert month to integer
+    month_str = tournament.get("Month").upper()
+    if month_str not in MONTH_MAP:
+        return None, f"Invalid month: {month_str}"
+    month_num = MONTH_MAP[month_str]
+
+    # Clean prize money
+    prize_money_str = tournament.get("Prize_Money")
+    try:
+        prize_money = int(prize_money_str.replace("US $ ", "").replace(",", ""))
+    except (ValueError, AttributeError):
+        return None, f"Invalid prize money format: {prize_money_str}"
+
+    # Clean category by removing "HSBC BWF WORLD TOUR " prefix
+    category = tournament.get("Category", "")
+    if category.startswith("HSBC BWF WORLD TOUR "):
+        category = category.replace("HSBC BWF WORLD TOUR ", "")
+
+    # Prepare data for insertion, including id
+    return {
+        "id": tournament.get("id"),
+        "month": month_num,
+        "date": tournament.get("Date"),
+        "name": tournament.get("Tournament_Name"),
+        "location": tournament.get("Location"),
+        "country": tournament.get("Country"),
+        "category": category,
+        "prize_money": prize_money
+    }, None
+
+
 async def bwf_calendar_to_supabase(output_dir: str = "output") -> dict:
     """
     Save JSON calendar data from output folder to Supabase bwf_calendar table, including id field.
@@ -178,22 +264,10 @@ async def bwf_calendar_to_supabase(output_dir: str = "output") -> dict:
     Returns:
         dict: Result with success status and message
     """
-    # Load environment variables
-    load_dotenv()
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_KEY")
-
-    if not supabase_url or not supabase_key:
-        return {"success": False, "message": "Missing Supabase URL or Key"}
-
-    # Initialize Supabase client
-    supabase: Client = create_client(supabase_url, supabase_key)
-
-    # Month mapping for conversion
-    month_map = {
-        "JANUARY": 1, "FEBRUARY": 2, "MARCH": 3, "APRIL": 4, "MAY": 5, "JUNE": 6,
-        "JULY": 7, "AUGUST": 8, "SEPTEMBER": 9, "OCTOBER": 10, "NOVEMBER": 11, "DECEMBER": 12
-    }
+    # Shared Supabase client
+    supabase = initialize_supabase()
+    if isinstance(supabase, dict):
+        return supabase
 
     try:
         # Find all JSON files in output folder matching calendar_*.json
@@ -220,60 +294,14 @@ async def bwf_calendar_to_supabase(output_dir: str = "output") -> dict:
                 inserted_count = 0
                 skipped_count = 0
                 for tournament in tournaments:
-                    # Validate required fields
-                    required_fields = [
-                        "Month", "Date", "Tournament_Name", "Location",
-                        "Country", "Category", "Prize_Money", "id"
-                    ]
-                    missing_fields = [field for field in required_fields if not tournament.get(field)]
-                    if missing_fields:
+                    tournament_data, reason = build_bwf_calendar_row(tournament)
+                    if tournament_data is None:
                         error_messages.append(
-                            f"Skipped tournament {tournament.get('Tournament_Name', 'unknown')} in {json_file}: "
-                            f"Missing required fields: {', '.join(missing_fields)}"
+                            f"Skipped tournament {tournament.get('Tournament_Name', 'unknown')} in {json_file}: {reason}"
                         )
                         skipped_count += 1
                         continue
 
-                    # Convert month to integer
-                    month_str = tournament.get("Month").upper()
-                    if month_str not in month_map:
-                        error_messages.append(
-                            f"Skipped tournament {tournament.get('Tournament_Name', 'unknown')} in {json_file}: "
-                            f"Invalid month: {month_str}"
-                        )
-                        skipped_count += 1
-                        continue
-                    month_num = month_map[month_str]
-
-                    # Clean prize money
-                    prize_money_str = tournament.get("Prize_Money")
-                    try:
-                        prize_money = int(prize_money_str.replace("US $ ", "").replace(",", ""))
-                    except (ValueError, AttributeError):
-                        error_messages.append(
-                            f"Skipped tournament {tournament.get('Tournament_Name', 'unknown')} in {json_file}: "
-                            f"Invalid prize money format: {prize_money_str}"
-                        )
-                        skipped_count += 1
-                        continue
-
-                    # Clean category by removing "HSBC BWF WORLD TOUR " prefix
-                    category = tournament.get("Category", "")
-                    if category.startswith("HSBC BWF WORLD TOUR "):
-                        category = category.replace("HSBC BWF WORLD TOUR ", "")
-
-                    # Prepare data for insertion, including id
-                    tournament_data = {
-                        "id": tournament.get("id"),
-                        "month": month_num,
-                        "date": tournament.get("Date"),
-                        "name": tournament.get("Tournament_Name"),
-                        "location": tournament.get("Location"),
-                        "country": tournament.get("Country"),
-                        "category": category,
-                        "prize_money": prize_money
-                    }
-
                     # Insert or update (upsert) to handle duplicates
                     response = supabase.table("bwf_calendar").upsert(
                         tournament_data,
@@ -312,47 +340,207 @@ async def bwf_calendar_to_supabase(output_dir: str = "output") -> dict:
         }
     
 
-async def bwf_tour_to_supabase(output_dir: str = "output") -> dict:
+def build_bwf_tour_row(match: dict):
+    """Validate one scraped match card and map it to a bwf_tour row.
+
+    Returns:
+        tuple: (row, None) when valid, (None, reason) when the match must be skipped
+    """
+    # Validate required fields
+    required_fields = [
+        "Match_Name", "Team_1_Players", "Team_1_Country",
+        "Team_2_Players", "Team_2_Country", "Date",
+        "Status", "Time", "Category", "Round", "Court", "Stadium"
+    ]
+    missing_fields = [field for field in required_fields if not match.get(field)]
+    if missing_fields:
+        return None, f"Missing required fields: {', '.join(missing_fields)}"
+
+    # Extract court number (e.g., "Court 1" -> 1)
+    court_str = match.get("Court", "")
+    court_number = re.search(r'\d+', court_str)
+    court_number = int(court_number.group(0)) if court_number else None
+    if court_number is None:
+        return None, f"Invalid court format: {court_str}"
+
+    # Parse datetime
+    match_datetime = parse_datetime_from_data({
+        "Date": match.get("Date"),
+        "Time": match.get("Time")
+    })
+    if match_datetime is None:
+        return None, "Invalid datetime format"
+
+    # Ensure team_1_players and team_2_players are lists
+    team_1_players = match.get("Team_1_Players")
+    team_2_players = match.get("Team_2_Players")
+    scores = match.get("Scores")
+    if isinstance(team_1_players, str):
+        team_1_players = [team_1_players]
+    if isinstance(team_2_players, str):
+        team_2_players = [team_2_players]
+    if isinstance(scores, str):
+        scores = [scores] if scores else []
+
+    # Handle winner field - convert to integer if it exists and is valid
+    winner = match.get("Winner")
+    if winner is not None:
+        # If winner is a string, try to convert to integer
+        if isinstance(winner, str):
+            if winner.strip().isdigit():
+                winner = int(winner.strip())
+            elif winner.strip().lower() in ['1', 'team 1', 'team1']:
+                winner = 1
+            elif winner.strip().lower() in ['2', 'team 2', 'team2']:
+                winner = 2
+            else:
+                winner = None  # Invalid winner format
+        # If winner is already an integer, validate it's 1 or 2
+        elif isinstance(winner, int):
+            if winner not in [1, 2]:
+                winner = None  # Invalid winner value
+        else:
+            winner = None  # Invalid winner type
+
+    # Prepare data for insertion
+    return {
+        "tour": match.get("id"),
+        "court": court_number,
+        "match": extract_number_from_filename( match.get("Match_Name")),
+        "team_1_players": team_1_players,
+        "team_1_country": match.get("Team_1_Country"),
+        "team_1_seeding": extract_number_from_string(match.get("Team_1_Seeding")),
+        "team_2_players": team_2_players,
+        "team_2_country": match.get("Team_2_Country"),
+        "team_2_seeding": extract_number_from_string(match.get("Team_2_Seeding")),
+        "scores": scores if scores else None,
+        "datetime": match_datetime.isoformat(),
+        "status": match.get("Status"),
+        "category": match.get("Category"),
+        "round": match.get("Round"),
+        "stadium": match.get("Stadium"),
+        "duration": match.get("Duration"),
+        "winner": winner  # Add winner field
+    }, None
+
+
+def select_all(build_query, order_by: str = "id", page_size: int = SELECT_PAGE_SIZE):
+    """
+    Run a select page by page with .range() until a short page comes back.
+
+    build_query() must return a fresh filtered select each time; rows are ordered
+    by order_by so the pages do not overlap. Returns (rows, requests).
+    """
+    rows = []
+    requests = 0
+    start = 0
+    while True:
+        response = build_query().order(order_by).range(start, start + page_size - 1).execute()
+        requests += 1
+        page = response.data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows, requests
+        start += page_size
+
+
+def dedupe_rows(rows: list, key_fields: list) -> list:
+    """Keep only the last row for each conflict key.
+
+    PostgREST rejects an upsert that touches the same conflict key twice in one request.
+    """
+    unique = {}
+    for row in rows:
+        unique[tuple(str(row.get(field)) for field in key_fields)] = row
+    return list(unique.values())
+
+
+def upsert_in_chunks(supabase, table: str, rows: list, on_conflict: str, chunk_size: int = UPSERT_CHUNK_SIZE) -> dict:
+    """Upsert rows in chunks of chunk_size, one request per chunk.
+
+    A rejected chunk is retried row by row so one bad row does not drop the others.
+
+    Returns:
+        dict: inserted/failed counts, number of requests, error messages and the upserted rows
+    """
+    result = {"inserted": 0, "failed": 0, "requests": 0, "errors": [], "chunks": [], "rows": []}
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        chunk_result = {"chunk": start // chunk_size + 1, "rows": len(chunk), "inserted": 0, "failed": 0}
+        result["chunks"].append(chunk_result)
+        try:
+            result["requests"] += 1
+            supabase.table(table).upsert(chunk, on_conflict=on_conflict).execute()
+            chunk_result["inserted"] = len(chunk)
+            result["inserted"] += len(chunk)
+            result["rows"].extend(chunk)
+            continue
+        except Exception as e:
+            result["errors"].append(f"Chunk {chunk_result['chunk']} of {table} rejected, retrying row by row: {str(e)}")
+
+        for row in chunk:
+            try:
+                result["requests"] += 1
+                supabase.table(table).upsert(row, on_conflict=on_conflict).execute()
+                chunk_result["inserted"] += 1
+                result["inserted"] += 1
+                result["rows"].append(row)
+            except Exception as e:
+                chunk_result["failed"] += 1
+                result["failed"] += 1
+                result["errors"].append(f"Failed to upsert row into {table} ({on_conflict}): {str(e)}")
+    return result
+
+
+def upsert_changed_rows(supabase, table: str, rows: list, on_conflict: str, scope_fn, chunk_size: int = UPSERT_CHUNK_SIZE) -> dict:
+    """Deduplicate rows, drop those unchanged since the last load and upsert the rest in chunks.
+
+    Returns:
+        dict: upsert_in_chunks result plus the number of unchanged rows
+    """
+    key_fields = on_conflict.split(",")
+    rows = dedupe_rows(rows, key_fields)
+    changed = filter_changed(table, rows, key_fields)
+    result = upsert_in_chunks(supabase, table, changed, on_conflict, chunk_size)
+    mark_synced(table, result["rows"], key_fields, scope_fn)
+    result["unchanged"] = len(rows) - len(changed)
+    return result
+
+
+async def bwf_tour_to_supabase(output_dir: str = "output", chunk_size: int = UPSERT_CHUNK_SIZE) -> dict:
     """Save JSON match data from output folder to Supabase bwf_tour table.
+
+    Valid rows from all files are deduplicated on the tour,match,court,datetime
+    conflict key; rows unchanged since the last successful load (see changelib)
+    are skipped and the rest upserted in chunks of chunk_size.
     
     Args:
         output_dir (str): Path to the folder containing JSON files (default: 'output')
+        chunk_size (int): Number of rows per upsert request
     
     Returns:
         dict: Result with success status and message
     """
-    # Load environment variables
-    load_dotenv()
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_KEY")
-
-    if not supabase_url or not supabase_key:
-        return {"success": False, "message": "Missing Supabase URL or Key"}
-
-    # Initialize Supabase client
-    supabase: Client = create_client(supabase_url, supabase_key)
+    # Shared Supabase client
+    supabase = initialize_supabase()
+    if isinstance(supabase, dict):
+        return supabase
 
     try:
         # Find all JSON files in output folder matching match_*.json
         json_files = glob.glob(os.path.join(output_dir, "match_*.json"))
         if not json_files:
             return {"success": False, "message": f"No match_*.json files found in {output_dir}"}
+        # Oldest first, so the newest scrape of a match wins the deduplication
+        json_files.sort(key=lambda path: (os.path.getmtime(path), path))
 
-        total_inserted = 0
         total_skipped = 0
         total_files = len(json_files)
         error_messages = []
+        rows = []
 
         for json_file in json_files:
-            print(json_file)
             try:
-                # # Extract tour number from filename (e.g., match_card_text_01.json -> 01)
-                # tour_number = extract_number_from_filename(json_file)
-                # if not tour_number:
-                #     error_messages.append(f"Skipped {json_file}: Could not extract tour number")
-                #     continue
-                # tour_number = int(tour_number)  # Convert to integer for table
-
                 # Read JSON file
                 with open(json_file, "r", encoding="utf-8") as f:
                     matches = json.load(f)
@@ -361,126 +549,38 @@ async def bwf_tour_to_supabase(output_dir: str = "output") -> dict:
                     error_messages.append(f"No match data found in {json_file}")
                     continue
 
-                inserted_count = 0
+                prepared_count = 0
                 skipped_count = 0
                 for match in matches:
-                    # Validate required fields
-                    required_fields = [
-                        "Match_Name", "Team_1_Players", "Team_1_Country",
-                        "Team_2_Players", "Team_2_Country", "Date",
-                        "Status", "Time", "Category", "Round", "Court", "Stadium"
-                    ]
-                    missing_fields = [field for field in required_fields if not match.get(field)]
-                    if missing_fields:
+                    row, reason = build_bwf_tour_row(match)
+                    if row is None:
                         error_messages.append(
-                            f"Skipped match {match.get('Match_Name', 'unknown')} in {json_file}: "
-                            f"Missing required fields: {', '.join(missing_fields)}"
+                            f"Skipped match {match.get('Match_Name', 'unknown')} in {json_file}: {reason}"
                         )
                         skipped_count += 1
                         continue
+                    rows.append(row)
+                    prepared_count += 1
 
-                    # Extract court number (e.g., "Court 1" -> 1)
-                    court_str = match.get("Court", "")
-                    court_number = re.search(r'\d+', court_str)
-                    court_number = int(court_number.group(0)) if court_number else None
-                    if court_number is None:
-                        error_messages.append(
-                            f"Skipped match {match.get('Match_Name', 'unknown')} in {json_file}: "
-                            f"Invalid court format: {court_str}"
-                        )
-                        skipped_count += 1
-                        continue
-
-                    # Parse datetime
-                    match_datetime = parse_datetime_from_data({
-                        "Date": match.get("Date"),
-                        "Time": match.get("Time")
-                    })
-                    if match_datetime is None:
-                        error_messages.append(
-                            f"Skipped match {match.get('Match_Name', 'unknown')} in {json_file}: "
-                            f"Invalid datetime format"
-                        )
-                        skipped_count += 1
-                        continue
-
-                    # Ensure team_1_players and team_2_players are lists
-                    team_1_players = match.get("Team_1_Players")
-                    team_2_players = match.get("Team_2_Players")
-                    scores = match.get("Scores")
-                    if isinstance(team_1_players, str):
-                        team_1_players = [team_1_players]
-                    if isinstance(team_2_players, str):
-                        team_2_players = [team_2_players]
-                    if isinstance(scores, str):
-                        scores = [scores] if scores else []
-
-                    # Handle winner field - convert to integer if it exists and is valid
-                    winner = match.get("Winner")
-                    if winner is not None:
-                        # If winner is a string, try to convert to integer
-                        if isinstance(winner, str):
-                            if winner.strip().isdigit():
-                                winner = int(winner.strip())
-                            elif winner.strip().lower() in ['1', 'team 1', 'team1']:
-                                winner = 1
-                            elif winner.strip().lower() in ['2', 'team 2', 'team2']:
-                                winner = 2
-                            else:
-                                winner = None  # Invalid winner format
-                        # If winner is already an integer, validate it's 1 or 2
-                        elif isinstance(winner, int):
-                            if winner not in [1, 2]:
-                                winner = None  # Invalid winner value
-                        else:
-                            winner = None  # Invalid winner type
-
-                    # Prepare data for insertion
-                    match_data = {
-                        "tour": match.get("id"),
-                        "court": court_number,
-                        "match": extract_number_from_filename( match.get("Match_Name")),
-                        "team_1_players": team_1_players,
-                        "team_1_country": match.get("Team_1_Country"),
-                        "team_1_seeding": extract_number_from_string(match.get("Team_1_Seeding")),
-                        "team_2_players": team_2_players,
-                        "team_2_country": match.get("Team_2_Country"),
-                        "team_2_seeding": extract_number_from_string(match.get("Team_2_Seeding")),
-                        "scores": scores if scores else None,
-                        "datetime": match_datetime.isoformat(),
-                        "status": match.get("Status"),
-                        "category": match.get("Category"),
-                        "round": match.get("Round"),
-                        "stadium": match.get("Stadium"),
-                        "duration": match.get("Duration"),
-                        "winner": winner  # Add winner field
-                    }
-
-                    # Insert or update (upsert) to handle duplicates
-                    response = supabase.table("bwf_tour").upsert(
-                        match_data,
-                        on_conflict="tour,match,court,datetime"
-                    ).execute()
-
-                    # Check if insertion was successful
-                    if response.data:
-                        inserted_count += 1
-                    else:
-                        error_messages.append(
-                            f"Failed to insert match {match.get('Match_Name')} from {json_file}: {response.error}"
-                        )
-
-                total_inserted += inserted_count
                 total_skipped += skipped_count
-                print(f"Processed {json_file}: Inserted {inserted_count} matches, Skipped {skipped_count} matches")
+                print(f"Processed {json_file}: Prepared {prepared_count} matches, Skipped {skipped_count} matches")
 
             except Exception as e:
                 error_messages.append(f"Error processing {json_file}: {str(e)}")
 
+        # Deduplicate on the conflict key, drop unchanged rows and upsert in chunks
+        upsert_result = upsert_changed_rows(supabase, "bwf_tour", rows, TOUR_CONFLICT_KEY, tour_scope, chunk_size)
+        error_messages.extend(upsert_result["errors"])
+        total_inserted = upsert_result["inserted"]
+        total_unchanged = upsert_result["unchanged"]
+
         # Prepare final result
         result = {
-            "success": total_inserted > 0,
-            "message": f"Processed {total_files} JSON files: Inserted {total_inserted} matches, Skipped {total_skipped} matches"
+            "success": total_inserted > 0 or (total_unchanged > 0 and upsert_result["failed"] == 0),
+            "message": (
+                f"Processed {total_files} JSON files: Inserted {total_inserted} matches, Unchanged {total_unchanged} matches, "
+                f"Skipped {total_skipped} matches ({upsert_result['requests']} requests)"
+            )
         }
         if error_messages:
             result["message"] += f"\nErrors encountered:\n" + "\n".join(error_messages)
@@ -494,25 +594,72 @@ async def bwf_tour_to_supabase(output_dir: str = "output") -> dict:
         }
 
 
-async def bwf_schedule_to_supabase(schedule_dir: str = "input/schedule") -> dict:
+def collect_schedule_days(schedule_files: list):
+    """
+    Read schedule_links_<tour>.json files once and return the unique (tour, date) pairs.
+
+    Podium URLs and URLs without a valid yyyy-mm-dd date are skipped.
+
+    Returns:
+        tuple: (set of (tour, "yyyy-mm-dd"), skipped count, error messages)
+    """
+    days = set()
+    skipped = 0
+    errors = []
+
+    for schedule_file in schedule_files:
+        try:
+            # Extract tour number from filename (e.g., schedule_links_10.json -> 10)
+            filename = os.path.basename(schedule_file)
+            tour_match = re.search(r'schedule_links_(\d+)\.json', filename)
+            if not tour_match:
+                errors.append(f"Skipped {schedule_file}: Could not extract tour number")
+                continue
+            tour_number = int(tour_match.group(1))
+
+            # Read schedule JSON file
+            with open(schedule_file, "r", encoding="utf-8") as f:
+                urls = json.load(f)
+
+            for url in urls:
+                # Extract date from URL (e.g., 2025-01-07)
+                date_match = re.search(r'(\d{4}-\d{2}-\d{2})', url)
+                if date_match and "podium" not in url:  # Skip podium URLs
+                    try:
+                        # Validate date format
+                        schedule_date = datetime.strptime(date_match.group(1), "%Y-%m-%d").date()
+                        days.add((tour_number, schedule_date.isoformat()))
+                    except ValueError:
+                        errors.append(f"Invalid date format in {url}")
+                        skipped += 1
+                else:
+                    skipped += 1
+
+        except Exception as e:
+            errors.append(f"Error processing {schedule_file}: {str(e)}")
+            skipped += 1
+
+    return days, skipped, errors
+
+
+async def bwf_schedule_to_supabase(schedule_dir: str = "input/schedule", chunk_size: int = UPSERT_CHUNK_SIZE) -> dict:
     """Save schedule data from JSON files in schedule_dir to Supabase bwf_schedule table.
+
+    The unique (tour, date) pairs from all files are compared with the rows
+    already stored for those tours, and only the missing ones are inserted in
+    chunks, so running it again does not duplicate the table.
     
     Args:
         schedule_dir (str): Path to the folder containing schedule JSON files (default: 'input/schedule')
+        chunk_size (int): Number of rows per insert request
     
     Returns:
         dict: Result with success status and message
     """
-    # Load environment variables
-    load_dotenv()
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_KEY")
-
-    if not supabase_url or not supabase_key:
-        return {"success": False, "message": "Missing Supabase URL or Key"}
-
-    # Initialize Supabase client
-    supabase: Client = create_client(supabase_url, supabase_key)
+    # Shared Supabase client
+    supabase = initialize_supabase()
+    if isinstance(supabase, dict):
+        return supabase
 
     try:
         # Process schedule JSON files from schedule_dir
@@ -523,67 +670,37 @@ async def bwf_schedule_to_supabase(schedule_dir: str = "input/schedule") -> dict
                 "message": f"No schedule_links_*.json files found in {schedule_dir}"
             }
 
-        schedule_inserted = 0
-        schedule_skipped = 0
-        schedule_errors = []
+        days, schedule_skipped, schedule_errors = collect_schedule_days(schedule_files)
 
-        for schedule_file in schedule_files:
-            try:
-                # Extract tour number from filename (e.g., schedule_links_10.json -> 10)
-                filename = os.path.basename(schedule_file)
-                tour_match = re.search(r'schedule_links_(\d+)\.json', filename)
-                if not tour_match:
-                    schedule_errors.append(f"Skipped {schedule_file}: Could not extract tour number")
-                    continue
-                tour_number = int(tour_match.group(1))
-
-                # Read schedule JSON file
-                with open(schedule_file, "r", encoding="utf-8") as f:
-                    urls = json.load(f)
-
-                for url in urls:
-                    # Extract date from URL (e.g., 2025-01-07)
-                    date_match = re.search(r'(\d{4}-\d{2}-\d{2})', url)
-                    if date_match and "podium" not in url:  # Skip podium URLs
-                        date_str = date_match.group(1)
-                        try:
-                            # Validate date format
-                            schedule_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-                            
-                            # Prepare data for bwf_schedule table (exclude id as it's generated always)
-                            schedule_data = {
-                                "tour": tour_number,
-                                "date": schedule_date.isoformat()
-                            }
-
-                            # Insert to bwf_schedule table (no upsert since id is auto-generated)
-                            response = supabase.table("bwf_schedule").insert(
-                                schedule_data
-                            ).execute()
-
-                            if response.data:
-                                schedule_inserted += 1
-                            else:
-                                schedule_errors.append(
-                                    f"Failed to insert schedule for tour {tour_number} and date {date_str}: {response.error}"
-                                )
-                                schedule_skipped += 1
-                        except ValueError:
-                            schedule_errors.append(f"Invalid date format in {url}")
-                            schedule_skipped += 1
-                    else:
-                        schedule_skipped += 1
+        # Existing entries for these tours, paged so a table with old duplicates is read completely
+        tours = sorted({tour for tour, _ in days})
+        stored = set()
+        requests = 0
+        if tours:
+            existing, requests = select_all(
+                lambda: supabase.table("bwf_schedule").select("id,tour,date").in_("tour", tours)
+            )
+            stored = {(int(row["tour"]), str(row["date"])[:10]) for row in existing}
 
+        # Insert only the missing days (no upsert since id is auto-generated)
+        missing = [{"tour": tour, "date": date} for tour, date in sorted(days - stored)]
+        schedule_inserted = 0
+        for start in range(0, len(missing), chunk_size):
+            chunk = missing[start:start + chunk_size]
+            requests += 1
+            try:
+                supabase.table("bwf_schedule").insert(chunk).execute()
+                schedule_inserted += len(chunk)
             except Exception as e:
-                schedule_errors.append(f"Error processing {schedule_file}: {str(e)}")
-                schedule_skipped += 1
+                schedule_errors.append(f"Failed to insert {len(chunk)} schedule entries: {str(e)}")
 
         # Prepare final result
         result = {
-            "success": schedule_inserted > 0,
+            "success": not schedule_errors or schedule_inserted > 0,
             "message": (
                 f"Processed {len(schedule_files)} schedule JSON files: "
-                f"Inserted {schedule_inserted} schedule entries, Skipped {schedule_skipped} schedule entries"
+                f"Inserted {schedule_inserted} schedule entries, Already stored {len(days & stored)}, "
+                f"Skipped {schedule_skipped} schedule entries ({requests} requests)"
             )
         }
         if schedule_errors:
@@ -606,8 +723,8 @@ async def bwf_rankings_to_supabase(json_file: str) -> dict:
     Returns:
         dict: Result with success status and message
     """
-    client = get_supabase_client()
-    if client:
+    supabase = get_supabase_client()
+    if supabase:
         try:
             # Read JSON file
             with open(json_file, "r", encoding="utf-8") as f:
@@ -694,6 +811,7 @@ async def delete_bwf_tour(tour: int, date: str):
             .gte("datetime", start.isoformat()) \
             .lt("datetime", end.isoformat()) \
             .execute()
+        forget_scope("bwf_tour", f"{tour}|{start.date().isoformat()}")
 
         return {
             "success": True,
@@ -707,6 +825,116 @@ async def delete_bwf_tour(tour: int, date: str):
         }
 
 
+def _comparable(row, fields):
+    """Normalise a bwf_tour row for comparing scraped rows with stored ones."""
+    values = {}
+    for field in fields:
+        value = row.get(field)
+        if field == "datetime" and value is not None:
+            value = str(value)[:19]  # drop the timezone suffix Postgres adds
+        elif isinstance(value, list):
+            value = [str(item) for item in value]
+        elif value is not None:
+            value = str(value)
+        values[field] = value
+    return values
+
+
+def sync_bwf_tour_day(tour, date: str, rows: list, chunk_size: int = UPSERT_CHUNK_SIZE) -> dict:
+    """
+    Bring bwf_tour for one tour and day (yyyy-mm-dd) in line with freshly scraped rows.
+
+    The stored rows are fetched in one query and compared in memory: new keys
+    are inserted, changed rows updated (both as chunked upserts) and rows no
+    longer on the page deleted in one request. Nothing is deleted when rows is
+    empty, so a failed scrape never wipes a day.
+
+    Returns:
+        dict: Result with success status, message and inserted/updated/deleted/unchanged counts
+    """
+    supabase = get_supabase_client()
+    if not supabase:
+        return {"success": False, "message": "Failed to initialize Supabase client"}
+    if not rows:
+        return {"success": False, "message": f"No scraped rows for tour {tour} on {date}, nothing synced"}
+
+    key_fields = TOUR_CONFLICT_KEY.split(",")
+    fields = list(rows[0].keys())
+
+    def key_of(row):
+        return tuple(_comparable(row, key_fields).values())
+
+    try:
+        start = datetime.strptime(date, "%Y-%m-%d")
+        end = start + timedelta(days=1)
+        existing = supabase.table("bwf_tour") \
+            .select("*") \
+            .eq("tour", tour) \
+            .gte("datetime", start.isoformat()) \
+            .lt("datetime", end.isoformat()) \
+            .execute().data or []
+
+        stored = {key_of(row): row for row in existing}
+        scraped = {key_of(row): row for row in dedupe_rows(rows, key_fields)}
+
+        inserts = [row for key, row in scraped.items() if key not in stored]
+        updates = [
+            row for key, row in scraped.items()
+            if key in stored and _comparable(row, fields) != _comparable(stored[key], fields)
+        ]
+        deletes = [row for key, row in stored.items() if key not in scraped]
+        changed_keys = {key_of(row) for row in inserts + updates}
+        unchanged = [row for key, row in scraped.items() if key not in changed_keys]
+
+        upsert_result = upsert_in_chunks(supabase, "bwf_tour", inserts + updates, TOUR_CONFLICT_KEY, chunk_size)
+        errors = list(upsert_result["errors"])
+        requests = 1 + upsert_result["requests"]
+
+        deleted = 0
+        if deletes:
+            ids = [row["id"] for row in deletes if row.get("id") is not None]
+            try:
+                if len(ids) == len(deletes):
+                    requests += 1
+                    supabase.table("bwf_tour").delete().in_("id", ids).execute()
+                else:
+                    for row in deletes:
+                        query = supabase.table("bwf_tour").delete()
+                        for field in key_fields:
+                            query = query.eq(field, row.get(field))
+                        requests += 1
+                        query.execute()
+                deleted = len(deletes)
+            except Exception as e:
+                errors.append(f"Failed to delete {len(deletes)} stale matches: {str(e)}")
+
+        # The manifest now mirrors the day as stored
+        forget_scope("bwf_tour", f"{tour}|{start.date().isoformat()}")
+        mark_synced("bwf_tour", unchanged + upsert_result["rows"], key_fields, tour_scope)
+
+        result = {
+            "success": not errors,
+            "message": (
+                f"Synced tour {tour} on {date}: Inserted {len(inserts)}, Updated {len(updates)}, "
+                f"Deleted {deleted}, Unchanged {len(unchanged)} "
+                f"({requests} requests)"
+            ),
+            "inserted": len(inserts),
+            "updated": len(updates),
+            "deleted": deleted,
+            "unchanged": len(unchanged)
+        }
+        if errors:
+            result["message"] += f"\nErrors encountered:\n" + "\n".join(errors)
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Failed to sync tour {tour} on {date}: {str(e)}"
+        }
+
+
 async def delete_bwf_rankings_data(week_num, rank_category=0):
     # Get Supabase client
     supabase = get_supabase_client()
@@ -716,6 +944,7 @@ async def delete_bwf_rankings_data(week_num, rank_category=0):
     try:
         # delete to Supabase
         response = supabase.table("bwf_rankings").delete().eq("week", week_num).eq("rank_category", rank_category).execute()
+        forget_scope("bwf_rankings", f"{week_num}|{rank_category}")
         return {
             "success": True,
             "message": f"Succeed to delete data"
@@ -737,6 +966,7 @@ def delete_bwf_rankings_data_by_week(week_num):
     try:
         # delete to Supabase
         supabase.table("bwf_rankings").delete().eq("week", week_num).execute()
+        forget_scope("bwf_rankings", f"{week_num}|", prefix=True)
 
     except Exception as e:
         return {
@@ -747,107 +977,213 @@ def delete_bwf_rankings_data_by_week(week_num):
 
 
 
+# Mapping from event/category to base_category (customize as needed)
+BASE_CATEGORY_MAP = {
+    "MEN'S DOUBLES": "MD",
+    "WOMEN'S DOUBLES": "WD",
+    "MIXED DOUBLES": "XD",
+    "MEN'S SINGLES": "MS",
+    "WOMEN'S SINGLES": "WS"
+}
+
+RANK_CATEGORIES = [
+    "BWF World Rankings",
+    "BWF World Tour Rankings",
+    "BWF World Junior Rankings",
+    "BWF World Team Rankings",
+    "BWF World Championships Rankings",
+    "Olympic Games Qualification",
+    "BWF Para Badminton World Rankings",
+    "Paralympic Games Qualification",
+    "Parapan American Games Qualification"
+]
+
+RANK_CATEGORY_MAP = {text: index for index, text in enumerate(RANK_CATEGORIES)}
+
+RANKINGS_CONFLICT_KEY = "rank,category,rank_category,week,player1_name"
+
+
+def build_bwf_rankings_rows(data, created_at=None):
+    """
+    Map scraped ranking entries to bwf_rankings rows.
+
+    week_date is computed once per week and created_at once per call.
+
+    Args:
+        data (list): List of BWF ranking data
+        created_at (str): Timestamp for all rows (default: now)
+
+    Returns:
+        tuple: (rows, errors)
+    """
+    created_at = created_at or datetime.now().isoformat()
+    weeks = {}
+    rows = []
+    errors = []
+
+    for entry in data:
+        try:
+            week_key = str(entry["week"])
+            if week_key not in weeks:
+                weeks[week_key] = parse_week("Week " + week_key)
+            week_num, week_date = weeks[week_key]
+
+            rows.append({
+                "rank": int(entry["rank"]),
+                "category": BASE_CATEGORY_MAP.get(entry["event"].upper(), -1),
+                "rank_category": RANK_CATEGORY_MAP.get(entry["ranking_option"], -1),
+                "points": int(entry["points"]),
+                "tournaments": 0,  # If not provided
+                "week": week_num,
+                "week_date": str(week_date),
+                "player1_name": entry["players"][0]["player_name"],
+                "nationality1": entry["country"],
+                "player2_name": entry["players"][1]["player_name"] if len(entry["players"]) > 1 else "",
+                "nationality2": entry["country"],
+                "created_at": created_at
+            })
+        except Exception as e:
+            errors.append(f"Error preparing rank {entry.get('rank', 'unknown')}: {str(e)}")
+
+    return rows, errors
+
+
+def bulk_insert_bwf_rankings(data, chunk_size: int = UPSERT_CHUNK_SIZE):
+    """
+    Insert data BWF rankings ke Supabase dalam chunk upsert.
+
+    Rows are deduplicated on rank,category,rank_category,week,player1_name and
+    one line is printed per chunk instead of per row.
+
+    Args:
+        data (list): List of BWF ranking data (may span several categories and events)
+        chunk_size (int): Number of rows per upsert request
+
+    Returns:
+        dict: Result dengan status success/error, message, counts and per-chunk results
+    """
+    # Get Supabase client
+    supabase = get_supabase_client()
+    if not supabase:
+        return {"success": False, "message": "Failed to initialize Supabase client"}
+
+    key_fields = RANKINGS_CONFLICT_KEY.split(",")
+    rows, errors = build_bwf_rankings_rows(data)
+    rows = dedupe_rows(rows, key_fields)
+    changed = filter_changed("bwf_rankings", rows, key_fields)
+
+    try:
+        upsert_result = upsert_in_chunks(supabase, "bwf_rankings", changed, RANKINGS_CONFLICT_KEY, chunk_size)
+        mark_synced("bwf_rankings", upsert_result["rows"], key_fields, rankings_scope)
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Failed to insert data: {str(e)}",
+            "inserted_count": 0,
+            "errors": errors
+        }
+
+    for chunk in upsert_result["chunks"]:
+        print(f"bwf_rankings chunk {chunk['chunk']}: {chunk['inserted']}/{chunk['rows']} upserted, {chunk['failed']} failed")
+
+    errors.extend(upsert_result["errors"])
+    return {
+        "success": upsert_result["failed"] == 0,
+        "message": (
+            f"Successfully inserted {upsert_result['inserted']} records in {upsert_result['requests']} requests, "
+            f"{len(rows) - len(changed)} unchanged"
+        ),
+        "inserted_count": upsert_result["inserted"],
+        "unchanged_count": len(rows) - len(changed),
+        "failed_count": upsert_result["failed"],
+        "chunks": upsert_result["chunks"],
+        "errors": errors
+    }
+
+
 def insert_bwf_rankings_data(data, week):
     """
     Insert data BWF rankings ke Supabase database.
     
     Args:
         data (list): List of BWF ranking data
+        week: Target week (the week of each entry is used for the rows)
     
     Returns:
         dict: Result dengan status success/error dan message
     """
+    return bulk_insert_bwf_rankings(data)
+
 
-    # match = re.search(r"Week (\d+)", week)
-    # week_num = int(match.group(1))
+def replace_bwf_rankings_week(data, chunk_size: int = UPSERT_CHUNK_SIZE, only: set = None):
+    """
+    Replace whole weeks of bwf_rankings atomically from a reader's point of view.
 
-    week_num = int(week)
+    Rows are grouped by (week, rank_category). Each group is inserted into
+    bwf_rankings_staging under a new batch_id and then swapped live by the
+    swap_bwf_rankings_week function (gen/sql/bwf_rankings_swap.sql), which
+    deletes the old week and moves the staged rows in one transaction. If
+    staging fails, the live table is not touched.
+
+    Args:
+        data (list): List of BWF ranking data
+        chunk_size (int): Number of rows per staging insert request
+        only (set): (week, rank_category) groups that may be replaced; rows of
+            other groups are left out, so a stray file cannot replace another week
 
+    Returns:
+        dict: Result dengan status success/error, message and counts
+    """
     # Get Supabase client
     supabase = get_supabase_client()
     if not supabase:
         return {"success": False, "message": "Failed to initialize Supabase client"}
-    
-    # Mapping from event/category to base_category (customize as needed)
-    base_category_map = {
-        "MEN'S DOUBLES": "MD",
-        "WOMEN'S DOUBLES": "WD",
-        "MIXED DOUBLES": "XD",
-        "MEN'S SINGLES": "MS",
-        "WOMEN'S SINGLES": "WS"
-    }
 
-    rank_categories = [
-        "BWF World Rankings",
-        "BWF World Tour Rankings",
-        "BWF World Junior Rankings",
-        "BWF World Team Rankings",
-        "BWF World Championships Rankings",
-        "Olympic Games Qualification",
-        "BWF Para Badminton World Rankings",
-        "Paralympic Games Qualification",
-        "Parapan American Games Qualification"
-    ]
+    key_fields = RANKINGS_CONFLICT_KEY.split(",")
+    rows, errors = build_bwf_rankings_rows(data)
+    rows = dedupe_rows(rows, key_fields)
 
-    rank_category_map = {text: index for index, text in enumerate(rank_categories)}
-    
-    inserted_count = 0
-    errors = []
-   
-    try:
+    if only is not None:
+        outside = [row for row in rows if (row["week"], row["rank_category"]) not in only]
+        if outside:
+            errors.append(f"Left out {len(outside)} records outside week/category {sorted(only)}")
+        rows = [row for row in rows if (row["week"], row["rank_category"]) in only]
 
-        # delete to Supabase
-        # supabase.table("bwf_rankings").delete().eq("week", week_num).execute()
-
-        # Insert to Supabase
-        for entry in data:
-            try:
-                week_num, week_date = parse_week("Week " + str(entry["week"]))
-                rank_category = rank_category_map.get(entry["ranking_option"], -1)
-                base_category = base_category_map.get(entry["event"].upper(), -1)
-                
-                row = {
-                    "rank": int(entry["rank"]),
-                    "category": base_category,
-                    "rank_category": rank_category,
-                    "points": int(entry["points"]),
-                    "tournaments": 0,  # If not provided
-                    "week": week_num,
-                    "week_date": str(week_date),
-                    "player1_name": entry["players"][0]["player_name"],
-                    "nationality1": entry["country"],
-                    "player2_name": entry["players"][1]["player_name"] if len(entry["players"]) > 1 else "",
-                    "nationality2": entry["country"],
-                    "created_at": datetime.now().isoformat()
-                }
+    groups = {}
+    for row in rows:
+        groups.setdefault((row["week"], row["rank_category"]), []).append(row)
 
+    swapped = 0
+    for (week_num, rank_category), group in groups.items():
+        batch_id = uuid.uuid4().hex
+        try:
+            # Stage the new week
+            for start in range(0, len(group), chunk_size):
+                staged = [dict(row, batch_id=batch_id) for row in group[start:start + chunk_size]]
+                supabase.table("bwf_rankings_staging").insert(staged).execute()
+
+            # Flip it live in one transaction
+            response = supabase.rpc("swap_bwf_rankings_week", {
+                "p_week": week_num,
+                "p_rank_category": rank_category,
+                "p_batch_id": batch_id
+            }).execute()
+            swapped += len(group)
+            print(f"Swapped week {week_num} rank_category {rank_category}: {response.data} rows live")
+
+            forget_scope("bwf_rankings", f"{week_num}|{rank_category}")
+            mark_synced("bwf_rankings", group, key_fields, rankings_scope)
 
-                
-                # Upsert into the table (avoid duplicate by unique constraint)
-                response = supabase.table("bwf_rankings").upsert(
-                    row, 
-                    on_conflict="rank,category,rank_category,week,player1_name"
-                ).execute()
-                
-                inserted_count += 1
-                print(f"Inserted rank {entry['rank']} - {entry['players'][0]['player_name']}")
-                
-            except Exception as e:
-                error_msg = f"Error inserting rank {entry.get('rank', 'unknown')}: {str(e)}"
-                errors.append(error_msg)
-                print(error_msg)
-        
-        return {
-            "success": True,
-            "message": f"Successfully inserted {inserted_count} records",
-            "inserted_count": inserted_count,
-            "errors": errors
-        }
-        
-    except Exception as e:
-        return {
-            "success": False,
-            "message": f"Failed to insert data: {str(e)}",
-            "inserted_count": inserted_count,
-            "errors": errors
-        }
+        except Exception as e:
+            errors.append(f"Failed to replace week {week_num} rank_category {rank_category}: {str(e)}")
+            try:
+                supabase.table("bwf_rankings_staging").delete().eq("batch_id", batch_id).execute()
+            except Exception:
+                pass
+
+    return {
+        "success": swapped == len(rows) and bool(rows),
+        "message": f"Replaced {len(groups)} week/category groups with {swapped} of {len(rows)} records",
+        "inserted_count": swapped,
+        "errors": errors
+    }
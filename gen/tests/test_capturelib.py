@@ -0,0 +1,40 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capturelib import parse_capture_file, load_capture, latest_ranking_rows
+
+# Hand-built in the format save_capture() writes; replace with a recorded
+# ranking_capture_<timestamp>.json when the widget's payload changes
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "ranking_capture_sample.json")
+
+
+def test_parse_capture_file_uses_newest_ranking_payload():
+    rankings = parse_capture_file(FIXTURE, "Week 23", "MEN'S SINGLES", "BWF World Tour Rankings")
+
+    assert [row["rank"] for row in rankings] == ["1", "2", "3"]
+    assert rankings[0] == {
+        "week": "Week 23",
+        "event": "MEN'S SINGLES",
+        "ranking_option": "BWF World Tour Rankings",
+        "rank": "1",
+        "ranking_change": "0",
+        "players": [{"player_name": "SHI Yu Qi", "player_url": "shi-yu-qi"}],
+        "country": "China",
+        "tournaments": "16",
+        "points": "102312",
+    }
+
+
+def test_player_name_falls_back_to_last_and_first_name():
+    rankings = parse_capture_file(FIXTURE, "Week 23", "MEN'S SINGLES", "BWF World Tour Rankings")
+
+    assert rankings[1]["players"] == [{"player_name": "ANTONSEN Anders", "player_url": "anders-antonsen"}]
+    assert rankings[1]["ranking_change"] == "-1"
+
+
+def test_records_before_since_are_ignored():
+    capture = load_capture(FIXTURE)
+
+    assert latest_ranking_rows(capture, "Week 22", "MEN'S SINGLES", "BWF World Tour Rankings", since=3) == []
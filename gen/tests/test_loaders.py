@@ -0,0 +1,95 @@
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("supabase")
+pytest.importorskip("dotenv")
+
+import supalib
+from supalib import (
+    TOUR_CONFLICT_KEY, build_bwf_tour_row, upsert_in_chunks, sync_bwf_tour_day, bwf_schedule_to_supabase,
+    use_local_backend
+)
+
+
+@pytest.fixture
+def client():
+    """Fresh in-memory stand-in (and change manifest) for every test."""
+    client = use_local_backend(":memory:")
+    yield client
+    client.close()
+    supalib._supabase["client"] = None
+
+
+def card(number, scores=("21-10", "21-12")):
+    return {
+        "Tour": "Malaysia Open", "id": "5222", "Match_Name": f"Match {number}",
+        "Team_1_Players": ["Player A"], "Team_1_Country": "MAS",
+        "Team_2_Players": ["Player B"], "Team_2_Country": "INA",
+        "Scores": list(scores), "Date": "07 Jan", "Time": "10:00 AM", "Status": "Finished", "Winner": 1,
+        "Category": "MS", "Round": "R1", "Court": "Court 1", "Stadium": "Axiata Arena",
+    }
+
+
+def rows_for(cards):
+    return [build_bwf_tour_row(c)[0] for c in cards]
+
+
+def test_rejected_chunk_is_retried_row_by_row(client):
+    rows = rows_for([card(1), card(2), card(3)])
+    # The same conflict key twice in one request makes the stand-in reject the chunk, like PostgREST
+    rows.append(dict(rows[0], status="Retired"))
+
+    result = upsert_in_chunks(client, "bwf_tour", rows, TOUR_CONFLICT_KEY, chunk_size=10)
+
+    assert result["requests"] == 1 + len(rows)
+    assert result["inserted"] == len(rows)
+    assert result["failed"] == 0
+    assert len(result["errors"]) == 1 and "retrying row by row" in result["errors"][0]
+    assert client.count("bwf_tour") == 3
+    stored = client.table("bwf_tour").select("status").eq("match", 1).execute().data
+    assert stored == [{"status": "Retired"}]
+
+
+def test_sync_day_counts_inserts_updates_and_deletes(client):
+    first = sync_bwf_tour_day("5222", "2025-01-07", rows_for([card(n) for n in range(1, 6)]))
+    assert (first["inserted"], first["updated"], first["deleted"]) == (5, 0, 0)
+
+    again = sync_bwf_tour_day("5222", "2025-01-07", rows_for([card(n) for n in range(1, 6)]))
+    assert (again["inserted"], again["updated"], again["deleted"]) == (0, 0, 0)
+
+    # Match 1 changed, matches 4 and 5 are gone, match 6 is new
+    cards = [card(1, scores=("21-10", "19-21", "21-18")), card(2), card(3), card(6)]
+    changed = sync_bwf_tour_day("5222", "2025-01-07", rows_for(cards))
+    assert (changed["inserted"], changed["updated"], changed["deleted"]) == (1, 1, 2)
+    assert client.count("bwf_tour") == 4
+
+
+def test_sync_day_with_empty_scrape_deletes_nothing(client):
+    sync_bwf_tour_day("5222", "2025-01-07", rows_for([card(n) for n in range(1, 4)]))
+
+    result = sync_bwf_tour_day("5222", "2025-01-07", [])
+
+    assert result["success"] is False
+    assert client.count("bwf_tour") == 3
+
+
+def test_schedule_second_run_inserts_nothing(client, tmp_path):
+    for tour in (10, 11):
+        urls = [f"https://example.test/tournament/{tour}/open/results/2025-01-{day:02d}" for day in range(7, 13)]
+        urls.append(f"https://example.test/tournament/{tour}/open/results/podium/")
+        (tmp_path / f"schedule_links_{tour}.json").write_text(json.dumps(urls), encoding="utf-8")
+
+    first = asyncio.run(bwf_schedule_to_supabase(str(tmp_path), chunk_size=5))
+    requests_after_first = client.requests
+    second = asyncio.run(bwf_schedule_to_supabase(str(tmp_path), chunk_size=5))
+
+    assert "Inserted 12 schedule entries" in first["message"]
+    assert "Inserted 0 schedule entries" in second["message"]
+    assert client.requests - requests_after_first == 1
+    assert client.count("bwf_schedule") == 12
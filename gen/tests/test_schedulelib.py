@@ -0,0 +1,64 @@
+import json
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from schedulelib import infer_year, parse_date_range, schedule_day_urls, write_schedule_links
+
+GEN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_LINK = "https://bwfworldtour.bwfbadminton.com/tournament/5222/petronas-malaysia-open-2025/results/"
+FINALS_LINK = "https://bwfworldtourfinals.bwfbadminton.com/results/5259/hsbc-bwf-world-tour-finals-2025"
+
+
+def test_same_month_range():
+    assert parse_date_range("07 - 12 JAN", 2025) == (date(2025, 1, 7), date(2025, 1, 12))
+
+
+def test_cross_month_range():
+    assert parse_date_range("28 JAN - 02 FEB", 2025) == (date(2025, 1, 28), date(2025, 2, 2))
+
+
+def test_cross_year_range_ends_next_year():
+    assert parse_date_range("29 DEC - 03 JAN", 2025) == (date(2025, 12, 29), date(2026, 1, 3))
+
+
+def test_unrecognised_or_invalid_ranges():
+    assert parse_date_range("TBC", 2025) is None
+    assert parse_date_range("", 2025) is None
+    assert parse_date_range("30 - 31 FEB", 2025) is None
+
+
+def test_infer_year_prefers_last_year_in_link():
+    assert infer_year({"Link": RESULTS_LINK}) == 2025
+    assert infer_year({"Link": "https://example.test/tournament/2024/open-2026/results/"}) == 2026
+    assert infer_year({"Link": "https://example.test/tournament/1/open/results/"}, default_year=2030) == 2030
+
+
+def test_cross_year_entry_builds_every_day_and_podium():
+    urls = schedule_day_urls({"Link": RESULTS_LINK.replace("2025", "2024"), "Date": "30 DEC - 02 JAN"})
+
+    days = [url.rsplit("/", 1)[1] for url in urls[:-1]]
+    assert days == ["2024-12-30", "2024-12-31", "2025-01-01", "2025-01-02"]
+    assert urls[-1].endswith("/results/podium/")
+
+
+def test_world_tour_finals_layout_is_left_to_the_browser(tmp_path):
+    finals = {"id": 300, "Link": FINALS_LINK, "Date": "17 - 21 DEC"}
+    regular = {"id": 10, "Link": RESULTS_LINK, "Date": "07 - 12 JAN"}
+
+    assert schedule_day_urls(finals) is None
+    written, unresolved = write_schedule_links([regular, finals], str(tmp_path))
+    assert written == [10]
+    assert unresolved == [finals]
+    assert os.listdir(tmp_path) == ["schedule_links_10.json"]
+
+
+def test_matches_bundled_schedule_file():
+    with open(os.path.join(GEN_DIR, "input", "calendar.json"), encoding="utf-8") as f:
+        entry = next(e for e in json.load(f) if e["id"] == 10)
+    with open(os.path.join(GEN_DIR, "input", "schedule", "schedule_links_10.json"), encoding="utf-8") as f:
+        bundled = json.load(f)
+
+    assert schedule_day_urls(entry) == bundled
@@ -3,6 +3,27 @@ import os
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+# One client per process; its HTTP session is reused by every load
+_supabase = {"client": None}
+
+
+def get_supabase_client():
+    """Return the shared Supabase client, or a dict with an error message."""
+    if _supabase["client"] is None:
+        # Load environment variables
+        load_dotenv()
+        supabase_url = os.getenv("SUPABASE_URL")
+        supabase_key = os.getenv("SUPABASE_KEY")
+
+        if not supabase_url or not supabase_key:
+            return {"success": False, "message": "Missing Supabase URL or Key"}
+
+        # Initialize Supabase client
+        supabase: Client = create_client(supabase_url, supabase_key)
+        _supabase["client"] = supabase
+    return _supabase["client"]
+
+
 async def load_json_to_supabase(json_file: str) -> dict:
     """Load JSON match data to Supabase bwf_matches table.
     
@@ -12,16 +33,10 @@ async def load_json_to_supabase(json_file: str) -> dict:
     Returns:
         dict: Result with success status and message
     """
-    # Load environment variables
-    load_dotenv()
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_KEY")
-
-    if not supabase_url or not supabase_key:
-        return {"success": False, "message": "Missing Supabase URL or Key"}
-
-    # Initialize Supabase client
-    supabase: Client = create_client(supabase_url, supabase_key)
+    # Shared Supabase client
+    supabase = get_supabase_client()
+    if isinstance(supabase, dict):
+        return supabase
 
     try:
         # Read JSON file
@@ -7,11 +7,13 @@ import json
 from datetime import datetime
 from rank_functions import scrape_rank, rank_to_json
 from supabase_lib import load_json_to_supabase
+from runlib import plan_units, run_unit, run_summary
 
 async def main():
-    # Check for command-line argument
-    if len(sys.argv) != 2:
-        print("Usage: python run.py <mode> (1 for scrape only, 2 for Supabase only, 3 for ranking options only, 10 for scrape and Supabase)")
+    # Check for command-line argument (--resume skips ranking options finished by an earlier run)
+    resume = "--resume" in sys.argv[2:]
+    if len(sys.argv) != (3 if resume else 2):
+        print("Usage: python run.py <mode> [--resume] (1 for scrape only, 2 for Supabase only, 3 for ranking options only, 10 for scrape and Supabase)")
         return
     
     try:
@@ -41,10 +43,21 @@ async def main():
                 with open(latest_json, "r", encoding="utf-8") as f:
                     ranking_options = json.load(f)
                 if ranking_options and isinstance(ranking_options, list) and len(ranking_options) > 0:
-                    for ranking_option in ranking_options:
+                    for ranking_option in plan_units("rank_run", ranking_options, resume):
                         print(f"Processing ranking option: {ranking_option}")
-                        rankings = await scrape_rank(url, ranking_option, output_dir)
-                        print(f"Scraped {len(rankings)} rankings for ranking option: {ranking_option}")
+                        try:
+                            rankings = await run_unit(
+                                "rank_run", ranking_option,
+                                lambda: scrape_rank(url, ranking_option, output_dir),
+                                describe=lambda result: f"{len(result)} rankings in {output_dir}/",
+                                # scrape_rank returns [] when no ranking rows were extracted
+                                succeeded=bool
+                            )
+                        except Exception as e:
+                            print(f"Failed ranking option {ranking_option}: {str(e)}")
+                            continue
+                        print(f"Scraped {len(rankings or [])} rankings for ranking option: {ranking_option}")
+                    print(f"Run manifest: {run_summary('rank_run')}")
                 else:
                     print(f"Warning: No valid ranking options found in {latest_json}. ")
             except Exception as e: